@@ -0,0 +1,64 @@
+# bench/bench_catalog_columns.py
+"""
+Benchmark de las consultas analíticas del catálogo con y sin la vista
+columnar (numpy): conteo por rango, los k más baratos y precio medio por
+marca, más el coste de una edición suelta.
+
+    python -m bench.bench_catalog_columns            # 1.000.000 vehículos
+    python -m bench.bench_catalog_columns 200000
+"""
+import random
+import sys
+import time
+
+from core.catalog_columns import HAS_NUMPY
+from core.factories import VehicleFactory
+from core.services.catalog_service import CatalogService
+
+_MARCAS = ("Toyota", "Kia", "Renault", "Tesla", "Fiat", "Seat", "Mazda", "Ford")
+
+
+def _vehicles(n):
+    rnd = random.Random(42)
+    return [
+        VehicleFactory.create_vehicle(
+            f"V{i:07d}", rnd.choice(_MARCAS), f"Modelo {rnd.randint(0, 9999)}",
+            round(rnd.uniform(5000, 90000), 2), rnd.choice((12, 24, 36)), "gratis",
+        )
+        for i in range(n)
+    ]
+
+
+def _ms(fn, repeat=5):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main(n=1_000_000):
+    vehicles = _vehicles(n)
+    for columnar in (False, True) if HAS_NUMPY else (False,):
+        catalog = CatalogService(columnar=columnar)
+        start = time.perf_counter()
+        catalog.upsert_vehicles(vehicles)
+        load = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for i in range(100):
+            catalog.edit_vehicle(vehicles[i * 97 % n].id, {"precio": 1000.0 + i})
+        edit = (time.perf_counter() - start) / 100 * 1000
+
+        snap = catalog.snapshot()
+        print(
+            f"{'columnar' if columnar else 'objetos':>8}: alta {load:5.1f} s | edición {edit:6.2f} ms | "
+            f"conteo {_ms(lambda: snap.count_vehicles('kia', 20000, 40000)):7.1f} ms | "
+            f"10 más baratos (Kia) {_ms(lambda: snap.cheapest_vehicles(10, 'kia', garantia_min=24)):6.1f} ms | "
+            f"media por marca {_ms(snap.vehicle_price_stats):7.1f} ms"
+        )
+    if not HAS_NUMPY:
+        print("numpy no está instalado: solo se mide el modo sin vista columnar")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
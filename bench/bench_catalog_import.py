@@ -0,0 +1,89 @@
+# bench/bench_catalog_import.py
+"""
+Benchmark de la importación masiva del catálogo: genera un inventario
+sintético (JSONL o CSV) y lo importa con ``CatalogService.import_vehicles``
+en memoria o sobre SQLite, por bloques (por defecto) y con
+``atomic=True``, comparando con el alta fila a fila anterior
+(``VehicleFactory`` + ``add_vehicle``) sobre una muestra.
+
+    python -m bench.bench_catalog_import                  # 1.000.000 filas, JSONL, memoria
+    python -m bench.bench_catalog_import 200000 csv sqlite
+"""
+import csv
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+from core.adapters.sqlite_catalog_repo import SqliteCatalogRepository
+from core.catalog_import import read_vehicles, vehicle_from_row
+from core.services.catalog_service import CatalogService
+
+_MARCAS = ("Toyota", "Kia", "Renault", "Tesla", "Fiat", "Seat", "Mazda", "Ford")
+_COLUMNS = ("id", "marca", "modelo", "precio", "garantia_meses", "mantenimiento_tipo", "descripcion")
+
+
+def _rows(n):
+    rnd = random.Random(42)
+    for i in range(n):
+        yield {
+            "id": f"V{rnd.randrange(10 ** 9):09d}",
+            "marca": rnd.choice(_MARCAS),
+            "modelo": f"Modelo {rnd.randint(0, 9999)}",
+            "precio": round(rnd.uniform(5000, 90000), 2),
+            "garantia_meses": rnd.choice((12, 24, 36)),
+            "mantenimiento_tipo": "gratis",
+            "descripcion": "Sedán",
+        }
+
+
+def _write(path, n, fmt):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        if fmt == "csv":
+            writer = csv.DictWriter(f, fieldnames=_COLUMNS)
+            writer.writeheader()
+            writer.writerows(_rows(n))
+        else:
+            for row in _rows(n):
+                f.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+
+def main(n=1_000_000, fmt="jsonl", backend="memory"):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, f"inventario.{fmt}")
+        _write(path, n, fmt)
+
+        sample = min(n, 20_000)
+        legacy = CatalogService()
+        start = time.perf_counter()
+        for row, _ in zip(read_vehicles(path), range(sample)):
+            legacy.add_vehicle(vehicle_from_row(row))
+        legacy_rate = sample / (time.perf_counter() - start)
+
+        reports = {}
+        for atomic in (False, True):
+            db_file = os.path.join(tmp, f"catalog-{atomic}.db")
+            repo = SqliteCatalogRepository(db_file) if backend == "sqlite" else None
+            reports[atomic] = CatalogService(repo).import_vehicles(read_vehicles(path), atomic=atomic)
+            if repo is not None:
+                repo.close()
+
+    print(f"fila a fila:     {legacy_rate:>10.0f} filas/s   (muestra de {sample})")
+    for atomic, report in reports.items():
+        label = "atomic=True" if atomic else "por bloques"
+        print(
+            f"import_vehicles: {report.rows_per_second:>10.0f} filas/s   "
+            f"({label}: {report.imported} escritos, {report.rejected} rechazadas, "
+            f"{report.seconds:.1f} s, {fmt}, {backend})"
+        )
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(
+        int(args[0]) if args else 1_000_000,
+        args[1] if len(args) > 1 else "jsonl",
+        args[2] if len(args) > 2 else "memory",
+    )
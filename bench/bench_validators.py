@@ -0,0 +1,61 @@
+# bench/bench_validators.py
+"""
+Micro-benchmark de core/validators.py: coste por llamada (ns) de usuario,
+contraseña y matrícula, comparando la versión anterior (``re.match`` con
+el patrón como cadena), las funciones actuales y ``validate_many``.
+
+    python -m bench.bench_validators            # 1.000.000 entradas
+    python -m bench.bench_validators 200000
+"""
+import random
+import re
+import string
+import sys
+import time
+
+from core.validators import validate_many, validate_matricula, validate_password, validate_username
+
+
+def _legacy_username(username):
+    return bool(re.match(r"^[a-zA-Z0-9_]{3,20}$", username))
+
+
+def _legacy_password(password):
+    return bool(re.match(r'^(?=.*[A-Z])(?=.*[!@#$%^&*(),.?":{}|<>]).{6,}$', password))
+
+
+def _legacy_matricula(matricula):
+    return bool(re.match(r"^[A-Z0-9\-]{4,10}$", matricula.upper()))
+
+
+def _inputs(n, alphabet, min_len, max_len):
+    rnd = random.Random(42)
+    return ["".join(rnd.choices(alphabet, k=rnd.randint(min_len, max_len))) for _ in range(n)]
+
+
+def _per_call_ns(fn, values):
+    start = time.perf_counter()
+    fn(values)
+    return (time.perf_counter() - start) * 1e9 / len(values)
+
+
+def main(n=1_000_000):
+    cases = [
+        ("username", _legacy_username, validate_username,
+         _inputs(n, string.ascii_letters + string.digits + "_$", 2, 22)),
+        ("password", _legacy_password, validate_password,
+         _inputs(n, string.ascii_letters + string.digits + "@!#", 4, 14)),
+        ("matricula", _legacy_matricula, validate_matricula,
+         _inputs(n, string.ascii_letters + string.digits + "-", 3, 11)),
+    ]
+    print(f"{'validador':<10} {'anterior':>10} {'actual':>10} {'validate_many':>14}   (ns/llamada, {n} entradas)")
+    for kind, legacy, current, values in cases:
+        assert [legacy(v) for v in values[:1000]] == validate_many(values[:1000], kind)
+        old = _per_call_ns(lambda vs: [legacy(v) for v in vs], values)
+        new = _per_call_ns(lambda vs: [current(v) for v in vs], values)
+        bulk = _per_call_ns(lambda vs: validate_many(vs, kind), values)
+        print(f"{kind:<10} {old:>10.0f} {new:>10.0f} {bulk:>14.0f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,67 @@
+# core/adapters/async_auth_repo.py
+import asyncio
+import functools
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Callable, List, Optional
+
+from core.adapters.sqlite_auth_repo import SqliteAuthRepository
+from core.ports.async_auth_repo import AsyncAuthRepository
+from core.ports.auth_repo import IAuthRepository, UserRecord
+
+
+class ExecutorAuthRepository(AsyncAuthRepository):
+    """
+    Adapta cualquier IAuthRepository síncrono a AsyncAuthRepository
+    ejecutando cada operación en un executor, de modo que la E/S de
+    archivo nunca bloquea el event loop.
+    """
+
+    def __init__(self, repo: IAuthRepository, executor: Optional[Executor] = None) -> None:
+        self._repo = repo
+        self._executor = executor
+
+    async def _run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(fn, *args))
+
+    async def get(self, username: str) -> Optional[UserRecord]:
+        return await self._run(self._repo.get, username)
+
+    async def list_all(self) -> List[UserRecord]:
+        return await self._run(self._repo.list_all)
+
+    async def list_page(
+        self,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        role: Optional[str] = None,
+        prefix: Optional[str] = None,
+        descending: bool = False,
+    ) -> List[UserRecord]:
+        return await self._run(self._repo.list_page, offset, limit, role, prefix, descending)
+
+    async def count(self, role: Optional[str] = None, prefix: Optional[str] = None) -> int:
+        return await self._run(self._repo.count, role, prefix)
+
+    async def add(self, user: UserRecord) -> None:
+        await self._run(self._repo.add, user)
+
+    async def update(self, user: UserRecord) -> None:
+        await self._run(self._repo.update, user)
+
+    async def delete(self, username: str) -> None:
+        await self._run(self._repo.delete, username)
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+
+
+class AsyncSqliteAuthRepository(ExecutorAuthRepository):
+    """
+    SqliteAuthRepository servido por un único hilo dedicado: todas las
+    operaciones usan la misma conexión y se serializan sin bloquear el loop.
+    """
+
+    def __init__(self, repo: SqliteAuthRepository) -> None:
+        super().__init__(repo, ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite-auth"))
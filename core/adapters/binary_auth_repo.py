@@ -0,0 +1,279 @@
+# core/adapters/binary_auth_repo.py
+import gc
+import json
+import os
+import re
+import struct
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from core.adapters.json_auth_repo import JsonAuthRepository
+from core.crypto import b64decode, b64encode
+from core.ports.auth_repo import UserRecord
+
+DATA_FILE = os.path.join(os.path.dirname(__file__), "..", "data", "users.bin")
+DATA_FILE = os.path.normpath(DATA_FILE)
+
+MAGIC = b"USRB"
+VERSION = 2
+
+# magic y versión: comunes a todas las versiones del formato
+_PREFIX = struct.Struct("<4sB")
+# v1: magic, versión, nº usuarios, bytes de nombres, bytes tabla de roles, bytes sparse
+_HEADER_V1 = struct.Struct("<4sBIIII")
+# v2: como v1 más los bytes de la columna de hashes
+_HEADER = struct.Struct("<4sBIIIII")
+_DIGEST_SIZE = 32
+_HEX_DIGEST = re.compile(r"[0-9a-f]{64}\Z")
+# Sal y hash de cada entrada llevan su longitud en un byte
+_MAX_FIELD = 255
+# Código 0 de esquema: el hash está en la sección dispersa
+_MAX_SCHEMES = 255
+
+# Roles conocidos: su código es la posición en la tupla
+ROLES = ("comprador", "concesionario", "administrador", "superadmin")
+
+
+def _join_hash(scheme: str, salt: bytes, digest: bytes) -> str:
+    # Esquema vacío: SHA-256 heredado, solo el digest en hexadecimal
+    if not scheme:
+        return digest.hex()
+    return f"{scheme}${b64encode(salt)}${b64encode(digest)}"
+
+
+def _split_hash(encoded: str) -> Optional[Tuple[str, bytes, bytes]]:
+    """
+    ``(esquema, sal, hash)`` en binario de un hash codificado
+    (``<algoritmo>$<parámetros>$<sal>$<hash>`` o SHA-256 heredado), o None
+    si no se podría reconstruir byte a byte.
+    """
+    if _HEX_DIGEST.match(encoded):
+        return "", b"", bytes.fromhex(encoded)
+    parts = encoded.split("$")
+    if len(parts) != 4:
+        return None
+    algorithm, params, salt, digest = parts
+    try:
+        raw_salt, raw_digest = b64decode(salt), b64decode(digest)
+    except ValueError:
+        return None
+    scheme = f"{algorithm}${params}"
+    if (
+        len(raw_salt) > _MAX_FIELD
+        or len(raw_digest) > _MAX_FIELD
+        or _join_hash(scheme, raw_salt, raw_digest) != encoded
+    ):
+        return None
+    return scheme, raw_salt, raw_digest
+
+
+def encode_users(users: Iterable[UserRecord]) -> bytes:
+    """
+    Serializa usuarios en formato binario columnar (versión 2):
+
+        cabecera | nombres ('\\0' entre ellos) | hashes |
+        código de rol (1 byte por usuario) | tabla de roles (JSON) |
+        datos dispersos (JSON)
+
+    Cada hash ocupa un código de esquema (1 byte; el esquema es
+    ``<algoritmo>$<parámetros>``, o vacío para SHA-256 heredado) seguido
+    de la sal y el hash en crudo, cada uno con su longitud en un byte: un
+    hash scrypt pasa de ~90 caracteres a ~50 bytes. La tabla de esquemas
+    va en la sección dispersa, junto con los hash que no siguen ese
+    formato (código 0) y los ``extra`` no vacíos, indexados por posición.
+    """
+    names: List[str] = []
+    hashes = bytearray()
+    codes = bytearray()
+    role_table = list(ROLES)
+    role_codes = {r: i for i, r in enumerate(role_table)}
+    schemes: List[str] = []
+    scheme_codes: Dict[str, int] = {}
+    other_hashes: Dict[str, str] = {}
+    extras: Dict[str, Dict] = {}
+
+    for i, u in enumerate(users):
+        names.append(u.username)
+        split = _split_hash(u.pw_hash)
+        scheme_code = None
+        if split is not None:
+            scheme_code = scheme_codes.get(split[0])
+            if scheme_code is None and len(schemes) < _MAX_SCHEMES:
+                schemes.append(split[0])
+                scheme_code = scheme_codes[split[0]] = len(schemes)
+        if scheme_code is None:
+            hashes.append(0)
+            other_hashes[str(i)] = u.pw_hash
+        else:
+            _, salt, digest = split
+            hashes.append(scheme_code)
+            hashes.append(len(salt))
+            hashes += salt
+            hashes.append(len(digest))
+            hashes += digest
+        code = role_codes.get(u.role)
+        if code is None:
+            if len(role_table) > 255:
+                raise ValueError("Demasiados roles distintos para el formato binario")
+            code = role_codes[u.role] = len(role_table)
+            role_table.append(u.role)
+        codes.append(code)
+        if u.extra:
+            extras[str(i)] = u.extra
+
+    names_blob = "\0".join(names).encode("utf-8")
+    roles_blob = json.dumps(role_table, separators=(",", ":")).encode("utf-8")
+    sparse_blob = json.dumps(
+        {"schemes": schemes, "hashes": other_hashes, "extra": extras},
+        separators=(",", ":"),
+        ensure_ascii=False,
+    ).encode("utf-8")
+    header = _HEADER.pack(
+        MAGIC, VERSION, len(names), len(names_blob), len(hashes), len(roles_blob), len(sparse_blob)
+    )
+    return b"".join((header, names_blob, bytes(hashes), bytes(codes), roles_blob, sparse_blob))
+
+
+def _digest_hashes(blob: bytes, count: int) -> List[Optional[str]]:
+    """Columna de la versión 1: digests SHA-256 de 32 bytes."""
+    hex_blob = blob.hex()
+    step = 2 * _DIGEST_SIZE
+    return [hex_blob[i:i + step] for i in range(0, step * count, step)]
+
+
+def _scheme_hashes(blob: bytes, count: int, schemes: List[str]) -> List[Optional[str]]:
+    """Columna de la versión 2: esquema, sal y hash de longitud variable."""
+    table = [None, *schemes]
+    hashes: List[Optional[str]] = []
+    pos = 0
+    try:
+        for _ in range(count):
+            code = blob[pos]
+            pos += 1
+            if not code:
+                hashes.append(None)
+                continue
+            n = blob[pos]
+            salt = blob[pos + 1:pos + 1 + n]
+            pos += 1 + n
+            n = blob[pos]
+            digest = blob[pos + 1:pos + 1 + n]
+            pos += 1 + n
+            hashes.append(_join_hash(table[code], salt, digest))
+    except IndexError:
+        raise ValueError("Snapshot binario corrupto") from None
+    if pos != len(blob):
+        raise ValueError("Snapshot binario corrupto")
+    return hashes
+
+
+def decode_users(data: bytes) -> List[UserRecord]:
+    """Operación inversa de ``encode_users``; también lee la versión 1."""
+    if len(data) < _PREFIX.size:
+        raise ValueError("Snapshot binario truncado")
+    magic, version = _PREFIX.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("No es un snapshot binario de usuarios")
+    if version == 1:
+        header = _HEADER_V1
+    elif version == VERSION:
+        header = _HEADER
+    else:
+        raise ValueError(f"Versión de snapshot no soportada: {version}")
+    if len(data) < header.size:
+        raise ValueError("Snapshot binario truncado")
+    if version == 1:
+        _, _, count, n_names, n_roles, n_sparse = header.unpack_from(data)
+        n_hashes = _DIGEST_SIZE * count
+    else:
+        _, _, count, n_names, n_hashes, n_roles, n_sparse = header.unpack_from(data)
+
+    pos = header.size
+    names = data[pos:pos + n_names].decode("utf-8").split("\0") if count else []
+    pos += n_names
+    hash_blob = data[pos:pos + n_hashes]
+    pos += n_hashes
+    codes = data[pos:pos + count]
+    pos += count
+    role_table = json.loads(data[pos:pos + n_roles])
+    pos += n_roles
+    sparse = json.loads(data[pos:pos + n_sparse])
+    if pos + n_sparse != len(data) or len(names) != count:
+        raise ValueError("Snapshot binario corrupto")
+
+    if version == 1:
+        hashes = _digest_hashes(hash_blob, count)
+    else:
+        hashes = _scheme_hashes(hash_blob, count, sparse["schemes"])
+    for i, h in sparse["hashes"].items():
+        hashes[int(i)] = h
+    roles = [role_table[c] for c in codes]
+    extras: List[Optional[Dict]] = [None] * count
+    for i, e in sparse["extra"].items():
+        extras[int(i)] = e
+
+    # Crear cientos de miles de objetos dispara el GC cíclico sin motivo:
+    # ninguno de estos registros forma ciclos.
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return [
+            UserRecord(n, h, r, e or {})
+            for n, h, r, e in zip(names, hashes, roles, extras)
+        ]
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+
+def json_to_binary(json_path: str, bin_path: str) -> int:
+    """Convierte un users.json al formato binario; devuelve nº de usuarios."""
+    with open(json_path, "r", encoding="utf-8") as f:
+        users = [JsonAuthRepository._to_record(u) for u in json.load(f)]
+    tmp = bin_path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(encode_users(users))
+    os.replace(tmp, bin_path)
+    return len(users)
+
+
+def binary_to_json(bin_path: str, json_path: str) -> int:
+    """Convierte un snapshot binario a users.json; devuelve nº de usuarios."""
+    with open(bin_path, "rb") as f:
+        users = decode_users(f.read())
+    tmp = json_path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump([JsonAuthRepository._to_dict(u) for u in users], f, indent=4)
+    os.replace(tmp, json_path)
+    return len(users)
+
+
+class BinaryAuthRepository(JsonAuthRepository):
+    """
+    JsonAuthRepository con el snapshot en formato binario compacto.
+    El journal, los lotes y el bloqueo entre procesos funcionan igual.
+    """
+
+    DEFAULT_DATA_FILE = DATA_FILE
+
+    def _ensure_data_file(self) -> None:
+        folder = os.path.dirname(self._data_file)
+        os.makedirs(folder, exist_ok=True)
+        if not os.path.exists(self._data_file):
+            with open(self._data_file, "wb") as f:
+                f.write(encode_users([]))
+
+    def _load_snapshot(self) -> Optional[Tuple[int, int, int]]:
+        with open(self._data_file, "rb") as f:
+            sig = self._file_sig(f)
+            users = decode_users(f.read())
+        self._users.clear()
+        for u in users:
+            self._users[u.username] = u
+        return sig
+
+    def _save(self) -> None:
+        """Guardado atómico para evitar corrupción de archivo."""
+        tmp = self._data_file + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(encode_users(self._users.values()))
+        os.replace(tmp, self._data_file)
@@ -2,25 +2,101 @@
 # core/adapters/json_auth_repo.py
 import json
 import os
-from typing import Dict, List, Optional
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
 
+try:
+    import fcntl
+except ImportError:  # Windows: sin bloqueo entre procesos
+    fcntl = None
+
+from core.adapters.user_index import SortedUserIndex
 from core.ports.auth_repo import IAuthRepository, UserRecord
 
 DATA_FILE = os.path.join(os.path.dirname(__file__), "..", "data", "users.json")
 DATA_FILE = os.path.normpath(DATA_FILE)
 
+# Mínimo de entradas en el journal antes de reescribir el snapshot.
+COMPACT_THRESHOLD = 1000
+
 
 class JsonAuthRepository(IAuthRepository):
     """
     Implementación de IAuthRepository usando archivo JSON.
     Responsabilidad única: persistir y recuperar usuarios.
+
+    Con ``journal=True`` cada cambio se añade como una línea compacta a
+    ``<data_file>.journal`` en vez de reescribir todo el archivo. Al
+    arrancar se reproduce snapshot + journal, y cuando el journal crece
+    tanto como el número de usuarios se compacta en un snapshot nuevo,
+    de modo que el coste amortizado por escritura es O(1).
+
+    Escrituras agrupadas:
+    - ``with repo.batch():`` aplaza la persistencia hasta salir del bloque
+      (una sola escritura) y deshace los cambios si el bloque falla.
+    - ``commit_interval_ms`` / ``commit_every`` activan el group commit:
+      los cambios sueltos se acumulan y se escriben juntos cada N ms o
+      cada M cambios. Lo que no se haya volcado se pierde si el proceso
+      cae; ``flush()`` / ``close()`` fuerzan la escritura.
+
+    Con ``shared=True`` (por defecto) varios procesos pueden usar el mismo
+    archivo: cada lectura-modificación-escritura se hace bajo un ``flock``
+    sobre ``<data_file>.lock`` y las lecturas toman el mismo bloqueo en modo
+    compartido. La caché en memoria solo se recarga si cambian
+    inodo/tamaño/mtime del snapshot; si solo creció el journal se leen
+    únicamente las líneas nuevas.
+
+    ``list_page`` / ``count`` usan un índice ordenado de nombres (total y
+    por rol) que se construye en la primera consulta paginada y luego se
+    mantiene con cada cambio.
     """
 
-    def __init__(self, data_file: str = DATA_FILE) -> None:
-        self._data_file = data_file
+    # Archivo por defecto; las subclases con otro formato lo redefinen
+    DEFAULT_DATA_FILE = DATA_FILE
+
+    def __init__(
+        self,
+        data_file: Optional[str] = None,
+        journal: bool = False,
+        compact_threshold: int = COMPACT_THRESHOLD,
+        commit_interval_ms: Optional[float] = None,
+        commit_every: Optional[int] = None,
+        shared: bool = True,
+    ) -> None:
+        self._data_file = data_file = data_file or self.DEFAULT_DATA_FILE
+        self._journal_file = data_file + ".journal"
+        self._journal = journal
+        self._compact_threshold = compact_threshold
+        self._journal_entries = 0
         self._users: Dict[str, UserRecord] = {}
+        self._name_index: Optional[SortedUserIndex] = None
+
+        # Estado de escrituras pendientes / lotes
+        self._lock = threading.RLock()
+        self._commit_interval_ms = commit_interval_ms
+        self._commit_every = commit_every
+        self._pending: List[Dict] = []
+        self._timer: Optional[threading.Timer] = None
+        self._batch_depth = 0
+        self._undo: Optional[Dict[str, Optional[UserRecord]]] = None
+
+        # Coordinación entre procesos
+        self._shared = shared and fcntl is not None
+        self._lock_file = data_file + ".lock"
+        self._lock_fd: Optional[int] = None
+        self._flock_depth = 0
+        self._snapshot_sig: Optional[Tuple[int, int, int]] = None
+        self._journal_ino: Optional[int] = None
+        self._journal_offset = 0
+
         self._ensure_data_file()
-        self._load()
+        with self._lock, self._file_lock():
+            self._load()
+            self._truncate_torn_journal()
+            if self._journal_entries and not self._journal:
+                # Journal heredado de una ejecución en modo journal: se consolida.
+                self.compact()
 
     # ----------------- helpers internos -----------------
     def _ensure_data_file(self) -> None:
@@ -30,58 +106,351 @@ class JsonAuthRepository(IAuthRepository):
             with open(self._data_file, "w", encoding="utf-8") as f:
                 json.dump([], f, indent=4)
 
+    @staticmethod
+    def _to_record(u: Dict) -> UserRecord:
+        return UserRecord(
+            username=u["username"],
+            pw_hash=u["pw_hash"],
+            role=u.get("role", "comprador"),
+            extra=u.get("extra") or {},
+        )
+
+    @staticmethod
+    def _to_dict(u: UserRecord) -> Dict:
+        return {
+            "username": u.username,
+            "pw_hash": u.pw_hash,
+            "role": u.role,
+            "extra": u.extra or {},
+        }
+
     def _load(self) -> None:
+        self._name_index = None
+        self._snapshot_sig = self._load_snapshot()
+        self._journal_ino = None
+        self._journal_offset = 0
+        self._journal_entries = self._replay_journal()
+
+    def _load_snapshot(self) -> Optional[Tuple[int, int, int]]:
+        """Carga el snapshot y devuelve la firma del archivo que se leyó."""
+        raw: List[Dict] = []
+        sig = None
         try:
             with open(self._data_file, "r", encoding="utf-8") as f:
+                sig = self._file_sig(f)
                 raw = json.load(f)
         except (FileNotFoundError, json.JSONDecodeError):
-            raw = []
+            pass
 
         self._users.clear()
         for u in raw:
-            self._users[u["username"]] = UserRecord(
-                username=u["username"],
-                pw_hash=u["pw_hash"],
-                role=u.get("role", "comprador"),
-                extra=u.get("extra") or {},
-            )
+            self._users[u["username"]] = self._to_record(u)
+        return sig
+
+    # Operaciones sobre el estado en memoria (las subclases las redefinen)
+    def _exists(self, username: str) -> bool:
+        return username in self._users
+
+    def _count(self) -> int:
+        return len(self._users)
+
+    def _apply_put(self, user: UserRecord) -> None:
+        self._users[user.username] = user
+        self._index_put(user)
+
+    def _apply_delete(self, username: str) -> None:
+        self._users.pop(username, None)
+        self._index_delete(username)
+
+    def _roles(self) -> Iterator[Tuple[str, str]]:
+        """Pares (username, rol) de todos los usuarios, para construir el índice."""
+        return ((u.username, u.role) for u in self._users.values())
+
+    # Índice ordenado (solo si ya se construyó)
+    def _index_put(self, user: UserRecord) -> None:
+        if self._name_index is not None:
+            self._name_index.put(user.username, user.role)
+
+    def _index_delete(self, username: str) -> None:
+        if self._name_index is not None:
+            self._name_index.remove(username)
+
+    def _sorted_index(self) -> SortedUserIndex:
+        if self._name_index is None:
+            self._name_index = SortedUserIndex(self._roles())
+        return self._name_index
+
+    def _apply_entry(self, entry: Dict) -> None:
+        if entry["op"] == "put":
+            self._apply_put(self._to_record(entry["user"]))
+        elif entry["op"] == "del":
+            self._apply_delete(entry["username"])
+
+    def _replay_journal(self) -> int:
+        """
+        Aplica las entradas del journal a partir de ``_journal_offset`` y
+        devuelve cuántas había. Solo consume líneas completas: una línea a
+        medio escribir (caída u otro proceso escribiendo) se deja para luego.
+        """
+        try:
+            f = open(self._journal_file, "rb")
+        except FileNotFoundError:
+            return 0
+
+        applied = 0
+        with f:
+            self._journal_ino = os.fstat(f.fileno()).st_ino
+            f.seek(self._journal_offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    break
+                self._apply_entry(entry)
+                self._journal_offset += len(line)
+                applied += 1
+        return applied
+
+    def _truncate_torn_journal(self) -> None:
+        """Elimina una última línea incompleta (caída a mitad de escritura)."""
+        try:
+            size = os.path.getsize(self._journal_file)
+        except FileNotFoundError:
+            return
+        if size > self._journal_offset:
+            os.truncate(self._journal_file, self._journal_offset)
+
+    def _append_journal(self, entries: List[Dict]) -> None:
+        data = "".join(
+            json.dumps(e, separators=(",", ":"), ensure_ascii=False) + "\n"
+            for e in entries
+        ).encode("utf-8")
+        with open(self._journal_file, "ab") as f:
+            f.write(data)
+            self._journal_ino = os.fstat(f.fileno()).st_ino
+            self._journal_offset = f.tell()
+        self._journal_entries += len(entries)
+        if self._journal_entries >= max(self._compact_threshold, self._count()):
+            self.compact()
+
+    def _remember(self, username: str) -> None:
+        """Dentro de un lote guarda el valor previo para poder deshacerlo."""
+        if self._undo is not None and username not in self._undo:
+            self._undo[username] = self.get(username)
+
+    def _mark_dirty(self, entry: Dict) -> None:
+        self._pending.append(entry)
+
+        if self._batch_depth:
+            return
+        if self._commit_interval_ms is None and self._commit_every is None:
+            self.flush()
+        elif self._commit_every is not None and len(self._pending) >= self._commit_every:
+            self.flush()
+        elif self._commit_interval_ms is not None and self._timer is None:
+            self._timer = threading.Timer(self._commit_interval_ms / 1000.0, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _persist_put(self, user: UserRecord) -> None:
+        self._mark_dirty({"op": "put", "user": self._to_dict(user)})
+
+    def _persist_delete(self, username: str) -> None:
+        self._mark_dirty({"op": "del", "username": username})
+
+    def _cancel_timer(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
 
     def _save(self) -> None:
         """Guardado atómico para evitar corrupción de archivo."""
-        out = [
-            {
-                "username": u.username,
-                "pw_hash": u.pw_hash,
-                "role": u.role,
-                "extra": u.extra or {},
-            }
-            for u in self._users.values()
-        ]
+        out = [self._to_dict(u) for u in self._users.values()]
         tmp = self._data_file + ".tmp"
         with open(tmp, "w", encoding="utf-8") as f:
             json.dump(out, f, indent=4)
         os.replace(tmp, self._data_file)
 
+    # ----------------- coordinación entre procesos -----------------
+    @contextmanager
+    def _file_lock(self, exclusive: bool = True) -> Iterator[None]:
+        """``flock`` reentrante; se debe entrar con ``self._lock`` tomado."""
+        if not self._shared or self._flock_depth:
+            self._flock_depth += 1
+            try:
+                yield
+            finally:
+                self._flock_depth -= 1
+            return
+
+        if self._lock_fd is None:
+            self._lock_fd = os.open(self._lock_file, os.O_RDWR | os.O_CREAT, 0o644)
+        fcntl.flock(self._lock_fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        self._flock_depth = 1
+        try:
+            yield
+        finally:
+            self._flock_depth = 0
+            fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _file_sig(f) -> Tuple[int, int, int]:
+        st = os.fstat(f.fileno())
+        return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+    def _stat_snapshot(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            st = os.stat(self._data_file)
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+    def _refresh(self) -> None:
+        """Recarga la caché solo si otro proceso modificó los archivos."""
+        if not self._shared:
+            return
+        if self._stat_snapshot() != self._snapshot_sig:
+            self._reload()
+            return
+        try:
+            st = os.stat(self._journal_file)
+        except FileNotFoundError:
+            if self._journal_offset:
+                self._reload()
+            return
+        rotated = self._journal_ino is not None and st.st_ino != self._journal_ino
+        if rotated or st.st_size < self._journal_offset:
+            self._reload()
+        elif st.st_size > self._journal_offset:
+            self._journal_entries += self._replay_journal()
+            self._reapply_pending()
+
+    def _reload(self) -> None:
+        self._load()
+        self._reapply_pending()
+
+    def _reapply_pending(self) -> None:
+        # Los cambios propios aún no volcados siguen por encima del disco
+        for entry in self._pending:
+            self._apply_entry(entry)
+
+    # ----------------- persistencia explícita -----------------
+    def flush(self) -> None:
+        """Escribe de inmediato los cambios pendientes (group commit)."""
+        with self._lock:
+            self._cancel_timer()
+            if self._batch_depth or not self._pending:
+                return
+            with self._file_lock():
+                self._refresh()
+                if self._journal:
+                    pending, self._pending = self._pending, []
+                    self._append_journal(pending)
+                else:
+                    self.compact()
+
+    def compact(self) -> None:
+        """Reescribe el snapshot con el estado actual y vacía el journal."""
+        with self._lock, self._file_lock():
+            self._refresh()
+            self._save()
+            # Si caemos antes de borrar el journal, reproducirlo de nuevo es idempotente.
+            if os.path.exists(self._journal_file):
+                os.remove(self._journal_file)
+            self._snapshot_sig = self._stat_snapshot()
+            self._journal_ino = None
+            self._journal_offset = 0
+            self._journal_entries = 0
+            self._pending = []
+
+    def close(self) -> None:
+        self.flush()
+        with self._lock:
+            if self._lock_fd is not None:
+                os.close(self._lock_fd)
+                self._lock_fd = None
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        # El lote retiene el bloqueo de archivo: es atómico frente a otros procesos
+        with self._lock, self._file_lock():
+            outermost = self._batch_depth == 0
+            if outermost:
+                self.flush()
+                self._refresh()
+                self._undo = {}
+            self._batch_depth += 1
+            try:
+                yield
+            except BaseException:
+                self._batch_depth -= 1
+                if outermost:
+                    for username, previous in self._undo.items():
+                        if previous is None:
+                            self._apply_delete(username)
+                        else:
+                            self._apply_put(previous)
+                    self._undo = None
+                    self._pending = []
+                raise
+            self._batch_depth -= 1
+            if outermost:
+                self._undo = None
+                self.flush()
+
     # ----------------- implementación IAuthRepository -----------------
     def get(self, username: str) -> Optional[UserRecord]:
-        return self._users.get(username)
+        with self._lock, self._file_lock(exclusive=False):
+            self._refresh()
+            return self._users.get(username)
 
     def list_all(self) -> List[UserRecord]:
-        return list(self._users.values())
+        with self._lock, self._file_lock(exclusive=False):
+            self._refresh()
+            return list(self._users.values())
+
+    def list_page(
+        self,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        role: Optional[str] = None,
+        prefix: Optional[str] = None,
+        descending: bool = False,
+    ) -> List[UserRecord]:
+        with self._lock, self._file_lock(exclusive=False):
+            self._refresh()
+            names = self._sorted_index().page(offset, limit, role, prefix, descending)
+            return [self.get(name) for name in names]
+
+    def count(self, role: Optional[str] = None, prefix: Optional[str] = None) -> int:
+        with self._lock, self._file_lock(exclusive=False):
+            self._refresh()
+            return self._sorted_index().count(role, prefix)
 
     def add(self, user: UserRecord) -> None:
-        if user.username in self._users:
-            raise ValueError(f"Usuario {user.username} ya existe")
-        self._users[user.username] = user
-        self._save()
+        with self._lock, self._file_lock():
+            self._refresh()
+            if self._exists(user.username):
+                raise ValueError(f"Usuario {user.username} ya existe")
+            self._remember(user.username)
+            self._apply_put(user)
+            self._persist_put(user)
 
     def update(self, user: UserRecord) -> None:
-        if user.username not in self._users:
-            raise KeyError(f"Usuario {user.username} no existe")
-        self._users[user.username] = user
-        self._save()
+        with self._lock, self._file_lock():
+            self._refresh()
+            if not self._exists(user.username):
+                raise KeyError(f"Usuario {user.username} no existe")
+            self._remember(user.username)
+            self._apply_put(user)
+            self._persist_put(user)
 
     def delete(self, username: str) -> None:
-        if username in self._users:
-            del self._users[username]
-            self._save()
+        with self._lock, self._file_lock():
+            self._refresh()
+            if self._exists(username):
+                self._remember(username)
+                self._apply_delete(username)
+                self._persist_delete(username)
@@ -0,0 +1,232 @@
+# core/adapters/lazy_json_auth_repo.py
+import json
+import mmap
+import os
+import re
+from collections import OrderedDict
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from core.adapters.json_auth_repo import DATA_FILE, COMPACT_THRESHOLD, JsonAuthRepository
+from core.ports.auth_repo import UserRecord
+
+# Registros materializados que se mantienen en memoria (LRU).
+CACHE_SIZE = 4096
+
+# Formato que escribe este repositorio (json.dump con indent=4 o el snapshot
+# en streaming): cada usuario empieza en su propia línea con "username" primero.
+_OBJ_START = re.compile(rb"\n {0,4}\{")
+_OBJ_USERNAME = re.compile(rb'\n {0,4}(\{)\s*"username"\s*:\s*"((?:[^"\\]|\\.)*)"')
+
+# Formato arbitrario: cadenas (con ":" si son claves) y llaves/corchetes.
+_TOKEN = re.compile(rb'("(?:[^"\\]|\\.)*")(\s*:)?|[\[\]{}]')
+_USERNAME_KEY = b'"username"'
+
+
+class LazyJsonAuthRepository(JsonAuthRepository):
+    """
+    Variante de JsonAuthRepository para archivos de usuarios grandes.
+
+    Al arrancar solo construye un índice ``username -> (inicio, fin)`` en
+    bytes sin crear objetos por usuario: con expresiones regulares si el
+    archivo tiene el formato que escribe este repositorio, y con un
+    tokenizador en otro caso. Cada ``UserRecord`` se lee del disco en el primer
+    ``get()`` y queda en un LRU de ``cache_size`` registros; los cambios
+    viven en memoria hasta el siguiente snapshot, que se escribe en
+    streaming copiando los objetos sin tocar tal cual.
+    """
+
+    def __init__(
+        self,
+        data_file: str = DATA_FILE,
+        journal: bool = False,
+        compact_threshold: int = COMPACT_THRESHOLD,
+        commit_interval_ms: Optional[float] = None,
+        commit_every: Optional[int] = None,
+        shared: bool = True,
+        cache_size: int = CACHE_SIZE,
+    ) -> None:
+        self._index: Dict[str, Tuple[int, int]] = {}
+        self._deleted: Set[str] = set()
+        self._cache: "OrderedDict[str, UserRecord]" = OrderedDict()
+        self._cache_size = cache_size
+        super().__init__(
+            data_file,
+            journal=journal,
+            compact_threshold=compact_threshold,
+            commit_interval_ms=commit_interval_ms,
+            commit_every=commit_every,
+            shared=shared,
+        )
+
+    # ----------------- índice del snapshot -----------------
+    def _load_snapshot(self) -> Optional[Tuple[int, int, int]]:
+        # ``_users`` solo guarda los cambios posteriores al snapshot
+        self._users.clear()
+        self._deleted.clear()
+        self._cache.clear()
+        with open(self._data_file, "rb") as f:
+            sig = self._file_sig(f)
+            self._index = self._build_index(f) if sig[1] else {}
+        return sig
+
+    def _build_index(self, f) -> Dict[str, Tuple[int, int]]:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            index = self._fast_index(mm)
+            if index is None:
+                index = self._scan_index(mm)
+        return index
+
+    @staticmethod
+    def _fast_index(mm: mmap.mmap) -> Optional[Dict[str, Tuple[int, int]]]:
+        """Índice por expresiones regulares; None si el archivo no tiene el formato esperado."""
+        matches = list(_OBJ_USERNAME.finditer(mm))
+        if len(matches) != sum(1 for _ in _OBJ_START.finditer(mm)):
+            return None
+
+        index: Dict[str, Tuple[int, int]] = {}
+        limits = [m.start() for m in matches[1:]]
+        limits.append(len(mm))
+        for m, limit in zip(matches, limits):
+            raw = m.group(2)
+            name = json.loads(b'"' + raw + b'"') if b"\\" in raw else raw.decode("utf-8")
+            start = m.start(1)
+            index[name] = (start, mm.rfind(b"}", start, limit) + 1)
+        return index
+
+    @staticmethod
+    def _scan_index(mm: mmap.mmap) -> Dict[str, Tuple[int, int]]:
+        """Recorrido completo con tokenizador, válido para cualquier JSON."""
+        index: Dict[str, Tuple[int, int]] = {}
+        depth = 0
+        start = 0
+        username: Optional[str] = None
+        want_username = False
+        for m in _TOKEN.finditer(mm):
+            tok = m.group(1)
+            if tok is not None:
+                if depth == 2:
+                    if want_username and not m.group(2):
+                        username = json.loads(tok)
+                    want_username = m.group(2) is not None and tok == _USERNAME_KEY
+                continue
+            ch = m.group(0)
+            if ch in (b"{", b"["):
+                depth += 1
+                if depth == 2 and ch == b"{":
+                    start, username = m.start(), None
+            else:
+                depth -= 1
+                if depth == 1 and ch == b"}" and username is not None:
+                    index[username] = (start, m.end())
+        return index
+
+    def _read_raw(self, username: str) -> UserRecord:
+        start, end = self._index[username]
+        with open(self._data_file, "rb") as f:
+            f.seek(start)
+            return self._to_record(json.loads(f.read(end - start)))
+
+    # ----------------- estado en memoria -----------------
+    def _exists(self, username: str) -> bool:
+        if username in self._users:
+            return True
+        return username in self._index and username not in self._deleted
+
+    def _count(self) -> int:
+        added = sum(1 for name in self._users if name not in self._index)
+        return len(self._index) - len(self._deleted) + added
+
+    def _apply_put(self, user: UserRecord) -> None:
+        self._users[user.username] = user
+        self._deleted.discard(user.username)
+        self._cache.pop(user.username, None)
+        self._index_put(user)
+
+    def _apply_delete(self, username: str) -> None:
+        self._users.pop(username, None)
+        self._cache.pop(username, None)
+        if username in self._index:
+            self._deleted.add(username)
+        self._index_delete(username)
+
+    def _roles(self) -> Iterator[Tuple[str, str]]:
+        # El rol no está en el índice de offsets: hay que leer cada objeto (una vez)
+        with open(self._data_file, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                for name in self._usernames():
+                    user = self._users.get(name) or self._cache.get(name)
+                    if user is not None:
+                        yield name, user.role
+                    else:
+                        start, end = self._index[name]
+                        yield name, json.loads(mm[start:end]).get("role", "comprador")
+
+    def _usernames(self) -> Iterator[str]:
+        for name in self._index:
+            if name not in self._deleted and name not in self._users:
+                yield name
+        yield from self._users
+
+    # ----------------- snapshot en streaming -----------------
+    def _save(self) -> None:
+        """Reescribe el snapshot copiando en bruto los usuarios no modificados."""
+        new_index: Dict[str, Tuple[int, int]] = {}
+        tmp = self._data_file + ".tmp"
+        with open(self._data_file, "rb") as src, open(tmp, "wb") as dst:
+            pos = dst.write(b"[")
+            sep = b"\n"
+            for name, (start, end) in self._index.items():
+                if name in self._deleted or name in self._users:
+                    continue
+                src.seek(start)
+                pos += dst.write(sep)
+                new_index[name] = (pos, pos + end - start)
+                pos += dst.write(src.read(end - start))
+                sep = b",\n"
+            for user in self._users.values():
+                data = json.dumps(self._to_dict(user), ensure_ascii=False).encode("utf-8")
+                pos += dst.write(sep)
+                new_index[user.username] = (pos, pos + len(data))
+                pos += dst.write(data)
+                sep = b",\n"
+            dst.write(b"\n]")
+        os.replace(tmp, self._data_file)
+
+        # Los registros modificados pasan al LRU: siguen siendo "calientes"
+        for user in self._users.values():
+            self._remember_hot(user)
+        self._index = new_index
+        self._users.clear()
+        self._deleted.clear()
+
+    def _remember_hot(self, user: UserRecord) -> None:
+        self._cache[user.username] = user
+        self._cache.move_to_end(user.username)
+        if len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+
+    # ----------------- implementación IAuthRepository -----------------
+    def get(self, username: str) -> Optional[UserRecord]:
+        # Bloqueo compartido: ningún otro proceso reemplaza el archivo mientras
+        # leemos un rango de bytes de nuestro índice.
+        with self._lock, self._file_lock(exclusive=False):
+            self._refresh()
+            user = self._users.get(username)
+            if user is not None:
+                return user
+            if username in self._deleted or username not in self._index:
+                return None
+
+            user = self._cache.get(username)
+            if user is not None:
+                self._cache.move_to_end(username)
+                return user
+
+            user = self._read_raw(username)
+            self._remember_hot(user)
+            return user
+
+    def list_all(self) -> List[UserRecord]:
+        with self._lock, self._file_lock(exclusive=False):
+            self._refresh()
+            return [self.get(name) for name in self._usernames()]
@@ -0,0 +1,229 @@
+# core/adapters/mmap_auth_repo.py
+import contextlib
+import json
+import mmap
+import os
+import struct
+from array import array
+from bisect import bisect_left
+from typing import ContextManager, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from core.adapters.user_index import page_bounds
+from core.ports.auth_repo import IAuthRepository, UserRecord
+
+INDEX_FILE = os.path.join(os.path.dirname(__file__), "..", "data", "users.idx")
+INDEX_FILE = os.path.normpath(INDEX_FILE)
+
+MAGIC = b"USRI"
+VERSION = 1
+
+# magic, versión, nº usuarios, ancho nombre, ancho hash, bytes tabla de roles
+_HEADER = struct.Struct("<4sBIHHI")
+# código de rol, offset y longitud del extra (JSON) en la zona final
+_TAIL = struct.Struct("<BQI")
+
+
+def build_user_index(users: Iterable[UserRecord], index_file: str = INDEX_FILE) -> int:
+    """
+    Genera el índice de solo lectura: registros de ancho fijo ordenados por
+    username (nombre y hash rellenos con ``\\0``), seguidos de los ``extra``
+    no vacíos en JSON. Se escribe de forma atómica; devuelve nº de usuarios.
+    """
+    rows = sorted(
+        ((u.username.encode("utf-8"), u.pw_hash.encode("utf-8"), u.role, u.extra) for u in users),
+        key=lambda r: r[0],
+    )
+    name_width = max((len(r[0]) for r in rows), default=1)
+    hash_width = max((len(r[1]) for r in rows), default=1)
+    roles = sorted({r[2] for r in rows})
+    if len(roles) > 256:
+        raise ValueError("Demasiados roles distintos para el índice")
+    role_codes = {r: i for i, r in enumerate(roles)}
+    roles_blob = json.dumps(roles, separators=(",", ":")).encode("utf-8")
+
+    record_size = name_width + hash_width + _TAIL.size
+    extras_start = _HEADER.size + len(roles_blob) + record_size * len(rows)
+    records = bytearray()
+    extras = bytearray()
+    for name, pw_hash, role, extra in rows:
+        blob = json.dumps(extra, separators=(",", ":"), ensure_ascii=False).encode("utf-8") if extra else b""
+        records += name.ljust(name_width, b"\0")
+        records += pw_hash.ljust(hash_width, b"\0")
+        records += _TAIL.pack(role_codes[role], extras_start + len(extras), len(blob))
+        extras += blob
+
+    header = _HEADER.pack(MAGIC, VERSION, len(rows), name_width, hash_width, len(roles_blob))
+    tmp = index_file + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(header)
+        f.write(roles_blob)
+        f.write(records)
+        f.write(extras)
+    os.replace(tmp, index_file)
+    return len(rows)
+
+
+class MmapAuthRepository(IAuthRepository):
+    """
+    Repositorio de solo lectura sobre un índice generado con
+    ``build_user_index`` (pensado para kioscos de login).
+
+    El archivo se proyecta con ``mmap`` y ``get()`` hace búsqueda binaria
+    directamente sobre las páginas: el arranque no depende del número de
+    usuarios y todos los procesos comparten la misma caché de páginas del
+    sistema. Si el índice se regenera, se vuelve a proyectar en la
+    siguiente consulta.
+
+    Como los registros ya están ordenados, ``list_page`` filtra por prefijo
+    con bisección; el filtro por rol usa una lista de posiciones por rol
+    que se calcula la primera vez que se pide.
+    """
+
+    def __init__(self, index_file: str = INDEX_FILE) -> None:
+        self._index_file = index_file
+        self._mm: Optional[mmap.mmap] = None
+        self._sig: Optional[Tuple[int, int, int]] = None
+        self._open()
+
+    # ----------------- helpers internos -----------------
+    def _stat(self) -> Tuple[int, int, int]:
+        st = os.stat(self._index_file)
+        return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+    def _open(self) -> None:
+        with open(self._index_file, "rb") as f:
+            sig = os.fstat(f.fileno())
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, count, name_w, hash_w, n_roles = _HEADER.unpack_from(mm)
+        if magic != MAGIC:
+            mm.close()
+            raise ValueError("No es un índice de usuarios")
+        if version != VERSION:
+            mm.close()
+            raise ValueError(f"Versión de índice no soportada: {version}")
+
+        if self._mm is not None:
+            self._mm.close()
+        self._mm = mm
+        self._sig = (sig.st_ino, sig.st_size, sig.st_mtime_ns)
+        self._count = count
+        self._name_w = name_w
+        self._hash_w = hash_w
+        self._roles = json.loads(mm[_HEADER.size:_HEADER.size + n_roles])
+        self._records_start = _HEADER.size + n_roles
+        self._record_size = name_w + hash_w + _TAIL.size
+        self._role_rows: Dict[int, array] = {}
+
+    def _refresh(self) -> None:
+        if self._stat() != self._sig:
+            self._open()
+
+    def _record(self, i: int) -> UserRecord:
+        mm = self._mm
+        off = self._records_start + i * self._record_size
+        name = mm[off:off + self._name_w].rstrip(b"\0").decode("utf-8")
+        off += self._name_w
+        pw_hash = mm[off:off + self._hash_w].rstrip(b"\0").decode("utf-8")
+        role, extra_off, extra_len = _TAIL.unpack_from(mm, off + self._hash_w)
+        extra = json.loads(mm[extra_off:extra_off + extra_len]) if extra_len else {}
+        return UserRecord(username=name, pw_hash=pw_hash, role=self._roles[role], extra=extra)
+
+    def _find(self, username: str) -> int:
+        key = username.encode("utf-8")
+        if len(key) > self._name_w:
+            return -1
+        key = key.ljust(self._name_w, b"\0")
+        mm = self._mm
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            off = self._records_start + mid * self._record_size
+            if mm[off:off + self._name_w] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self._count:
+            off = self._records_start + lo * self._record_size
+            if mm[off:off + self._name_w] == key:
+                return lo
+        return -1
+
+    def _name_at(self, i: int) -> bytes:
+        off = self._records_start + i * self._record_size
+        return self._mm[off:off + self._name_w]
+
+    def _rows_for_role(self, role: str) -> Sequence[int]:
+        """Posiciones (ordenadas) de los registros con ese rol."""
+        try:
+            code = self._roles.index(role)
+        except ValueError:
+            return ()
+        if not self._role_rows:
+            role_off = self._records_start + self._name_w + self._hash_w
+            rows: Dict[int, array] = {c: array("I") for c in range(len(self._roles))}
+            for i in range(self._count):
+                rows[self._mm[role_off + i * self._record_size]].append(i)
+            self._role_rows = rows
+        return self._role_rows[code]
+
+    def _select(self, role: Optional[str], prefix: Optional[str]) -> Tuple[Sequence[int], int, int]:
+        """Filas candidatas y rango ``[inicio, fin)`` dentro de ellas que cumple el prefijo."""
+        rows: Sequence[int] = range(self._count) if role is None else self._rows_for_role(role)
+        if not prefix:
+            return rows, 0, len(rows)
+        key = prefix.encode("utf-8")
+        if len(key) > self._name_w:
+            return rows, 0, 0
+        # 0xFF no aparece en UTF-8: ``key + b"\xff"`` es mayor que cualquier nombre con ese prefijo
+        start = bisect_left(rows, key.ljust(self._name_w, b"\0"), key=self._name_at)
+        end = bisect_left(rows, key + b"\xff", start, key=self._name_at)
+        return rows, start, end
+
+    def close(self) -> None:
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+
+    # ----------------- implementación IAuthRepository -----------------
+    def get(self, username: str) -> Optional[UserRecord]:
+        self._refresh()
+        i = self._find(username)
+        return self._record(i) if i >= 0 else None
+
+    def list_all(self) -> List[UserRecord]:
+        self._refresh()
+        return [self._record(i) for i in range(self._count)]
+
+    def list_page(
+        self,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        role: Optional[str] = None,
+        prefix: Optional[str] = None,
+        descending: bool = False,
+    ) -> List[UserRecord]:
+        self._refresh()
+        rows, start, end = self._select(role, prefix)
+        first, stop = page_bounds(start, end, offset, limit, descending)
+        page = [self._record(rows[i]) for i in range(first, stop)]
+        if descending:
+            page.reverse()
+        return page
+
+    def count(self, role: Optional[str] = None, prefix: Optional[str] = None) -> int:
+        self._refresh()
+        _, start, end = self._select(role, prefix)
+        return end - start
+
+    def add(self, user: UserRecord) -> None:
+        raise PermissionError("Repositorio de usuarios de solo lectura")
+
+    def update(self, user: UserRecord) -> None:
+        raise PermissionError("Repositorio de usuarios de solo lectura")
+
+    def delete(self, username: str) -> None:
+        raise PermissionError("Repositorio de usuarios de solo lectura")
+
+    def batch(self) -> ContextManager[None]:
+        return contextlib.nullcontext()
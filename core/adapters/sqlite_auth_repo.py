@@ -0,0 +1,392 @@
+# core/adapters/sqlite_auth_repo.py
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Iterator, List, Optional, Tuple
+
+from core.bloom import BloomStats, CountingBloomFilter
+from core.ports.auth_repo import IAuthRepository, UserRecord
+
+DB_FILE = os.path.join(os.path.dirname(__file__), "..", "data", "users.db")
+DB_FILE = os.path.normpath(DB_FILE)
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS users (
+        username TEXT PRIMARY KEY,
+        pw_hash  TEXT NOT NULL,
+        role     TEXT NOT NULL,
+        extra    TEXT NOT NULL DEFAULT '{}'
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_users_role ON users(role)",
+    # Contador de altas/bajas (cada transacción suma las suyas, con o sin
+    # filtro): permite saber si el filtro de Bloom de un proceso sigue al día.
+    """
+    CREATE TABLE IF NOT EXISTS users_meta (
+        id      INTEGER PRIMARY KEY CHECK (id = 0),
+        changes INTEGER NOT NULL
+    )
+    """,
+    "INSERT OR IGNORE INTO users_meta (id, changes) VALUES (0, 0)",
+)
+
+# Sentencias fijas: sqlite3 las mantiene preparadas en la caché de cada conexión.
+_SQL_GET = "SELECT username, pw_hash, role, extra FROM users WHERE username = ?"
+_SQL_ALL = "SELECT username, pw_hash, role, extra FROM users ORDER BY username"
+_SQL_INSERT = "INSERT INTO users (username, pw_hash, role, extra) VALUES (?, ?, ?, ?)"
+_SQL_UPDATE = "UPDATE users SET pw_hash = ?, role = ?, extra = ? WHERE username = ?"
+_SQL_DELETE = "DELETE FROM users WHERE username = ?"
+_SQL_NAMES = "SELECT username FROM users"
+# Mayor que cualquier carácter: ``prefix + _MAX_CHAR`` acota el rango del prefijo.
+_MAX_CHAR = "\U0010ffff"
+_SQL_CHANGES = "SELECT changes FROM users_meta WHERE id = 0"
+_SQL_BUMP = "UPDATE users_meta SET changes = changes + ? WHERE id = 0"
+
+
+class SqliteAuthRepository(IAuthRepository):
+    """
+    Implementación de IAuthRepository sobre SQLite (modo WAL).
+    Los usuarios no se cargan en memoria: cada consulta va por el índice
+    de ``username``. Cada hilo reutiliza su propia conexión y varios
+    procesos pueden compartir el mismo archivo. ``batch()`` agrupa las
+    escrituras del hilo en una única transacción.
+
+    Con ``bloom_filter=True`` se mantiene en memoria un filtro de Bloom
+    con los nombres existentes: ``get()`` de un nombre que el filtro
+    descarta responde None sin consultar la base. El filtro se construye
+    al abrir (O(n)), se actualiza en ``add``/``delete`` y se reconstruye
+    si el contador de altas/bajas de ``users_meta`` no cuadra con las
+    escrituras propias (otro proceso escribió). Leer ese contador cuesta
+    tanto como la consulta, así que se comprueba como mucho cada
+    ``bloom_recheck_ms``: un alta hecha por otro proceso puede tardar ese
+    tiempo en verse (0 = comprobar siempre).
+    """
+
+    def __init__(
+        self,
+        db_file: str = DB_FILE,
+        timeout: float = 5.0,
+        bloom_filter: bool = False,
+        bloom_capacity: int = 10_000,
+        bloom_error_rate: float = 0.01,
+        bloom_recheck_ms: float = 50.0,
+    ) -> None:
+        self._db_file = db_file
+        self._timeout = timeout
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._pool_lock = threading.Lock()
+        os.makedirs(os.path.dirname(self._db_file) or ".", exist_ok=True)
+        self._init_schema()
+
+        # Caché negativa (opcional)
+        self._bloom: Optional[CountingBloomFilter] = None
+        self._bloom_capacity = bloom_capacity
+        self._bloom_error_rate = bloom_error_rate
+        self._bloom_recheck = bloom_recheck_ms / 1000.0
+        self._bloom_lock = threading.Lock()
+        self._bloom_conn: Optional[sqlite3.Connection] = None
+        self._bloom_expected = 0
+        self._bloom_checked_at = 0.0
+        self._inflight: Counter = Counter()
+        self._lookups = 0
+        self._avoided = 0
+        self._false_positives = 0
+        if bloom_filter:
+            with self._bloom_lock:
+                self._rebuild_bloom()
+
+    # ----------------- helpers internos -----------------
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self._db_file,
+            timeout=self._timeout,
+            check_same_thread=False,
+            cached_statements=64,
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        with self._pool_lock:
+            self._connections.append(conn)
+        return conn
+
+    def _conn(self) -> sqlite3.Connection:
+        """Conexión del hilo actual (se crea la primera vez)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+        return conn
+
+    def _init_schema(self) -> None:
+        conn = self._conn()
+        with conn:
+            for stmt in _SCHEMA:
+                conn.execute(stmt)
+
+    @staticmethod
+    def _to_record(row) -> UserRecord:
+        return UserRecord(
+            username=row[0],
+            pw_hash=row[1],
+            role=row[2],
+            extra=json.loads(row[3]) if row[3] else {},
+        )
+
+    @staticmethod
+    def _dump_extra(user: UserRecord) -> str:
+        return json.dumps(user.extra or {}, separators=(",", ":"), ensure_ascii=False)
+
+    @contextmanager
+    def _write(self) -> Iterator[sqlite3.Connection]:
+        """Transacción corta, salvo que ya estemos dentro de ``batch()``."""
+        conn = self._conn()
+        if getattr(self._local, "batch_depth", 0):
+            yield conn
+            return
+        try:
+            yield conn
+        except BaseException:
+            self._rollback(conn)
+            raise
+        self._commit(conn)
+
+    def _commit(self, conn: sqlite3.Connection) -> None:
+        delta = getattr(self._local, "delta", 0)
+        self._local.delta = 0
+        if delta:
+            conn.execute(_SQL_BUMP, (delta,))
+        if self._bloom is None:
+            conn.commit()
+            return
+        # Confirmación y contabilidad del filtro son atómicas frente a las comprobaciones
+        with self._bloom_lock:
+            conn.commit()
+            self._settle_bloom(delta)
+
+    def _rollback(self, conn: sqlite3.Connection) -> None:
+        conn.rollback()
+        self._local.delta = 0
+        if self._bloom is not None:
+            with self._bloom_lock:
+                self._settle_bloom(0)
+
+    def _pending_list(self, name: str) -> List[str]:
+        items = getattr(self._local, name, None)
+        if items is None:
+            items = []
+            setattr(self._local, name, items)
+        return items
+
+    def _count_change(self, removed: Optional[str] = None) -> None:
+        """Anota un alta/baja efectiva de este hilo; las bajas salen del filtro al confirmar."""
+        self._local.delta = getattr(self._local, "delta", 0) + 1
+        if removed is not None and self._bloom is not None:
+            self._pending_list("bloom_removed").append(removed)
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        conn = self._conn()
+        depth = getattr(self._local, "batch_depth", 0)
+        if depth == 0:
+            conn.execute("BEGIN IMMEDIATE")
+        self._local.batch_depth = depth + 1
+        try:
+            yield
+        except BaseException:
+            self._local.batch_depth = depth
+            if depth == 0:
+                self._rollback(conn)
+            raise
+        self._local.batch_depth = depth
+        if depth == 0:
+            self._commit(conn)
+
+    # ----------------- caché negativa (filtro de Bloom) -----------------
+    # Todo lo que sigue se llama con ``_bloom_lock`` tomado salvo que se indique.
+    def _bloom_db(self) -> sqlite3.Connection:
+        # Conexión propia del filtro: nunca escribe, así que solo ve datos confirmados
+        if self._bloom_conn is None:
+            self._bloom_conn = self._connect()
+        return self._bloom_conn
+
+    def _meta_changes(self) -> int:
+        return self._bloom_db().execute(_SQL_CHANGES).fetchone()[0]
+
+    def _rebuild_bloom(self) -> None:
+        conn = self._bloom_db()
+        conn.execute("BEGIN")
+        try:
+            changes = conn.execute(_SQL_CHANGES).fetchone()[0]
+            names = [row[0] for row in conn.execute(_SQL_NAMES)]
+        finally:
+            conn.commit()
+        bloom = CountingBloomFilter(
+            max(self._bloom_capacity, 2 * len(names)), self._bloom_error_rate
+        )
+        bloom.update(names)
+        # Altas propias aún sin confirmar: esta conexión todavía no las ve
+        bloom.update(self._inflight)
+        self._bloom = bloom
+        self._bloom_expected = changes
+        self._bloom_checked_at = time.monotonic()
+
+    def _bloom_rejects(self, username: str) -> bool:
+        """True si el filtro garantiza que ``username`` no existe (toma el lock)."""
+        with self._bloom_lock:
+            self._lookups += 1
+            if username in self._bloom:
+                return False
+            now = time.monotonic()
+            if now - self._bloom_checked_at >= self._bloom_recheck:
+                self._bloom_checked_at = now
+                if self._meta_changes() != self._bloom_expected:
+                    self._rebuild_bloom()
+                    if username in self._bloom:
+                        return False
+            self._avoided += 1
+            return True
+
+    def _bloom_put(self, username: str) -> None:
+        """Se añade ANTES de insertar: nunca hay una fila que el filtro no cubra (toma el lock)."""
+        if self._bloom is None:
+            return
+        with self._bloom_lock:
+            self._bloom.add(username)
+            self._inflight[username] += 1
+        self._pending_list("bloom_added").append(username)
+
+    def _settle_bloom(self, delta: int) -> None:
+        """Tras confirmar (``delta`` altas/bajas) o deshacer (``delta=0``)."""
+        added = getattr(self._local, "bloom_added", [])
+        removed = getattr(self._local, "bloom_removed", [])
+        self._local.bloom_added = []
+        self._local.bloom_removed = []
+        for username in added:
+            self._inflight[username] -= 1
+            if not self._inflight[username]:
+                del self._inflight[username]
+        if not self._inflight:
+            # Un dict vaciado no encoge: tras un lote grande se recrea
+            self._inflight = Counter()
+        if not delta:
+            # Una alta deshecha solo deja un falso positivo
+            return
+        if self._meta_changes() != self._bloom_expected + delta:
+            # Otro proceso escribió entretanto: el filtro no es fiable
+            self._rebuild_bloom()
+            return
+        for username in removed:
+            self._bloom.remove(username)
+        self._bloom_expected += delta
+        if len(self._bloom) > self._bloom.capacity:
+            # Por encima de la capacidad la tasa de falsos positivos se dispara
+            self._rebuild_bloom()
+
+    @property
+    def negative_cache(self) -> Optional[CountingBloomFilter]:
+        return self._bloom
+
+    def bloom_stats(self) -> Optional[BloomStats]:
+        """Métricas del filtro (None si no está activado)."""
+        bloom = self._bloom
+        if bloom is None:
+            return None
+        with self._bloom_lock:
+            return BloomStats(
+                items=len(bloom),
+                capacity=bloom.capacity,
+                estimated_fp_rate=bloom.false_positive_rate(),
+                lookups=self._lookups,
+                avoided_lookups=self._avoided,
+                false_positives=self._false_positives,
+            )
+
+    def close(self) -> None:
+        """Cierra todas las conexiones abiertas por el repositorio."""
+        with self._pool_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
+        self._bloom_conn = None
+
+    # ----------------- implementación IAuthRepository -----------------
+    def get(self, username: str) -> Optional[UserRecord]:
+        if self._bloom is not None and self._bloom_rejects(username):
+            return None
+        row = self._conn().execute(_SQL_GET, (username,)).fetchone()
+        if row is None:
+            if self._bloom is not None:
+                with self._bloom_lock:
+                    self._false_positives += 1
+            return None
+        return self._to_record(row)
+
+    def list_all(self) -> List[UserRecord]:
+        return [self._to_record(r) for r in self._conn().execute(_SQL_ALL)]
+
+    @staticmethod
+    def _filters(role: Optional[str], prefix: Optional[str]) -> Tuple[str, list]:
+        # Prefijo como rango sobre la clave primaria (LIKE no usaría el índice)
+        clauses, params = [], []
+        if role is not None:
+            clauses.append("role = ?")
+            params.append(role)
+        if prefix:
+            clauses.append("username >= ? AND username < ?")
+            params += [prefix, prefix + _MAX_CHAR]
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def list_page(
+        self,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        role: Optional[str] = None,
+        prefix: Optional[str] = None,
+        descending: bool = False,
+    ) -> List[UserRecord]:
+        # Con rol, idx_users_role ya está ordenado por (role, username)
+        where, params = self._filters(role, prefix)
+        order = "DESC" if descending else "ASC"
+        sql = (
+            "SELECT username, pw_hash, role, extra FROM users"
+            f"{where} ORDER BY username {order} LIMIT ? OFFSET ?"
+        )
+        params += [-1 if limit is None else limit, offset]
+        return [self._to_record(r) for r in self._conn().execute(sql, params)]
+
+    def count(self, role: Optional[str] = None, prefix: Optional[str] = None) -> int:
+        where, params = self._filters(role, prefix)
+        return self._conn().execute(f"SELECT COUNT(*) FROM users{where}", params).fetchone()[0]
+
+    def add(self, user: UserRecord) -> None:
+        self._bloom_put(user.username)
+        try:
+            with self._write() as conn:
+                conn.execute(
+                    _SQL_INSERT,
+                    (user.username, user.pw_hash, user.role, self._dump_extra(user)),
+                )
+                self._count_change()
+        except sqlite3.IntegrityError:
+            raise ValueError(f"Usuario {user.username} ya existe")
+
+    def update(self, user: UserRecord) -> None:
+        with self._write() as conn:
+            cur = conn.execute(
+                _SQL_UPDATE,
+                (user.pw_hash, user.role, self._dump_extra(user), user.username),
+            )
+        if cur.rowcount == 0:
+            raise KeyError(f"Usuario {user.username} no existe")
+
+    def delete(self, username: str) -> None:
+        with self._write() as conn:
+            if conn.execute(_SQL_DELETE, (username,)).rowcount:
+                self._count_change(removed=username)
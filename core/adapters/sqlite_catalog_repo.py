@@ -0,0 +1,252 @@
+# core/adapters/sqlite_catalog_repo.py
+import json
+import os
+import sqlite3
+import sys
+import threading
+from contextlib import contextmanager
+from dataclasses import asdict
+from typing import Any, Iterable, Iterator, List, Optional
+
+from core.models import Repuesto, Seguro, Vehiculo
+from core.ports.catalog_repo import ICatalogRepository
+
+DB_FILE = os.path.join(os.path.dirname(__file__), "..", "data", "catalog.db")
+DB_FILE = os.path.normpath(DB_FILE)
+
+# Instantánea para el arranque en caliente de CatalogService
+SNAPSHOT_FILE = os.path.join(os.path.dirname(__file__), "..", "data", "catalog.snapshot")
+SNAPSHOT_FILE = os.path.normpath(SNAPSHOT_FILE)
+
+# Tipo de servicio guardado en ``services.kind`` -> clase del modelo
+SERVICE_KINDS = {"repuesto": Repuesto, "seguro": Seguro}
+_KIND_OF = {cls: kind for kind, cls in SERVICE_KINDS.items()}
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS vehicles (
+        id                 TEXT PRIMARY KEY,
+        marca              TEXT NOT NULL,
+        modelo             TEXT NOT NULL,
+        precio             REAL NOT NULL,
+        garantia_meses     INTEGER NOT NULL,
+        mantenimiento_tipo TEXT NOT NULL,
+        descripcion        TEXT NOT NULL DEFAULT ''
+    ) WITHOUT ROWID
+    """,
+    # Con rowid: conserva el orden de alta de los servicios
+    """
+    CREATE TABLE IF NOT EXISTS services (
+        id   TEXT NOT NULL UNIQUE,
+        kind TEXT NOT NULL,
+        data TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS catalog_meta (
+        id      INTEGER PRIMARY KEY CHECK (id = 0),
+        version INTEGER NOT NULL
+    )
+    """,
+    "INSERT OR IGNORE INTO catalog_meta (id, version) VALUES (0, 0)",
+)
+
+_VEHICLE_COLUMNS = "id, marca, modelo, precio, garantia_meses, mantenimiento_tipo, descripcion"
+_SQL_GET_VEHICLE = f"SELECT {_VEHICLE_COLUMNS} FROM vehicles WHERE id = ?"
+_SQL_ALL_VEHICLES = f"SELECT {_VEHICLE_COLUMNS} FROM vehicles ORDER BY id"
+_SQL_UPSERT_VEHICLE = f"INSERT OR REPLACE INTO vehicles ({_VEHICLE_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)"
+_SQL_DELETE_VEHICLE = "DELETE FROM vehicles WHERE id = ?"
+_SQL_GET_SERVICE = "SELECT kind, data FROM services WHERE id = ?"
+_SQL_ALL_SERVICES = "SELECT kind, data FROM services ORDER BY rowid"
+# ON CONFLICT ... UPDATE (y no REPLACE) para no cambiar el rowid: el orden de alta se mantiene
+_SQL_UPSERT_SERVICE = (
+    "INSERT INTO services (id, kind, data) VALUES (?, ?, ?) "
+    "ON CONFLICT(id) DO UPDATE SET kind = excluded.kind, data = excluded.data"
+)
+_SQL_DELETE_SERVICE = "DELETE FROM services WHERE id = ?"
+_SQL_VERSION = "SELECT version FROM catalog_meta WHERE id = 0"
+_SQL_BUMP = "UPDATE catalog_meta SET version = version + 1 WHERE id = 0"
+
+# Filas leídas por viaje al recorrer tablas enteras
+_FETCH_SIZE = 5000
+
+
+class SqliteCatalogRepository(ICatalogRepository):
+    """
+    Implementación de ICatalogRepository sobre SQLite (modo WAL).
+    Nada se carga al abrir: las consultas por id van por la clave primaria
+    y ``iter_vehicles``/``iter_services`` leen por bloques. Cada hilo
+    reutiliza su propia conexión y ``batch()`` agrupa las escrituras del
+    hilo en una única transacción. ``catalog_meta.version`` suma uno por
+    cada transacción confirmada que escribió algo.
+    """
+
+    def __init__(self, db_file: str = DB_FILE, timeout: float = 5.0) -> None:
+        self._db_file = db_file
+        self._timeout = timeout
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._pool_lock = threading.Lock()
+        os.makedirs(os.path.dirname(self._db_file) or ".", exist_ok=True)
+        self._init_schema()
+
+    # ----------------- helpers internos -----------------
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self._db_file,
+            timeout=self._timeout,
+            check_same_thread=False,
+            cached_statements=64,
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        with self._pool_lock:
+            self._connections.append(conn)
+        return conn
+
+    def _conn(self) -> sqlite3.Connection:
+        """Conexión del hilo actual (se crea la primera vez)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+        return conn
+
+    def _init_schema(self) -> None:
+        conn = self._conn()
+        with conn:
+            for stmt in _SCHEMA:
+                conn.execute(stmt)
+
+    @staticmethod
+    def _to_vehicle(row) -> Vehiculo:
+        vid, marca, modelo, precio, garantia, mantenimiento, descripcion = row
+        # Marca y mantenimiento se repiten en todo el catálogo: una copia de cada uno
+        return Vehiculo(
+            vid, sys.intern(marca), modelo, precio, garantia, sys.intern(mantenimiento), descripcion
+        )
+
+    @staticmethod
+    def _to_service(kind: str, data: str) -> Any:
+        return SERVICE_KINDS[kind](**json.loads(data))
+
+    @contextmanager
+    def _write(self) -> Iterator[sqlite3.Connection]:
+        """Transacción corta, salvo que ya estemos dentro de ``batch()``."""
+        conn = self._conn()
+        if getattr(self._local, "batch_depth", 0):
+            yield conn
+            self._local.dirty = True
+            return
+        try:
+            yield conn
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.execute(_SQL_BUMP)
+        conn.commit()
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        conn = self._conn()
+        depth = getattr(self._local, "batch_depth", 0)
+        if depth == 0:
+            conn.execute("BEGIN IMMEDIATE")
+            self._local.dirty = False
+        self._local.batch_depth = depth + 1
+        try:
+            yield
+        except BaseException:
+            self._local.batch_depth = depth
+            if depth == 0:
+                conn.rollback()
+            raise
+        self._local.batch_depth = depth
+        if depth == 0:
+            if self._local.dirty:
+                conn.execute(_SQL_BUMP)
+            conn.commit()
+
+    def _iter(self, sql: str) -> Iterator:
+        # Conexión propia: un recorrido largo no se mezcla con las escrituras del hilo
+        conn = self._connect()
+        try:
+            cur = conn.execute(sql)
+            while True:
+                rows = cur.fetchmany(_FETCH_SIZE)
+                if not rows:
+                    return
+                yield from rows
+        finally:
+            with self._pool_lock:
+                if conn in self._connections:
+                    self._connections.remove(conn)
+            conn.close()
+
+    def close(self) -> None:
+        """Cierra todas las conexiones abiertas por el repositorio."""
+        with self._pool_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+    # ----------------- implementación ICatalogRepository -----------------
+    def version(self) -> int:
+        return self._conn().execute(_SQL_VERSION).fetchone()[0]
+
+    def get_vehicle(self, vehicle_id: str) -> Optional[Vehiculo]:
+        row = self._conn().execute(_SQL_GET_VEHICLE, (vehicle_id,)).fetchone()
+        return None if row is None else self._to_vehicle(row)
+
+    def iter_vehicles(self) -> Iterator[Vehiculo]:
+        return map(self._to_vehicle, self._iter(_SQL_ALL_VEHICLES))
+
+    def count_vehicles(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM vehicles").fetchone()[0]
+
+    @staticmethod
+    def _vehicle_row(vehicle: Vehiculo) -> tuple:
+        return (
+            vehicle.id,
+            vehicle.marca,
+            vehicle.modelo,
+            vehicle.precio,
+            vehicle.garantia_meses,
+            vehicle.mantenimiento_tipo,
+            vehicle.descripcion,
+        )
+
+    def upsert_vehicle(self, vehicle: Vehiculo) -> None:
+        with self._write() as conn:
+            conn.execute(_SQL_UPSERT_VEHICLE, self._vehicle_row(vehicle))
+
+    def upsert_vehicles(self, vehicles: Iterable[Vehiculo]) -> None:
+        with self._write() as conn:
+            conn.executemany(_SQL_UPSERT_VEHICLE, map(self._vehicle_row, vehicles))
+
+    def delete_vehicle(self, vehicle_id: str) -> None:
+        with self._write() as conn:
+            conn.execute(_SQL_DELETE_VEHICLE, (vehicle_id,))
+
+    def get_service(self, service_id: str) -> Optional[Any]:
+        row = self._conn().execute(_SQL_GET_SERVICE, (service_id,)).fetchone()
+        return None if row is None else self._to_service(*row)
+
+    def iter_services(self) -> Iterator[Any]:
+        return (self._to_service(kind, data) for kind, data in self._iter(_SQL_ALL_SERVICES))
+
+    def count_services(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM services").fetchone()[0]
+
+    def upsert_service(self, service: Any) -> None:
+        kind = _KIND_OF.get(type(service))
+        if kind is None:
+            raise ValueError("Tipo de servicio desconocido")
+        data = json.dumps(asdict(service), separators=(",", ":"), ensure_ascii=False)
+        with self._write() as conn:
+            conn.execute(_SQL_UPSERT_SERVICE, (service.id, kind, data))
+
+    def delete_service(self, service_id: str) -> None:
+        with self._write() as conn:
+            conn.execute(_SQL_DELETE_SERVICE, (service_id,))
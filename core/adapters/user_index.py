@@ -0,0 +1,90 @@
+# core/adapters/user_index.py
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Mayor que cualquier carácter: ``prefix + _MAX_CHAR`` acota el rango del prefijo.
+_MAX_CHAR = "\U0010ffff"
+
+
+def _discard(names: List[str], username: str) -> None:
+    i = bisect_left(names, username)
+    if i < len(names) and names[i] == username:
+        del names[i]
+
+
+def prefix_range(names: List[str], prefix: Optional[str], lo: int = 0, hi: Optional[int] = None) -> Tuple[int, int]:
+    """Posiciones ``[inicio, fin)`` de los nombres que empiezan por ``prefix``."""
+    hi = len(names) if hi is None else hi
+    if not prefix:
+        return lo, hi
+    return bisect_left(names, prefix, lo, hi), bisect_left(names, prefix + _MAX_CHAR, lo, hi)
+
+
+def page_bounds(start: int, end: int, offset: int, limit: Optional[int], descending: bool) -> Tuple[int, int]:
+    """
+    Posiciones ``[desde, hasta)`` de una página dentro de ``[start, end)``.
+    Con ``descending`` la página se cuenta desde el final (el llamador la invierte).
+    """
+    if descending:
+        stop = max(start, end - offset)
+        first = start if limit is None else max(start, stop - limit)
+        return first, stop
+    first = min(end, start + offset)
+    stop = end if limit is None else min(end, first + limit)
+    return first, stop
+
+
+class SortedUserIndex:
+    """
+    Nombres de usuario ordenados, en total y por rol, para paginar y
+    filtrar por prefijo con búsqueda binaria: una página cuesta
+    O(log n + tamaño de página) y nunca se copia la lista completa.
+    Altas y bajas mantienen el orden con ``insort`` (memmove en C).
+    """
+
+    def __init__(self, users: Iterable[Tuple[str, str]] = ()):
+        self._roles: Dict[str, str] = dict(users)
+        self._all: List[str] = sorted(self._roles)
+        self._by_role: Dict[str, List[str]] = {}
+        for name in self._all:
+            self._by_role.setdefault(self._roles[name], []).append(name)
+
+    def put(self, username: str, role: str) -> None:
+        old = self._roles.get(username)
+        if old == role:
+            return
+        if old is None:
+            insort(self._all, username)
+        else:
+            _discard(self._by_role[old], username)
+        insort(self._by_role.setdefault(role, []), username)
+        self._roles[username] = role
+
+    def remove(self, username: str) -> None:
+        role = self._roles.pop(username, None)
+        if role is None:
+            return
+        _discard(self._all, username)
+        _discard(self._by_role[role], username)
+
+    def _names(self, role: Optional[str]) -> List[str]:
+        return self._all if role is None else self._by_role.get(role, [])
+
+    def count(self, role: Optional[str] = None, prefix: Optional[str] = None) -> int:
+        start, end = prefix_range(self._names(role), prefix)
+        return end - start
+
+    def page(
+        self,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        role: Optional[str] = None,
+        prefix: Optional[str] = None,
+        descending: bool = False,
+    ) -> List[str]:
+        names = self._names(role)
+        first, stop = page_bounds(*prefix_range(names, prefix), offset, limit, descending)
+        page = names[first:stop]
+        if descending:
+            page.reverse()
+        return page
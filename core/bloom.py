@@ -0,0 +1,106 @@
+# core/bloom.py
+import math
+from dataclasses import dataclass
+from typing import Iterable, List
+
+# Los contadores son de 8 bits: al saturarse ya no se decrementan (solo
+# puede producir falsos positivos, nunca falsos negativos).
+_MAX_COUNT = 255
+
+
+@dataclass
+class BloomStats:
+    """Métricas de un filtro de Bloom usado como caché negativa."""
+    items: int
+    capacity: int
+    estimated_fp_rate: float
+    lookups: int
+    avoided_lookups: int
+    false_positives: int
+
+    @property
+    def observed_fp_rate(self) -> float:
+        """Fracción de consultas de nombres inexistentes que el filtro no evitó."""
+        absent = self.avoided_lookups + self.false_positives
+        return self.false_positives / absent if absent else 0.0
+
+
+class CountingBloomFilter:
+    """
+    Filtro de Bloom con contadores (admite borrados).
+
+    ``might_contain`` puede dar falsos positivos pero nunca falsos
+    negativos: si responde False el elemento seguro que no se añadió.
+    Se dimensiona para ``capacity`` elementos con una tasa de falsos
+    positivos ``error_rate``; por encima de esa capacidad la tasa sube.
+    """
+
+    def __init__(self, capacity: int = 10_000, error_rate: float = 0.01):
+        capacity = max(1, capacity)
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(8, int(math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)))
+        self.hashes = max(1, int(round(self.size / capacity * math.log(2))))
+        self._counters = bytearray(self.size)
+        self._items = 0
+
+    def _seeds(self, key: str):
+        # hash() de str está cacheado y es aleatorio por proceso: basta para
+        # un filtro que solo vive en memoria (doble hashing con 2 x 32 bits).
+        h = hash(key) & 0xFFFFFFFFFFFFFFFF
+        return h & 0xFFFFFFFF, (h >> 32) | 1
+
+    def _positions(self, key: str) -> List[int]:
+        h1, h2 = self._seeds(key)
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, key: str) -> None:
+        counters = self._counters
+        for pos in self._positions(key):
+            if counters[pos] < _MAX_COUNT:
+                counters[pos] += 1
+        self._items += 1
+
+    def update(self, keys: Iterable[str]) -> None:
+        # Igual que add() pero sin llamadas por elemento (reconstrucciones grandes)
+        counters, size, hashes = self._counters, self.size, self.hashes
+        added = 0
+        for key in keys:
+            h = hash(key) & 0xFFFFFFFFFFFFFFFF
+            h1, h2 = h & 0xFFFFFFFF, (h >> 32) | 1
+            for pos in range(h1, h1 + hashes * h2, h2):
+                pos %= size
+                if counters[pos] < _MAX_COUNT:
+                    counters[pos] += 1
+            added += 1
+        self._items += added
+
+    def remove(self, key: str) -> None:
+        """Quita un elemento añadido antes (si no se añadió, el filtro se corrompe)."""
+        counters = self._counters
+        for pos in self._positions(key):
+            if 0 < counters[pos] < _MAX_COUNT:
+                counters[pos] -= 1
+        self._items = max(0, self._items - 1)
+
+    def might_contain(self, key: str) -> bool:
+        counters, size = self._counters, self.size
+        h1, h2 = self._seeds(key)
+        for i in range(self.hashes):
+            if not counters[(h1 + i * h2) % size]:
+                return False
+        return True
+
+    __contains__ = might_contain
+
+    def false_positive_rate(self) -> float:
+        """Tasa estimada según la ocupación real de los contadores."""
+        filled = (self.size - self._counters.count(0)) / self.size
+        return filled ** self.hashes
+
+    def clear(self) -> None:
+        self._counters = bytearray(self.size)
+        self._items = 0
+
+    def __len__(self) -> int:
+        return self._items
@@ -0,0 +1,359 @@
+# core/catalog_columns.py
+"""
+Vista columnar del catálogo para analítica (rangos, agregados por grupo,
+los k más baratos, stock bajo) sobre arrays de NumPy en lugar de recorrer
+objetos ``Vehiculo``/``Repuesto``.
+
+NumPy es opcional: sin él ``HAS_NUMPY`` es False, ``ColumnTable`` no se
+puede crear y ``CatalogService`` responde las mismas consultas recorriendo
+sus índices.
+"""
+from dataclasses import dataclass
+from operator import attrgetter
+from typing import Any, Dict, Hashable, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # numpy es opcional
+    np = None
+
+from core.catalog_index import fold
+from core.cow import CowDict
+from core.models import Vehiculo
+
+HAS_NUMPY = np is not None
+
+# Filas por bloque: una escritura copia como mucho un bloque de cada columna
+BLOCK_ROWS = 2048
+
+# Cubetas del mapa clave -> fila: con millones de filas, cubetas pequeñas de copiar
+_SLOT_BUCKETS = 4096
+
+# Columnas internas: clave de la fila y si la fila sigue viva
+_KEY = "_key"
+_ALIVE = "_alive"
+
+
+@dataclass(frozen=True)
+class GroupStats:
+    """Agregados de una columna numérica para un grupo (p. ej. una marca)."""
+    group: str
+    count: int
+    mean: float
+    min: float
+    max: float
+
+
+class ColumnTable:
+    """
+    Tabla columnar: columnas numéricas (``numeric``: nombre -> dtype) y
+    categóricas (``categorical``: código entero por valor, sin distinguir
+    mayúsculas ni tildes). Cada columna toma el atributo del mismo nombre
+    del objeto guardado con ``put(clave, objeto)``, y cada clave ocupa una
+    fila fija. Las bajas dejan la fila marcada como muerta y la tabla se
+    compacta cuando los huecos superan a las filas vivas.
+
+    Las columnas se guardan por bloques de ``block_rows`` filas con copia en
+    escritura, como ``core.cow``: ``copy()`` comparte los bloques y cada
+    copia duplica un bloque la primera vez que lo modifica. ``arrays()``
+    une los bloques una vez por versión y reutiliza el resultado.
+    """
+
+    def __init__(
+        self,
+        numeric: Mapping[str, str],
+        categorical: Sequence[str] = (),
+        items: Iterable[Tuple[Hashable, Any]] = (),
+        block_rows: int = BLOCK_ROWS,
+    ):
+        if np is None:
+            raise ImportError("La vista columnar del catálogo necesita numpy")
+        self._dtypes: Dict[str, Any] = dict(numeric)
+        self._dtypes.update((name, np.int32) for name in categorical)
+        self._dtypes.update({_KEY: object, _ALIVE: bool})
+        self._columns = tuple(numeric) + tuple(categorical)
+        self._categorical = tuple(categorical)
+        self._block_rows = block_rows
+        # Por columna categórica: valor tal cual -> código, normalizado -> código,
+        # y por código el normalizado (para ordenar) y la primera grafía vista
+        self._raw_codes: Dict[str, Dict[str, int]] = {name: {} for name in categorical}
+        self._folded_codes: Dict[str, Dict[str, int]] = {name: {} for name in categorical}
+        self._folded: Dict[str, List[str]] = {name: [] for name in categorical}
+        self._names: Dict[str, List[str]] = {name: [] for name in categorical}
+        self._owned_codes = True
+
+        self._fill(*self._encode(items))
+
+    def _encode(self, items: Iterable[Tuple[Hashable, Any]]) -> Tuple[List, List]:
+        """Claves y una array por columna (categóricas ya como códigos)."""
+        items = list(items)
+        keys = [key for key, _ in items]
+        objects = [item for _, item in items]
+        columns = []
+        for name in self._columns:
+            values = list(map(attrgetter(name), objects))
+            if name in self._raw_codes:
+                values = self._codes(name, values)
+            columns.append(np.array(values, dtype=self._dtypes[name]))
+        return keys, columns
+
+    def _fill(self, keys: Sequence, columns: Sequence) -> None:
+        """Reparte filas vivas (``keys`` + una array por columna) en bloques nuevos."""
+        n = len(keys)
+        arrays = dict(zip(self._columns, columns))
+        arrays[_KEY] = np.array(keys, dtype=object) if not isinstance(keys, np.ndarray) else keys
+        arrays[_ALIVE] = np.ones(n, dtype=bool)
+        self._blocks: List[Dict[str, Any]] = []
+        for start in range(0, n, self._block_rows):
+            block = self._new_block()
+            stop = min(n, start + self._block_rows)
+            for name, array in arrays.items():
+                block[name][:stop - start] = array[start:stop]
+            self._blocks.append(block)
+        self._owned: Set[int] = set(range(len(self._blocks)))
+        self._slots = CowDict(zip(arrays[_KEY].tolist(), range(n)), buckets=_SLOT_BUCKETS)
+        self._len = n
+        self._dead = 0
+        self._arrays: Optional[Dict[str, Any]] = None
+
+    def _new_block(self) -> Dict[str, Any]:
+        return {name: np.zeros(self._block_rows, dtype=dtype) for name, dtype in self._dtypes.items()}
+
+    def copy(self) -> "ColumnTable":
+        clone = ColumnTable.__new__(ColumnTable)
+        clone.__dict__.update(self.__dict__)
+        clone._blocks = list(self._blocks)
+        clone._slots = self._slots.copy()
+        clone._owned = set()
+        # Los bloques y los códigos pasan a ser compartidos para los dos
+        self._owned = set()
+        self._owned_codes = clone._owned_codes = False
+        return clone
+
+    def __getstate__(self) -> dict:
+        # Al cargar una copia guardada nada es propio; la unión de bloques se rehace
+        return {**self.__dict__, "_owned": set(), "_owned_codes": False, "_arrays": None}
+
+    def __len__(self) -> int:
+        return self._len - self._dead
+
+    def __contains__(self, key) -> bool:
+        return key in self._slots
+
+    # ---------- Códigos categóricos ----------
+    def _codes(self, column: str, values: List[str]) -> List[int]:
+        known = self._raw_codes[column]
+        # Valores nuevos, en el orden en que aparecen (la primera grafía da nombre al grupo)
+        for value in dict.fromkeys(values):
+            if value not in known:
+                self._new_code(column, value)
+        return list(map(self._raw_codes[column].__getitem__, values))
+
+    def _code(self, column: str, value: str) -> int:
+        code = self._raw_codes[column].get(value)
+        return self._new_code(column, value) if code is None else code
+
+    def _new_code(self, column: str, value: str) -> int:
+        if not self._owned_codes:
+            self._raw_codes = {k: dict(v) for k, v in self._raw_codes.items()}
+            self._folded_codes = {k: dict(v) for k, v in self._folded_codes.items()}
+            self._folded = {k: list(v) for k, v in self._folded.items()}
+            self._names = {k: list(v) for k, v in self._names.items()}
+            self._owned_codes = True
+        key = fold(value)
+        code = self._folded_codes[column].get(key)
+        if code is None:
+            code = self._folded_codes[column][key] = len(self._names[column])
+            self._folded[column].append(key)
+            self._names[column].append(value.strip())
+        self._raw_codes[column][value] = code
+        return code
+
+    def code(self, column: str, value: str) -> Optional[int]:
+        """Código de ``value`` en una columna categórica (None si nunca apareció)."""
+        code = self._raw_codes[column].get(value)
+        return self._folded_codes[column].get(fold(value)) if code is None else code
+
+    # ---------- Escritura ----------
+    def _writable(self, slot: int) -> Tuple[Dict[str, Any], int]:
+        b, i = divmod(slot, self._block_rows)
+        if b == len(self._blocks):
+            self._blocks.append(self._new_block())
+            self._owned.add(b)
+        elif b not in self._owned:
+            self._blocks[b] = {name: array.copy() for name, array in self._blocks[b].items()}
+            self._owned.add(b)
+        return self._blocks[b], i
+
+    def put(self, key: Hashable, item: Any) -> None:
+        """Alta o reemplazo de la fila de ``key`` con los atributos de ``item``."""
+        slot = self._slots.get(key)
+        if slot is None:
+            slot = self._slots[key] = self._len
+            self._len += 1
+        block, i = self._writable(slot)
+        for name in self._columns:
+            value = getattr(item, name)
+            block[name][i] = self._code(name, value) if name in self._raw_codes else value
+        block[_KEY][i] = key
+        block[_ALIVE][i] = True
+        self._arrays = None
+
+    def put_many(self, items: Iterable[Tuple[Hashable, Any]]) -> None:
+        """Como ``put`` para muchos objetos (si una clave se repite, gana el último)."""
+        keys, columns = self._encode(items)
+        last = dict(zip(keys, range(len(keys))))
+        if len(last) < len(keys):
+            keep = np.fromiter(last.values(), dtype=np.intp, count=len(last))
+            keys, columns = list(last), [column[keep] for column in columns]
+        if not keys:
+            return
+        get = self._slots.get
+        slots = [get(key) for key in keys]
+        new = [i for i, slot in enumerate(slots) if slot is None]
+        for slot, i in enumerate(new, start=self._len):
+            slots[i] = slot
+        self._slots.update((keys[i], slots[i]) for i in new)
+        self._len += len(new)
+
+        slots = np.array(slots)
+        arrays = dict(zip(self._columns, columns))
+        arrays[_KEY] = np.array(keys, dtype=object)
+        if len(slots) > 1 and (slots[1:] < slots[:-1]).any():
+            order = np.argsort(slots, kind="stable")
+            slots = slots[order]
+            arrays = {name: array[order] for name, array in arrays.items()}
+        # Las filas quedan ordenadas: cada bloque tocado es un tramo contiguo
+        blocks = slots // self._block_rows
+        starts = np.flatnonzero(np.diff(blocks, prepend=-1)).tolist() + [len(slots)]
+        for start, stop in zip(starts, starts[1:]):
+            block, _ = self._writable(int(slots[start]))
+            rows = slots[start:stop] % self._block_rows
+            for name, array in arrays.items():
+                block[name][rows] = array[start:stop]
+            block[_ALIVE][rows] = True
+        self._arrays = None
+
+    def delete(self, key: Hashable) -> None:
+        slot = self._slots.pop(key)
+        if slot is None:
+            return
+        block, i = self._writable(slot)
+        block[_ALIVE][i] = False
+        block[_KEY][i] = None
+        self._dead += 1
+        self._arrays = None
+        if self._dead > max(len(self), self._block_rows):
+            self._compact()
+
+    def _compact(self) -> None:
+        arrays = self.arrays()
+        alive = arrays[_ALIVE]
+        self._fill(arrays[_KEY][alive], [arrays[name][alive] for name in self._columns])
+
+    # ---------- Lectura ----------
+    def arrays(self) -> Dict[str, Any]:
+        """
+        Una array por columna (más ``_key`` y ``_alive``) con todas las
+        filas, incluidas las muertas: filtrar siempre con ``_alive`` o con
+        una máscara de ``mask``. No se deben modificar.
+        """
+        arrays = self._arrays
+        if arrays is None:
+            if self._blocks:
+                arrays = {
+                    name: np.concatenate([b[name] for b in self._blocks])[:self._len]
+                    for name in self._dtypes
+                }
+            else:
+                arrays = {name: np.zeros(0, dtype=dtype) for name, dtype in self._dtypes.items()}
+            self._arrays = arrays
+        return arrays
+
+    def mask(
+        self,
+        ranges: Optional[Mapping[str, Tuple[Optional[float], Optional[float]]]] = None,
+        equals: Optional[Mapping[str, Optional[str]]] = None,
+    ):
+        """
+        Máscara booleana de las filas vivas que cumplen todos los filtros:
+        ``ranges`` (columna -> (mínimo, máximo), ambos incluidos, None sin
+        límite) y ``equals`` (columna categórica -> valor, None sin filtro).
+        """
+        arrays = self.arrays()
+        result = arrays[_ALIVE].copy()
+        for name, (low, high) in (ranges or {}).items():
+            if low is not None:
+                result &= arrays[name] >= low
+            if high is not None:
+                result &= arrays[name] <= high
+        for name, value in (equals or {}).items():
+            if value is None:
+                continue
+            code = self.code(name, value)
+            if code is None:
+                result[:] = False
+            else:
+                result &= arrays[name] == code
+        return result
+
+    def keys(self, mask=None) -> List:
+        """Claves de las filas de ``mask`` (o de todas las vivas), en orden de fila."""
+        arrays = self.arrays()
+        return arrays[_KEY][arrays[_ALIVE] if mask is None else mask].tolist()
+
+    def smallest(self, column: str, k: Optional[int] = None, mask=None) -> List:
+        """
+        Claves de las ``k`` filas (todas si None) con menor ``column`` entre
+        las de ``mask``, de menor a mayor; a igual valor, por clave.
+        """
+        if k is not None and k <= 0:
+            return []
+        arrays = self.arrays()
+        rows = np.flatnonzero(arrays[_ALIVE] if mask is None else mask)
+        values = arrays[column][rows]
+        if k is not None and k < len(rows):
+            # Solo se ordenan los candidatos (incluidos los empates en el corte)
+            cut = np.partition(values, k - 1)[k - 1]
+            keep = values <= cut
+            rows, values = rows[keep], values[keep]
+        pairs = sorted(zip(values.tolist(), arrays[_KEY][rows].tolist()))
+        return [key for _, key in pairs[:k]]
+
+    def group_stats(self, column: str, by: str, mask=None) -> List[GroupStats]:
+        """Cuenta, media, mínimo y máximo de ``column`` por cada valor de ``by``."""
+        arrays = self.arrays()
+        selected = arrays[_ALIVE] if mask is None else mask
+        codes = arrays[by][selected]
+        values = arrays[column][selected].astype(np.float64)
+        n = len(self._names[by])
+        counts = np.bincount(codes, minlength=n)
+        sums = np.bincount(codes, weights=values, minlength=n)
+        mins = np.full(n, np.inf)
+        maxs = np.full(n, -np.inf)
+        np.minimum.at(mins, codes, values)
+        np.maximum.at(maxs, codes, values)
+        present = sorted(np.flatnonzero(counts).tolist(), key=self._folded[by].__getitem__)
+        return [
+            GroupStats(
+                self._names[by][c], int(counts[c]), float(sums[c] / counts[c]),
+                float(mins[c]), float(maxs[c]),
+            )
+            for c in present
+        ]
+
+
+# ---------- Tablas del catálogo ----------
+VEHICLE_NUMERIC = {"precio": "f8", "garantia_meses": "i8"}
+VEHICLE_CATEGORICAL = ("marca", "mantenimiento_tipo")
+STOCK_NUMERIC = {"precio": "f8", "stock": "i8"}
+
+
+def vehicle_table(vehicles: Iterable[Tuple[str, Vehiculo]]) -> ColumnTable:
+    """Precio, garantía, marca y mantenimiento de cada vehículo, por id."""
+    return ColumnTable(VEHICLE_NUMERIC, VEHICLE_CATEGORICAL, vehicles)
+
+
+def stock_table(services: Iterable[Tuple[str, Any]]) -> ColumnTable:
+    """Precio y stock de los servicios con stock (repuestos), por id."""
+    return ColumnTable(STOCK_NUMERIC, (), ((sid, s) for sid, s in services if hasattr(s, "stock")))
@@ -0,0 +1,105 @@
+# core/catalog_feed.py
+import logging
+import threading
+from bisect import bisect_right
+from collections import deque
+from dataclasses import dataclass
+from itertools import islice
+from typing import Any, Callable, Deque, Iterable, List, Optional
+
+# Mismo logger que ``core.log_config``, sin configurar handlers al importar
+logger = logging.getLogger("app")
+
+# Tipos de cambio publicados
+CHANGE_KINDS = ("add", "edit", "delete", "stock")
+
+
+@dataclass(frozen=True)
+class CatalogChange:
+    """
+    Un cambio del catálogo. ``version`` es la de la instantánea que lo
+    publicó (un lote publica varios cambios con la misma versión);
+    ``entity`` es "vehicle" o "service" e ``item`` el objeto nuevo (None
+    en las bajas).
+    """
+    version: int
+    kind: str
+    entity: str
+    item_id: str
+    item: Any = None
+
+
+class ChangeFeed:
+    """
+    Registro de cambios del catálogo en un buffer circular de ``capacity``
+    cambios, ordenados por versión.
+
+    Los consumidores piden ``since(version)`` con la última versión que
+    conocen (sondeo) o se suscriben para recibir cada publicación. Si los
+    cambios pedidos ya salieron del buffer (o son de antes de que empezara
+    el registro), ``since`` devuelve None: hay que recargar entero.
+    """
+
+    def __init__(self, capacity: int = 10_000):
+        self._capacity = capacity
+        self._changes: Deque[CatalogChange] = deque()
+        # Los cambios con versión <= _floor ya no están (o nunca estuvieron)
+        self._floor: Optional[int] = None
+        self._subscribers: List[Callable[[List[CatalogChange]], None]] = []
+        self._lock = threading.Lock()
+
+    def start(self, version: int) -> None:
+        """Fija la versión desde la que se registra (solo la primera vez)."""
+        with self._lock:
+            if self._floor is None:
+                self._floor = version
+
+    def reset(self, version: int) -> None:
+        """Descarta el registro y sigue desde ``version`` (tras recargar el catálogo)."""
+        with self._lock:
+            self._changes.clear()
+            self._floor = version
+
+    def publish(self, changes: Iterable[CatalogChange]) -> None:
+        """Añade los cambios de una versión y avisa a los suscriptores."""
+        changes = list(changes)
+        if not changes:
+            return
+        with self._lock:
+            self._changes.extend(changes)
+            while len(self._changes) > self._capacity:
+                self._floor = self._changes.popleft().version
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
+            try:
+                callback(changes)
+            except Exception:
+                # Un suscriptor roto no debe tumbar la escritura que ya se publicó
+                logger.exception("Error en un suscriptor del catálogo")
+
+    def since(self, version: int) -> Optional[List[CatalogChange]]:
+        """Cambios con versión mayor que ``version``; None si ya no se pueden dar."""
+        with self._lock:
+            if self._floor is None or version < self._floor:
+                return None
+            start = bisect_right(self._changes, version, key=lambda c: c.version)
+            return list(islice(self._changes, start, None))
+
+    def subscribe(self, callback: Callable[[List[CatalogChange]], None]) -> Callable[[], None]:
+        """
+        ``callback`` recibe la lista de cambios de cada versión, en el hilo
+        que escribió y en orden de versión; debe ser rápido. Devuelve la
+        función para cancelar la suscripción.
+        """
+        with self._lock:
+            self._subscribers.append(callback)
+
+        def unsubscribe() -> None:
+            with self._lock:
+                if callback in self._subscribers:
+                    self._subscribers.remove(callback)
+
+        return unsubscribe
+
+    def __len__(self) -> int:
+        return len(self._changes)
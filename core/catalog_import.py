@@ -0,0 +1,135 @@
+# core/catalog_import.py
+import csv
+import json
+import math
+import os
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Mapping, Optional
+
+from core.factories import VehicleFactory
+from core.models import Vehiculo
+
+
+@dataclass
+class RejectedRow:
+    """
+    Fila descartada por una importación. ``row`` es su número entre las
+    filas de datos, empezando en 1: no cuenta la cabecera del CSV ni las
+    líneas en blanco del JSONL, así que no es la línea del archivo.
+    """
+    row: int
+    message: str
+
+
+@dataclass
+class ImportReport:
+    """
+    Resumen de una importación masiva. ``errors`` guarda solo las primeras
+    filas rechazadas (el total está en ``rejected``), para que un archivo
+    malo no llene la memoria.
+    """
+    read: int = 0
+    imported: int = 0
+    rejected: int = 0
+    errors: List[RejectedRow] = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.read / self.seconds if self.seconds else 0.0
+
+
+def read_vehicles_csv(path: str) -> Iterator[Dict]:
+    """
+    Lee vehículos de un CSV con cabecera (``id,marca,modelo,precio,
+    garantia_meses,mantenimiento_tipo[,descripcion]``) sin cargar el
+    archivo entero.
+    """
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        yield from csv.DictReader(f)
+
+
+def read_vehicles_jsonl(path: str) -> Iterator[Optional[Dict]]:
+    """
+    Lee vehículos de un JSONL (un objeto por línea). Las líneas que no son
+    un objeto JSON válido se devuelven como None para que el importador
+    las reporte como error sin cortar la importación.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError:
+                yield None
+                continue
+            yield row if isinstance(row, dict) else None
+
+
+def read_vehicles(path: str) -> Iterator[Optional[Dict]]:
+    """Elige el lector por la extensión (``.csv``, ``.jsonl`` o ``.ndjson``)."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        return read_vehicles_csv(path)
+    if ext in (".jsonl", ".ndjson"):
+        return read_vehicles_jsonl(path)
+    raise ValueError(f"Formato de catálogo no soportado: {ext or path}")
+
+
+def _text(value, name: str, required: bool = True) -> str:
+    if value is None:
+        value = ""
+    elif not isinstance(value, str):
+        raise ValueError(f"'{name}' debe ser texto.")
+    value = value.strip()
+    if required and not value:
+        raise ValueError(f"Falta '{name}'.")
+    return value
+
+
+def vehicle_from_row(row: Optional[Mapping]) -> Vehiculo:
+    """
+    Convierte una fila leída (CSV o JSONL) en ``Vehiculo`` mediante
+    ``VehicleFactory``. Admite también los nombres de la fábrica
+    (``garantia``, ``mantenimiento``). Lanza ValueError con el motivo si
+    falta un campo o su tipo no es válido.
+    """
+    # ``type(...) is dict`` primero: isinstance contra el ABC es lento fila a fila
+    if type(row) is not dict and not isinstance(row, Mapping):
+        raise ValueError("Fila con formato inválido.")
+    get = row.get
+
+    raw_price = get("precio")
+    if raw_price is None or raw_price == "" or isinstance(raw_price, bool):
+        raise ValueError("Falta 'precio'.")
+    try:
+        precio = float(raw_price)
+    except (TypeError, ValueError):
+        raise ValueError(f"Precio inválido: {raw_price!r}.") from None
+    if not math.isfinite(precio) or precio < 0:
+        raise ValueError(f"Precio inválido: {raw_price!r}.")
+
+    # Meses enteros: "12" o 12 (también 12.0 de JSON), pero no "12.5"
+    raw_warranty = get("garantia_meses", get("garantia"))
+    if raw_warranty is None or raw_warranty == "" or isinstance(raw_warranty, bool):
+        raise ValueError("Falta 'garantia_meses'.")
+    value = raw_warranty
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    try:
+        garantia = int(value) if isinstance(value, (int, str)) else -1
+    except ValueError:
+        garantia = -1
+    if garantia < 0:
+        raise ValueError(f"Garantía inválida: {raw_warranty!r}.")
+
+    return VehicleFactory.create_vehicle(
+        _text(get("id"), "id"),
+        _text(get("marca"), "marca"),
+        _text(get("modelo"), "modelo"),
+        precio,
+        garantia,
+        _text(get("mantenimiento_tipo", get("mantenimiento")), "mantenimiento_tipo", required=False),
+        _text(get("descripcion"), "descripcion", required=False),
+    )
@@ -0,0 +1,250 @@
+# core/catalog_index.py
+import heapq
+import re
+import unicodedata
+from itertools import islice
+from math import inf, nextafter
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+from core.cow import ChunkedSortedList
+from core.models import Vehiculo
+
+# Órdenes admitidos por ``query`` ("-" = descendente).
+VEHICLE_SORTS = ("id", "precio", "-precio", "marca", "modelo")
+
+# Mayor que cualquier carácter: ``prefix + _MAX_CHAR`` acota el rango del prefijo.
+_MAX_CHAR = "\U0010ffff"
+
+
+# Diacríticos combinables del bloque latino: cubren casi todo el texto real
+# y se quitan con una sola pasada de ``re`` en lugar de carácter a carácter.
+_LATIN_MARKS = re.compile("[\u0300-\u036f]+")
+
+
+def fold(text: str) -> str:
+    """Normaliza para comparar: sin mayúsculas ni tildes ("Eléctrico" -> "electrico")."""
+    if text.isascii():
+        return text.strip().lower()
+    decomposed = _LATIN_MARKS.sub("", unicodedata.normalize("NFKD", text.strip().casefold()))
+    if decomposed.isascii():
+        return decomposed
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+class VehicleIndex:
+    """
+    Índices secundarios de los vehículos del catálogo, todos ordenados:
+
+    - ids por marca normalizada (hash de marca -> ids ordenados),
+    - ``(precio, id)`` para rangos de precio,
+    - ``(modelo normalizado, id)`` para prefijos de modelo,
+    - todos los ids, para paginar por id sin filtros.
+
+    ``query`` elige como guía el índice más selectivo de los filtros pedidos
+    y aplica el resto sobre sus candidatos; si la guía ya está en el orden
+    pedido, la página se corta sin ordenar. Quien muta el catálogo debe
+    llamar a ``remove`` con los valores viejos y a ``add`` con los nuevos.
+    ``copy()`` comparte todas las estructuras (copia en escritura).
+    """
+
+    def __init__(self, vehicles: Iterable[Tuple[str, Vehiculo]] = ()):
+        self._marca_names: Dict[str, str] = {}
+        by_marca, ids, prices, modelos = self._columns(vehicles)
+        self._by_marca = {k: ChunkedSortedList(names) for k, names in by_marca.items()}
+        self._owned_marcas: Set[str] = set(self._by_marca)
+        self._ids = ChunkedSortedList(ids)
+        self._prices = ChunkedSortedList(prices)
+        self._modelos = ChunkedSortedList(modelos)
+
+    def _columns(self, vehicles: Iterable[Tuple[str, Vehiculo]]) -> Tuple[Dict[str, List[str]], List, List, List]:
+        """Entradas de cada índice para ``vehicles`` (registra las marcas nuevas)."""
+        by_marca: Dict[str, List[str]] = {}
+        ids, prices, modelos = [], [], []
+        for vid, v in vehicles:
+            key = fold(v.marca)
+            by_marca.setdefault(key, []).append(vid)
+            self._marca_names.setdefault(key, v.marca.strip())
+            ids.append(vid)
+            prices.append((v.precio, vid))
+            modelos.append((fold(v.modelo), vid))
+        return by_marca, ids, prices, modelos
+
+    def copy(self) -> "VehicleIndex":
+        clone = VehicleIndex.__new__(VehicleIndex)
+        clone._marca_names = dict(self._marca_names)
+        clone._by_marca = dict(self._by_marca)
+        clone._owned_marcas = set()
+        self._owned_marcas = set()
+        clone._ids = self._ids.copy()
+        clone._prices = self._prices.copy()
+        clone._modelos = self._modelos.copy()
+        return clone
+
+    def __getstate__(self) -> dict:
+        # Al cargar una copia guardada nada es propio: se copia antes de escribir
+        return {**self.__dict__, "_owned_marcas": set()}
+
+    def _marca_ids(self, key: str) -> ChunkedSortedList:
+        """Ids de la marca, copiados si aún se comparten con otra versión."""
+        if key not in self._owned_marcas:
+            self._by_marca[key] = self._by_marca[key].copy()
+            self._owned_marcas.add(key)
+        return self._by_marca[key]
+
+    def add(self, vid: str, v: Vehiculo) -> None:
+        key = fold(v.marca)
+        if key in self._by_marca:
+            ids = self._marca_ids(key)
+        else:
+            ids = self._by_marca[key] = ChunkedSortedList()
+            self._owned_marcas.add(key)
+            self._marca_names[key] = v.marca.strip()
+        ids.add(vid)
+        self._ids.add(vid)
+        self._prices.add((v.precio, vid))
+        self._modelos.add((fold(v.modelo), vid))
+
+    def add_many(self, vehicles: Iterable[Tuple[str, Vehiculo]]) -> None:
+        """Como ``add`` para muchos vehículos: cada índice se actualiza en bloque."""
+        by_marca, ids, prices, modelos = self._columns(vehicles)
+        for key, names in by_marca.items():
+            if key in self._by_marca:
+                self._marca_ids(key).update(names)
+            else:
+                self._by_marca[key] = ChunkedSortedList(names)
+                self._owned_marcas.add(key)
+        self._ids.update(ids)
+        self._prices.update(prices)
+        self._modelos.update(modelos)
+
+    def remove(self, vid: str, v: Vehiculo) -> None:
+        key = fold(v.marca)
+        if key in self._by_marca:
+            ids = self._marca_ids(key)
+            ids.discard(vid)
+            if not len(ids):
+                del self._by_marca[key]
+                del self._marca_names[key]
+        self._ids.discard(vid)
+        self._prices.discard((v.precio, vid))
+        self._modelos.discard((fold(v.modelo), vid))
+
+    def marcas(self) -> List[str]:
+        """Marcas distintas del catálogo (tal como se dieron de alta), ordenadas."""
+        return [self._marca_names[k] for k in sorted(self._marca_names)]
+
+    def query(
+        self,
+        vehicles: Mapping[str, Vehiculo],
+        marca: Optional[str] = None,
+        modelo_prefix: Optional[str] = None,
+        price_min: Optional[float] = None,
+        price_max: Optional[float] = None,
+        garantia_min: Optional[int] = None,
+        sort: str = "id",
+        offset: int = 0,
+        limit: Optional[int] = None,
+    ) -> List[Vehiculo]:
+        if sort not in VEHICLE_SORTS:
+            raise ValueError(f"Orden no soportado: {sort}")
+        marca_key = None if marca is None else fold(marca)
+        modelo_key = fold(modelo_prefix) if modelo_prefix else None
+        modelo_range = (None, None) if modelo_key is None else ((modelo_key,), (modelo_key + _MAX_CHAR,))
+        price_range = (
+            None if price_min is None else (price_min,),
+            None if price_max is None else (nextafter(price_max, inf),),
+        )
+
+        # Plan: el filtro indexado con menos candidatos guía la búsqueda
+        plans = []
+        if marca_key is not None:
+            plans.append((len(self._by_marca.get(marca_key, ())), "marca"))
+        if modelo_key is not None:
+            plans.append((self._modelos.count(*modelo_range), "modelo"))
+        if price_min is not None or price_max is not None:
+            plans.append((self._prices.count(*_open(price_range)), "precio"))
+        size, driver = min(plans) if plans else (len(vehicles), None)
+
+        # Si otro índice ya está en el orden pedido y la página es pequeña,
+        # recorrerlo cortando al completar la página (~wanted * n / size
+        # lecturas) sale más barato que ordenar los ``size`` candidatos.
+        order = sort.lstrip("-")
+        wanted = None if limit is None else offset + limit
+        if _ORDER_OF.get(driver) != order and order in _INDEX_FOR:
+            if driver is None or (wanted is not None and wanted * len(vehicles) < size * size):
+                driver = _INDEX_FOR[order]
+        check = _check(driver, marca_key, modelo_key, price_min, price_max, garantia_min)
+
+        reverse = sort.startswith("-")
+        if driver == "marca":
+            rows = self._by_marca.get(marca_key, ChunkedSortedList()).irange(reverse=reverse)
+        elif driver == "ids":
+            rows = self._ids.irange(reverse=reverse)
+        elif driver == "modelo":
+            rows = (vid for _, vid in self._modelos.irange(*modelo_range, reverse=reverse))
+        elif driver == "precio":
+            rows = (vid for _, vid in self._prices.irange(*price_range, reverse=reverse))
+        else:
+            rows = iter(vehicles)
+        candidates: Iterable[Vehiculo] = map(vehicles.__getitem__, rows)
+        if check is not None:
+            candidates = filter(check, candidates)
+
+        if _ORDER_OF.get(driver) == order:
+            return list(islice(candidates, offset, wanted))
+        key = _sort_key(sort)
+        if wanted is None:
+            found = sorted(candidates, key=key, reverse=reverse)
+        elif reverse:
+            found = heapq.nlargest(wanted, candidates, key=key)
+        else:
+            found = heapq.nsmallest(wanted, candidates, key=key)
+        return found[offset:wanted]
+
+
+# Orden en que cada índice entrega los candidatos, y viceversa.
+_ORDER_OF = {"marca": "id", "ids": "id", "modelo": "modelo", "precio": "precio"}
+_INDEX_FOR = {"id": "ids", "modelo": "modelo", "precio": "precio"}
+
+
+def _open(bounds: Tuple) -> Tuple:
+    lo, hi = bounds
+    return (-inf,) if lo is None else lo, (inf,) if hi is None else hi
+
+
+def _check(
+    driver: Optional[str],
+    marca_key: Optional[str],
+    modelo_key: Optional[str],
+    price_min: Optional[float],
+    price_max: Optional[float],
+    garantia_min: Optional[int],
+) -> Optional[Callable[[Vehiculo], bool]]:
+    """Predicado con los filtros que no garantiza ya el índice que dirige (None = ninguno)."""
+    checks = []
+    if marca_key is not None and driver != "marca":
+        checks.append(lambda v: fold(v.marca) == marca_key)
+    if modelo_key is not None and driver != "modelo":
+        checks.append(lambda v: fold(v.modelo).startswith(modelo_key))
+    if driver != "precio":
+        if price_min is not None:
+            checks.append(lambda v: v.precio >= price_min)
+        if price_max is not None:
+            checks.append(lambda v: v.precio <= price_max)
+    if garantia_min is not None:
+        checks.append(lambda v: v.garantia_meses >= garantia_min)
+    if not checks:
+        return None
+    if len(checks) == 1:
+        return checks[0]
+    return lambda v: all(check(v) for check in checks)
+
+
+def _sort_key(sort: str) -> Callable[[Vehiculo], Tuple]:
+    if sort == "id":
+        return lambda v: v.id
+    if sort in ("precio", "-precio"):
+        return lambda v: (v.precio, v.id)
+    if sort == "marca":
+        return lambda v: (fold(v.marca), fold(v.modelo), v.id)
+    return lambda v: (fold(v.modelo), v.id)
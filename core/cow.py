@@ -0,0 +1,271 @@
+# core/cow.py
+"""
+Contenedores con copia en escritura para las instantáneas del catálogo.
+
+``copy()`` solo copia la lista de bloques (cubetas o trozos ordenados), no
+los elementos: original y copia comparten los bloques y cada uno copia un
+bloque la primera vez que lo modifica. Así una nueva versión cuesta
+O(bloques tocados) en lugar de O(n), y la versión anterior sigue intacta
+para quien la esté leyendo.
+"""
+from bisect import bisect_left, bisect_right, insort
+from itertools import accumulate, chain
+from typing import Any, Dict, Hashable, Iterable, Iterator, List, Optional, Set, Tuple
+
+_EMPTY: Dict = {}
+
+# Hasta cuántos elementos nuevos por trozo ``update`` los inserta uno a uno
+_INSORT_MAX = 32
+
+
+class CowDict:
+    """
+    Diccionario repartido en ``buckets`` cubetas por hash de la clave. El
+    orden de iteración no es el de inserción.
+    """
+
+    def __init__(self, items: Iterable[Tuple[Hashable, Any]] = (), buckets: int = 256):
+        if buckets & (buckets - 1):
+            raise ValueError("buckets debe ser potencia de 2")
+        self._mask = mask = buckets - 1
+        fresh: List[Dict] = [{} for _ in range(buckets)]
+        for key, value in items:
+            fresh[hash(key) & mask][key] = value
+        self._buckets: List[Dict] = [b if b else _EMPTY for b in fresh]
+        self._owned: Set[int] = {i for i, b in enumerate(fresh) if b}
+        self._len = sum(map(len, fresh))
+
+    def copy(self) -> "CowDict":
+        clone = CowDict.__new__(CowDict)
+        clone._mask = self._mask
+        clone._buckets = list(self._buckets)
+        clone._owned = set()
+        clone._len = self._len
+        # A partir de aquí las cubetas son compartidas para los dos
+        self._owned = set()
+        return clone
+
+    def __getstate__(self) -> dict:
+        # Se guardan los pares, no las cubetas: hash() de str cambia en cada
+        # proceso y al cargar hay que volver a repartirlos
+        return {"buckets": self._mask + 1, "items": list(self.items())}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(state["items"], buckets=state["buckets"])
+
+    def _writable(self, key) -> Dict:
+        i = hash(key) & self._mask
+        if i not in self._owned:
+            self._buckets[i] = dict(self._buckets[i])
+            self._owned.add(i)
+        return self._buckets[i]
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __contains__(self, key) -> bool:
+        return key in self._buckets[hash(key) & self._mask]
+
+    def __getitem__(self, key):
+        return self._buckets[hash(key) & self._mask][key]
+
+    def get(self, key, default=None):
+        return self._buckets[hash(key) & self._mask].get(key, default)
+
+    def __setitem__(self, key, value) -> None:
+        bucket = self._writable(key)
+        if key not in bucket:
+            self._len += 1
+        bucket[key] = value
+
+    def __delitem__(self, key) -> None:
+        if key not in self:
+            raise KeyError(key)
+        del self._writable(key)[key]
+        self._len -= 1
+
+    def update(self, items: Iterable[Tuple[Hashable, Any]]) -> None:
+        """Como ``d[k] = v`` para muchos pares, sin una llamada por par."""
+        mask, buckets, owned = self._mask, self._buckets, self._owned
+        added = 0
+        for key, value in items:
+            i = hash(key) & mask
+            if i not in owned:
+                buckets[i] = dict(buckets[i])
+                owned.add(i)
+            bucket = buckets[i]
+            if key not in bucket:
+                added += 1
+            bucket[key] = value
+        self._len += added
+
+    def pop(self, key, default=None):
+        if key not in self:
+            return default
+        self._len -= 1
+        return self._writable(key).pop(key)
+
+    def __iter__(self) -> Iterator:
+        return chain.from_iterable(self._buckets)
+
+    def keys(self) -> Iterator:
+        return iter(self)
+
+    def values(self) -> Iterator:
+        return chain.from_iterable(b.values() for b in self._buckets)
+
+    def items(self) -> Iterator[Tuple]:
+        return chain.from_iterable(b.items() for b in self._buckets)
+
+
+class ChunkedSortedList:
+    """
+    Lista ordenada partida en trozos de ``load`` a ``2 * load`` elementos
+    (como ``sortedcontainers``): altas y bajas mueven solo un trozo en vez
+    de toda la lista, y los rangos se localizan con ``bisect`` sobre el
+    máximo de cada trozo.
+    """
+
+    def __init__(self, items: Iterable = (), load: int = 1000):
+        self._load = load
+        items = sorted(items)
+        self._chunks: List[List] = [items[i:i + load] for i in range(0, len(items), load)]
+        self._maxes: List = [c[-1] for c in self._chunks]
+        self._owned: Set[int] = {id(c) for c in self._chunks}
+        self._offsets: Optional[List[int]] = None
+        self._len = len(items)
+
+    def copy(self) -> "ChunkedSortedList":
+        clone = ChunkedSortedList.__new__(ChunkedSortedList)
+        clone._load = self._load
+        clone._chunks = list(self._chunks)
+        clone._maxes = list(self._maxes)
+        clone._owned = set()
+        clone._offsets = self._offsets
+        clone._len = self._len
+        self._owned = set()
+        return clone
+
+    def __getstate__(self) -> dict:
+        # ``_owned`` guarda id() de los trozos, que no valen en otro proceso
+        return {**self.__dict__, "_owned": set(), "_offsets": None}
+
+    def _writable(self, i: int) -> List:
+        chunk = self._chunks[i]
+        if id(chunk) not in self._owned:
+            chunk = self._chunks[i] = list(chunk)
+            self._owned.add(id(chunk))
+        return chunk
+
+    def _new_chunk(self, items: List) -> List:
+        self._owned.add(id(items))
+        return items
+
+    def __len__(self) -> int:
+        return self._len
+
+    def add(self, item) -> None:
+        self._offsets = None
+        self._len += 1
+        if not self._chunks:
+            self._chunks.append(self._new_chunk([item]))
+            self._maxes.append(item)
+            return
+        i = min(bisect_left(self._maxes, item), len(self._maxes) - 1)
+        chunk = self._writable(i)
+        insort(chunk, item)
+        self._maxes[i] = chunk[-1]
+        if len(chunk) > 2 * self._load:
+            half = self._load
+            self._chunks[i:i + 1] = [self._new_chunk(chunk[:half]), self._new_chunk(chunk[half:])]
+            self._maxes[i:i + 1] = [chunk[half - 1], chunk[-1]]
+
+    def update(self, items: Iterable) -> None:
+        """
+        Añade varios elementos de una vez: se reparten por trozo y cada
+        trozo afectado se copia y se reordena una sola vez.
+        """
+        items = sorted(items)
+        if not items:
+            return
+        if not self._chunks:
+            self.__init__(items, self._load)
+            return
+        self._offsets = None
+        self._len += len(items)
+        maxes, last = self._maxes, len(self._maxes) - 1
+        touched = []
+        start = 0
+        while start < len(items):
+            i = min(bisect_left(maxes, items[start]), last)
+            end = len(items) if i == last else bisect_right(items, maxes[i], start)
+            chunk = self._writable(i)
+            if end - start <= _INSORT_MAX:
+                # Pocos: bisect + memmove por elemento sale más barato que reordenar el trozo
+                for item in items[start:end]:
+                    insort(chunk, item)
+            else:
+                chunk.extend(items[start:end])
+                chunk.sort()
+            maxes[i] = chunk[-1]
+            touched.append(i)
+            start = end
+        # Trozos demasiado grandes, de atrás adelante para no mover índices pendientes
+        load = self._load
+        for i in reversed(touched):
+            chunk = self._chunks[i]
+            if len(chunk) > 2 * load:
+                parts = [self._new_chunk(chunk[j:j + load]) for j in range(0, len(chunk), load)]
+                self._chunks[i:i + 1] = parts
+                self._maxes[i:i + 1] = [p[-1] for p in parts]
+
+    def discard(self, item) -> None:
+        i, j = self._locate(item)
+        if i == len(self._chunks) or self._chunks[i][j] != item:
+            return
+        chunk = self._writable(i)
+        del chunk[j]
+        self._offsets = None
+        self._len -= 1
+        if chunk:
+            self._maxes[i] = chunk[-1]
+        else:
+            del self._chunks[i], self._maxes[i]
+
+    def _locate(self, key) -> Tuple[int, int]:
+        """(trozo, posición) del primer elemento ``>= key``."""
+        i = bisect_left(self._maxes, key)
+        if i == len(self._maxes):
+            return i, 0
+        return i, bisect_left(self._chunks[i], key)
+
+    def __contains__(self, item) -> bool:
+        i, j = self._locate(item)
+        return i < len(self._chunks) and self._chunks[i][j] == item
+
+    def _position(self, key) -> int:
+        offsets = self._offsets
+        if offsets is None:
+            offsets = self._offsets = [0, *accumulate(len(c) for c in self._chunks)]
+        i, j = self._locate(key)
+        return offsets[i] + j
+
+    def count(self, lo, hi) -> int:
+        """Elementos ``x`` con ``lo <= x < hi``."""
+        return max(0, self._position(hi) - self._position(lo))
+
+    def irange(self, lo=None, hi=None, reverse: bool = False) -> Iterator:
+        """Elementos ``x`` con ``lo <= x < hi`` (None = sin límite), perezosamente."""
+        i, j = (0, 0) if lo is None else self._locate(lo)
+        k, m = (len(self._chunks), 0) if hi is None else self._locate(hi)
+        bounds = []
+        while i < k:
+            bounds.append((i, j, None))
+            i, j = i + 1, 0
+        # Con lo > hi en otro trozo el bucle no corre e i > k: rango vacío
+        if i == k and i < len(self._chunks) and j < m:
+            bounds.append((i, j, m))
+        chunks = self._chunks
+        if reverse:
+            return chain.from_iterable(reversed(chunks[c][a:b]) for c, a, b in reversed(bounds))
+        return chain.from_iterable(chunks[c][a:b] for c, a, b in bounds)
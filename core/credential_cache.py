@@ -0,0 +1,76 @@
+# core/credential_cache.py
+import hashlib
+import hmac
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Set, Tuple
+
+
+class VerifiedCredentialCache:
+    """
+    Caché acotada (LRU + TTL) de credenciales ya verificadas.
+
+    Evita repetir el KDF en logins repetidos. No guarda contraseñas ni
+    hashes: la clave es un HMAC de (usuario, contraseña, hash almacenado)
+    con una clave aleatoria que solo vive en memoria de este proceso, así
+    que un volcado de la caché no sirve para atacar contraseñas. Si el
+    hash almacenado cambia, la entrada deja de coincidir por sí sola.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 300.0):
+        self._max_entries = max_entries
+        self._ttl = ttl_seconds
+        self._secret = os.urandom(32)
+        self._entries: "OrderedDict[bytes, Tuple[float, str]]" = OrderedDict()
+        self._by_user: Dict[str, Set[bytes]] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, username: str, password: str, stored_hash: str) -> bytes:
+        msg = "\0".join((username, password, stored_hash)).encode("utf-8")
+        return hmac.new(self._secret, msg, hashlib.sha256).digest()
+
+    def _drop(self, key: bytes) -> None:
+        _, username = self._entries.pop(key)
+        keys = self._by_user.get(username)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_user[username]
+
+    def contains(self, username: str, password: str, stored_hash: str) -> bool:
+        key = self._key(username, password, stored_hash)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False
+            if entry[0] < time.monotonic():
+                self._drop(key)
+                return False
+            self._entries.move_to_end(key)
+            return True
+
+    def add(self, username: str, password: str, stored_hash: str) -> None:
+        key = self._key(username, password, stored_hash)
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (time.monotonic() + self._ttl, username)
+            self._by_user.setdefault(username, set()).add(key)
+            while len(self._entries) > self._max_entries:
+                self._drop(next(iter(self._entries)))
+
+    def invalidate(self, username: str) -> None:
+        """Olvida todas las credenciales verificadas de un usuario."""
+        with self._lock:
+            for key in self._by_user.pop(username, set()):
+                self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_user.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -1,12 +1,159 @@
 # core/crypto.py
+import base64
 import hashlib
+import hmac
+import os
+import re
+from dataclasses import dataclass
+from typing import Dict, Protocol
 
+# Formato heredado: SHA-256 sin sal en hexadecimal (64 caracteres).
+_LEGACY_SHA256 = re.compile(r"[0-9a-f]{64}\Z")
 
-def hash_password(password: str) -> str:
-    """Devuelve un hash SHA-256 en hexadecimal."""
-    return hashlib.sha256(password.encode("utf-8")).hexdigest()
+
+def b64encode(raw: bytes) -> str:
+    """Base64 sin relleno, como van la sal y el hash en los hashes codificados."""
+    return base64.b64encode(raw).decode("ascii").rstrip("=")
+
+
+def b64decode(text: str) -> bytes:
+    """Inversa de ``b64encode``."""
+    return base64.b64decode(text + "=" * (-len(text) % 4))
+
+
+class PasswordHasher(Protocol):
+    """
+    Algoritmo de hash de contraseñas. El resultado codifica algoritmo,
+    parámetros de coste y sal: ``<algoritmo>$<parámetros>$<sal>$<hash>``.
+    """
+
+    algorithm: str
+
+    def hash(self, password: str) -> str:
+        ...
+
+    def verify(self, password: str, encoded: str) -> bool:
+        ...
+
+    def needs_update(self, encoded: str) -> bool:
+        """True si ``encoded`` se generó con parámetros distintos a los actuales."""
+        ...
+
+
+@dataclass(frozen=True)
+class ScryptHasher:
+    """scrypt (memoria ~128·n·r bytes). Con los valores por defecto: 16 MiB."""
+
+    n: int = 2 ** 14
+    r: int = 8
+    p: int = 1
+    salt_size: int = 16
+    dklen: int = 32
+    algorithm: str = "scrypt"
+
+    def _derive(self, password: str, salt: bytes, n: int, r: int, p: int, dklen: int) -> bytes:
+        return hashlib.scrypt(
+            password.encode("utf-8"),
+            salt=salt,
+            n=n,
+            r=r,
+            p=p,
+            maxmem=256 * n * r + 1024 * 1024,
+            dklen=dklen,
+        )
+
+    def hash(self, password: str) -> str:
+        salt = os.urandom(self.salt_size)
+        dk = self._derive(password, salt, self.n, self.r, self.p, self.dklen)
+        params = f"n={self.n},r={self.r},p={self.p}"
+        return f"{self.algorithm}${params}${b64encode(salt)}${b64encode(dk)}"
+
+    @staticmethod
+    def _params(encoded: str) -> Dict[str, int]:
+        _, params, _, _ = encoded.split("$")
+        return {k: int(v) for k, v in (item.split("=") for item in params.split(","))}
+
+    def verify(self, password: str, encoded: str) -> bool:
+        _, _, salt, dk = encoded.split("$")
+        params = self._params(encoded)
+        expected = b64decode(dk)
+        actual = self._derive(
+            password, b64decode(salt), params["n"], params["r"], params["p"], len(expected)
+        )
+        return hmac.compare_digest(actual, expected)
+
+    def needs_update(self, encoded: str) -> bool:
+        return self._params(encoded) != {"n": self.n, "r": self.r, "p": self.p}
+
+
+@dataclass(frozen=True)
+class Pbkdf2Hasher:
+    """PBKDF2-HMAC-SHA256, para entornos donde scrypt no está disponible."""
+
+    iterations: int = 600_000
+    salt_size: int = 16
+    algorithm: str = "pbkdf2_sha256"
+
+    def hash(self, password: str) -> str:
+        salt = os.urandom(self.salt_size)
+        dk = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, self.iterations)
+        return f"{self.algorithm}${self.iterations}${b64encode(salt)}${b64encode(dk)}"
+
+    def verify(self, password: str, encoded: str) -> bool:
+        _, iterations, salt, dk = encoded.split("$")
+        expected = b64decode(dk)
+        actual = hashlib.pbkdf2_hmac(
+            "sha256", password.encode("utf-8"), b64decode(salt), int(iterations), len(expected)
+        )
+        return hmac.compare_digest(actual, expected)
+
+    def needs_update(self, encoded: str) -> bool:
+        return int(encoded.split("$")[1]) != self.iterations
+
+
+_HASHERS: Dict[str, PasswordHasher] = {
+    ScryptHasher.algorithm: ScryptHasher(),
+    Pbkdf2Hasher.algorithm: Pbkdf2Hasher(),
+}
+_default_hasher: PasswordHasher = _HASHERS[ScryptHasher.algorithm]
+
+
+def set_default_hasher(hasher: PasswordHasher) -> None:
+    """Cambia el algoritmo/coste usado para los hash nuevos."""
+    global _default_hasher
+    _HASHERS[hasher.algorithm] = hasher
+    _default_hasher = hasher
+
+
+def get_default_hasher() -> PasswordHasher:
+    return _default_hasher
+
+
+def hash_password(password: str, hasher: PasswordHasher | None = None) -> str:
+    """Devuelve el hash codificado (algoritmo, coste y sal incluidos)."""
+    return (hasher or _default_hasher).hash(password)
 
 
 def verify_password(plain_password: str, stored_hash: str) -> bool:
     """Compara una contraseña en claro con el hash almacenado."""
-    return hash_password(plain_password) == stored_hash
+    if _LEGACY_SHA256.match(stored_hash):
+        legacy = hashlib.sha256(plain_password.encode("utf-8")).hexdigest()
+        return hmac.compare_digest(legacy, stored_hash)
+
+    algorithm = stored_hash.split("$", 1)[0]
+    hasher = _HASHERS.get(algorithm)
+    if hasher is None:
+        return False
+    try:
+        return hasher.verify(plain_password, stored_hash)
+    except (ValueError, KeyError):
+        # Hash almacenado malformado
+        return False
+
+
+def needs_rehash(stored_hash: str, hasher: PasswordHasher | None = None) -> bool:
+    """True si el hash es heredado o usa otro algoritmo/coste que el actual."""
+    hasher = hasher or _default_hasher
+    if not stored_hash.startswith(hasher.algorithm + "$"):
+        return True
+    return hasher.needs_update(stored_hash)
@@ -18,10 +18,6 @@ def seed_catalog(catalog_service: CatalogService) -> None:
         "V003", "Tesla", "Model 3", 60000.0, 36, "obligatorio", "Eléctrico"
     )
 
-    catalog_service.add_vehicle(v1)
-    catalog_service.add_vehicle(v2)
-    catalog_service.add_vehicle(v3)
-
     s1 = ServiceFactory.create_service(
         "seguro", tipo="Todo Riesgo", precio=1200.0, vigencia_meses=12
     )
@@ -32,6 +28,11 @@ def seed_catalog(catalog_service: CatalogService) -> None:
         "repuesto", nombre="Bujía", precio=15.0, stock=50
     )
 
-    catalog_service.add_service(s1)
-    catalog_service.add_service(r1)
-    catalog_service.add_service(r2)
+    # Una sola versión del catálogo para toda la semilla
+    with catalog_service.batch():
+        catalog_service.add_vehicle(v1)
+        catalog_service.add_vehicle(v2)
+        catalog_service.add_vehicle(v3)
+        catalog_service.add_service(s1)
+        catalog_service.add_service(r1)
+        catalog_service.add_service(r2)
@@ -0,0 +1,36 @@
+# core/ports/async_auth_repo.py
+from typing import List, Optional, Protocol
+
+from core.ports.auth_repo import UserRecord
+
+
+class AsyncAuthRepository(Protocol):
+    """Contrato asíncrono para repositorios de usuarios (mismo significado que IAuthRepository)."""
+
+    async def get(self, username: str) -> Optional[UserRecord]:
+        ...
+
+    async def list_all(self) -> List[UserRecord]:
+        ...
+
+    async def list_page(
+        self,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        role: Optional[str] = None,
+        prefix: Optional[str] = None,
+        descending: bool = False,
+    ) -> List[UserRecord]:
+        ...
+
+    async def count(self, role: Optional[str] = None, prefix: Optional[str] = None) -> int:
+        ...
+
+    async def add(self, user: UserRecord) -> None:
+        ...
+
+    async def update(self, user: UserRecord) -> None:
+        ...
+
+    async def delete(self, username: str) -> None:
+        ...
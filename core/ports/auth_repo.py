@@ -1,6 +1,6 @@
 # core/ports/auth_repo.py
 from dataclasses import dataclass
-from typing import Protocol, Optional, List, Dict
+from typing import ContextManager, Protocol, Optional, List, Dict
 
 
 @dataclass
@@ -20,6 +20,23 @@ class IAuthRepository(Protocol):
     def list_all(self) -> List[UserRecord]:
         ...
 
+    def list_page(
+        self,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        role: Optional[str] = None,
+        prefix: Optional[str] = None,
+        descending: bool = False,
+    ) -> List[UserRecord]:
+        """
+        Página de usuarios ordenados por ``username`` (filtrables por rol
+        y prefijo del nombre). Solo se materializan los de la página.
+        """
+        ...
+
+    def count(self, role: Optional[str] = None, prefix: Optional[str] = None) -> int:
+        ...
+
     def add(self, user: UserRecord) -> None:
         ...
 
@@ -28,3 +45,10 @@ class IAuthRepository(Protocol):
 
     def delete(self, username: str) -> None:
         ...
+
+    def batch(self) -> ContextManager[None]:
+        """
+        Agrupa varias escrituras: se persisten una sola vez al salir del
+        bloque y, si el bloque lanza una excepción, se descartan todas.
+        """
+        ...
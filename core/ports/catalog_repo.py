@@ -0,0 +1,62 @@
+# core/ports/catalog_repo.py
+from typing import Any, ContextManager, Iterable, Iterator, Optional, Protocol
+
+from core.models import Vehiculo
+
+
+class ICatalogRepository(Protocol):
+    """
+    Contrato para cualquier almacén persistente del catálogo (vehículos y
+    servicios: repuestos y seguros).
+    """
+
+    def version(self) -> int:
+        """
+        Número de transacciones confirmadas que cambiaron el catálogo.
+        Crece con cada escritura, así que sirve para saber si una copia en
+        memoria sigue al día.
+        """
+        ...
+
+    def get_vehicle(self, vehicle_id: str) -> Optional[Vehiculo]:
+        ...
+
+    def iter_vehicles(self) -> Iterator[Vehiculo]:
+        """Todos los vehículos, por id, sin cargarlos a la vez en memoria."""
+        ...
+
+    def count_vehicles(self) -> int:
+        ...
+
+    def upsert_vehicle(self, vehicle: Vehiculo) -> None:
+        ...
+
+    def upsert_vehicles(self, vehicles: Iterable[Vehiculo]) -> None:
+        """Alta o reemplazo de muchos vehículos en una sola escritura."""
+        ...
+
+    def delete_vehicle(self, vehicle_id: str) -> None:
+        ...
+
+    def get_service(self, service_id: str) -> Optional[Any]:
+        ...
+
+    def iter_services(self) -> Iterator[Any]:
+        """Todos los servicios, en orden de alta."""
+        ...
+
+    def count_services(self) -> int:
+        ...
+
+    def upsert_service(self, service: Any) -> None:
+        ...
+
+    def delete_service(self, service_id: str) -> None:
+        ...
+
+    def batch(self) -> ContextManager[None]:
+        """
+        Agrupa varias escrituras: se persisten una sola vez al salir del
+        bloque y, si el bloque lanza una excepción, se descartan todas.
+        """
+        ...
@@ -0,0 +1,120 @@
+# core/rate_limit.py
+import hashlib
+import os
+import threading
+import time
+from array import array
+from typing import List, Optional
+
+
+class SlidingWindowSketch:
+    """
+    Contador aproximado por clave en una ventana deslizante con memoria fija.
+
+    Es un count-min sketch (``depth`` filas x ``width`` columnas) en el que
+    cada celda es un anillo de ``buckets`` sub-ventanas. La estimación
+    nunca se queda corta (solo puede sobrestimar por colisiones), que es
+    lo seguro para un limitador. Además guarda, con la misma estructura,
+    hasta cuándo está bloqueada cada clave.
+    """
+
+    def __init__(
+        self,
+        window_seconds: float,
+        width: int = 4096,
+        depth: int = 4,
+        buckets: int = 10,
+    ):
+        self._width = width
+        self._depth = depth
+        self._buckets = buckets
+        self._span = window_seconds / buckets
+        self._salt = os.urandom(16)
+        cells = width * depth
+        self._counts: List[array] = [array("I", bytes(4 * cells)) for _ in range(buckets)]
+        self._epochs: List[int] = [-1] * buckets
+        self._locked_until = array("d", bytes(8 * cells))
+
+    def _cells(self, key: str) -> List[int]:
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8 * self._depth, salt=self._salt).digest()
+        return [
+            row * self._width + int.from_bytes(digest[8 * row:8 * row + 8], "little") % self._width
+            for row in range(self._depth)
+        ]
+
+    def _bucket(self, now: float) -> array:
+        epoch = int(now / self._span)
+        slot = epoch % self._buckets
+        if self._epochs[slot] != epoch:
+            # La sub-ventana caducó: se reutiliza desde cero
+            self._counts[slot] = array("I", bytes(4 * self._width * self._depth))
+            self._epochs[slot] = epoch
+        return self._counts[slot]
+
+    def add(self, key: str, now: float, amount: int = 1) -> int:
+        """Suma ``amount`` y devuelve la estimación actualizada."""
+        bucket = self._bucket(now)
+        cells = self._cells(key)
+        for c in cells:
+            bucket[c] += amount
+        return self._estimate(cells, now)
+
+    def _estimate(self, cells: List[int], now: float) -> int:
+        oldest = int(now / self._span) - self._buckets + 1
+        live = [self._counts[i] for i, e in enumerate(self._epochs) if e >= oldest]
+        return min(sum(b[c] for b in live) for c in cells)
+
+    def estimate(self, key: str, now: float) -> int:
+        return self._estimate(self._cells(key), now)
+
+    def lock(self, key: str, until: float) -> None:
+        for c in self._cells(key):
+            if self._locked_until[c] < until:
+                self._locked_until[c] = until
+
+    def locked(self, key: str, now: float) -> bool:
+        return min(self._locked_until[c] for c in self._cells(key)) > now
+
+
+class LoginRateLimiter:
+    """
+    Limitador de intentos de login por usuario y por origen (IP, kiosco...).
+
+    Cuenta fallos en una ventana deslizante; al superar el umbral la clave
+    queda bloqueada ``lockout_seconds``. ``allow()`` se consulta antes de
+    verificar la contraseña, así el tráfico hostil se rechaza sin gastar
+    CPU en el KDF. La memoria es fija sea cual sea el número de claves.
+    """
+
+    def __init__(
+        self,
+        max_failures_per_user: int = 5,
+        max_failures_per_source: int = 20,
+        window_seconds: float = 300.0,
+        lockout_seconds: float = 900.0,
+        width: int = 4096,
+        depth: int = 4,
+    ):
+        self._max_user = max_failures_per_user
+        self._max_source = max_failures_per_source
+        self._lockout = lockout_seconds
+        self._users = SlidingWindowSketch(window_seconds, width, depth)
+        self._sources = SlidingWindowSketch(window_seconds, width, depth)
+        self._lock = threading.Lock()
+
+    def allow(self, username: str, source: Optional[str] = None) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            if self._users.locked(username, now):
+                return False
+            if source is not None and self._sources.locked(source, now):
+                return False
+            return True
+
+    def record_failure(self, username: str, source: Optional[str] = None) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if self._users.add(username, now) >= self._max_user:
+                self._users.lock(username, now + self._lockout)
+            if source is not None and self._sources.add(source, now) >= self._max_source:
+                self._sources.lock(source, now + self._lockout)
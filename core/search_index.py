@@ -0,0 +1,247 @@
+# core/search_index.py
+import heapq
+import re
+import sys
+from collections import Counter
+from itertools import product
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from core.catalog_index import fold
+from core.cow import ChunkedSortedList, CowDict
+
+# Mayor que cualquier carácter: ``term + _MAX_CHAR`` acota las palabras con ese prefijo.
+_MAX_CHAR = "\U0010ffff"
+
+# Puntuación de un término de la consulta según cómo aparece en una palabra
+# del documento. Las coincidencias aproximadas puntúan por debajo de 1.
+EXACT, PREFIX, SUBSTRING = 3.0, 2.0, 1.0
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Palabras normalizadas (sin mayúsculas ni tildes) de ``text``."""
+    return _WORD_RE.findall(fold(text))
+
+
+def trigrams(word: str, padded: bool = False) -> Set[str]:
+    """
+    Trigramas de ``word``. Con ``padded`` se rellena como ``pg_trgm``
+    ("  kw", " kwi"...), lo que da peso al inicio y al final de palabras cortas.
+    """
+    if padded:
+        word = f"  {word} "
+    return {word[i:i + 3] for i in range(len(word) - 2)}
+
+
+def _words(text: str) -> Tuple[str, ...]:
+    # Internadas: todos los documentos comparten una sola copia de cada palabra
+    return tuple(map(sys.intern, dict.fromkeys(tokenize(text))))
+
+
+class TextSearchIndex:
+    """
+    Índice invertido de texto con búsqueda por fragmentos:
+
+    - palabra normalizada -> ids de los documentos que la contienen (ordenados),
+    - vocabulario ordenado, para términos que son prefijo de una palabra,
+    - trigrama -> palabras del vocabulario, para términos que aparecen en
+      medio de una palabra ("wid" en "kwid") y, si no hay ninguno, para
+      palabras parecidas (erratas: "corrola" -> "corolla").
+
+    Los trigramas se calculan sobre el vocabulario y no sobre los
+    documentos: el vocabulario crece mucho más despacio que el catálogo, así
+    que resolver un término cuesta casi lo mismo con mil artículos que con
+    un millón. ``copy()`` comparte todas las estructuras (copia en escritura).
+    """
+
+    def __init__(
+        self,
+        docs: Iterable[Tuple[str, str]] = (),
+        min_similarity: float = 0.3,
+        max_fuzzy: int = 10,
+    ):
+        self._min_similarity = min_similarity
+        self._max_fuzzy = max_fuzzy
+        # Carga inicial en bloque: cada lista y conjunto se construye una
+        # sola vez en lugar de insertar documento a documento
+        doc_words: Dict[str, Tuple[str, ...]] = {}
+        for doc_id, text in docs:
+            doc_words[doc_id] = _words(text)
+        postings: Dict[str, List[str]] = {}
+        for doc_id, words in doc_words.items():
+            for word in words:
+                postings.setdefault(word, []).append(doc_id)
+        gram_words: Dict[str, Set[str]] = {}
+        for word in postings:
+            for gram in trigrams(word, padded=True):
+                gram_words.setdefault(gram, set()).add(word)
+        self._doc_words = CowDict(doc_words.items())
+        self._postings = CowDict(
+            (word, ChunkedSortedList(ids, load=512)) for word, ids in postings.items()
+        )
+        self._vocabulary = ChunkedSortedList(postings)
+        self._gram_words = CowDict(gram_words.items())
+        # Listas y conjuntos ya copiados en esta versión (los demás se comparten)
+        self._owned_postings: Set[str] = set(postings)
+        self._owned_grams: Set[str] = set(gram_words)
+
+    def __len__(self) -> int:
+        return len(self._doc_words)
+
+    def copy(self) -> "TextSearchIndex":
+        clone = TextSearchIndex.__new__(TextSearchIndex)
+        clone._min_similarity = self._min_similarity
+        clone._max_fuzzy = self._max_fuzzy
+        clone._doc_words = self._doc_words.copy()
+        clone._postings = self._postings.copy()
+        clone._vocabulary = self._vocabulary.copy()
+        clone._gram_words = self._gram_words.copy()
+        clone._owned_postings, clone._owned_grams = set(), set()
+        self._owned_postings, self._owned_grams = set(), set()
+        return clone
+
+    def __getstate__(self) -> dict:
+        # Al cargar una copia guardada nada es propio: se copia antes de escribir
+        return {**self.__dict__, "_owned_postings": set(), "_owned_grams": set()}
+
+    # ---------- mantenimiento ----------
+    def add(self, doc_id: str, text: str) -> None:
+        """Indexa (o reindexa) el documento ``doc_id``."""
+        if doc_id in self._doc_words:
+            self.remove(doc_id)
+        words = _words(text)
+        self._doc_words[doc_id] = words
+        for word in words:
+            if word in self._postings:
+                self._posting(word).add(doc_id)
+                continue
+            self._postings[word] = ChunkedSortedList([doc_id], load=512)
+            self._owned_postings.add(word)
+            self._vocabulary.add(word)
+            for gram in trigrams(word, padded=True):
+                self._gram_set(gram).add(word)
+
+    def add_many(self, docs: Iterable[Tuple[str, str]]) -> None:
+        """Como ``add`` para muchos documentos: cada lista de ids se actualiza una sola vez."""
+        latest = dict(docs)
+        new_postings: Dict[str, List[str]] = {}
+        for doc_id, text in latest.items():
+            if doc_id in self._doc_words:
+                self.remove(doc_id)
+            words = _words(text)
+            self._doc_words[doc_id] = words
+            for word in words:
+                new_postings.setdefault(word, []).append(doc_id)
+        new_words = []
+        for word, ids in new_postings.items():
+            if word in self._postings:
+                self._posting(word).update(ids)
+                continue
+            self._postings[word] = ChunkedSortedList(ids, load=512)
+            self._owned_postings.add(word)
+            new_words.append(word)
+            for gram in trigrams(word, padded=True):
+                self._gram_set(gram).add(word)
+        self._vocabulary.update(new_words)
+
+    def remove(self, doc_id: str) -> None:
+        for word in self._doc_words.pop(doc_id, ()):
+            posting = self._posting(word)
+            posting.discard(doc_id)
+            if len(posting):
+                continue
+            del self._postings[word]
+            self._vocabulary.discard(word)
+            for gram in trigrams(word, padded=True):
+                words = self._gram_set(gram)
+                words.discard(word)
+                if not words:
+                    del self._gram_words[gram]
+                    self._owned_grams.discard(gram)
+
+    def _posting(self, word: str) -> ChunkedSortedList:
+        if word not in self._owned_postings:
+            self._postings[word] = self._postings[word].copy()
+            self._owned_postings.add(word)
+        return self._postings[word]
+
+    def _gram_set(self, gram: str) -> Set[str]:
+        if gram not in self._owned_grams:
+            self._gram_words[gram] = set(self._gram_words.get(gram, ()))
+            self._owned_grams.add(gram)
+        return self._gram_words[gram]
+
+    # ---------- consulta ----------
+    def _matches(self, term: str) -> Dict[str, float]:
+        """Palabras del vocabulario que casan con ``term`` y su puntuación."""
+        scores: Dict[str, float] = {}
+        for word in self._vocabulary.irange(term, term + _MAX_CHAR):
+            scores[word] = EXACT if word == term else PREFIX
+        grams = trigrams(term)
+        if not grams:
+            return scores
+
+        # Subcadena: palabras que contienen todos los trigramas del término
+        sets = sorted((self._gram_words.get(g, set()) for g in grams), key=len)
+        for word in sets[0].intersection(*sets[1:]):
+            if word not in scores and term in word:
+                scores[word] = SUBSTRING
+        if scores:
+            return scores
+
+        # Aproximada: similitud de Jaccard entre trigramas con relleno
+        grams = trigrams(term, padded=True)
+        shared = Counter()
+        for gram in grams:
+            shared.update(self._gram_words.get(gram, ()))
+        similar = []
+        for word, common in shared.items():
+            # Una palabra tiene len + 1 trigramas con relleno (menos si se repiten)
+            similarity = common / (len(grams) + len(word) + 1 - common)
+            if similarity >= self._min_similarity:
+                similar.append((similarity, word))
+        return {word: sim for sim, word in heapq.nlargest(self._max_fuzzy, similar)}
+
+    def _tiers(self, term: str) -> List[Tuple[float, List[str]]]:
+        """Palabras que casan con ``term`` agrupadas por puntuación, de mayor a menor."""
+        by_score: Dict[float, List[str]] = {}
+        for word, score in self._matches(term).items():
+            by_score.setdefault(score, []).append(word)
+        return [(score, sorted(by_score[score])) for score in sorted(by_score, reverse=True)]
+
+    def search(self, query: str, limit: Optional[int] = 20) -> List[Tuple[str, float]]:
+        """
+        ``(doc_id, puntuación)`` de los documentos que contienen todos los
+        términos de ``query``, de mayor a menor puntuación. Cada término
+        suma lo que vale su mejor coincidencia en el documento: palabra
+        exacta, prefijo, subcadena o parecida.
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        per_term = [self._tiers(term) for term in terms]
+        if not per_term or not all(per_term):
+            return []
+
+        # Combinaciones de niveles (uno por término) de mayor a menor suma:
+        # la primera combinación en la que aparece un documento es su
+        # puntuación real, y al llenar la página no hace falta seguir.
+        combos = sorted(
+            product(*per_term), key=lambda combo: -sum(score for score, _ in combo)
+        )
+        results: Dict[str, float] = {}
+        for combo in combos:
+            total = sum(score for score, _ in combo)
+            groups = sorted(
+                (words for _, words in combo),
+                key=lambda words: sum(len(self._postings[w]) for w in words),
+            )
+            others = [set(words) for words in groups[1:]]
+            driver = heapq.merge(*(self._postings[w].irange() for w in groups[0]))
+            for doc_id in driver:
+                if doc_id not in results:
+                    doc_words = self._doc_words[doc_id]
+                    if all(not words.isdisjoint(doc_words) for words in others):
+                        results[doc_id] = total
+                        if limit is not None and len(results) >= limit:
+                            return list(results.items())
+        return list(results.items())
@@ -1,9 +1,15 @@
 # core/services/authentication_service.py
-from dataclasses import dataclass
+import asyncio
+from dataclasses import dataclass, replace
 from typing import Optional
 
-from core.crypto import verify_password
+from core.credential_cache import VerifiedCredentialCache
+from core.crypto import hash_password, needs_rehash, verify_password
+from core.ports.async_auth_repo import AsyncAuthRepository
 from core.ports.auth_repo import IAuthRepository, UserRecord
+from core.rate_limit import LoginRateLimiter
+from core.services.hashing_service import PasswordHashingService
+from core.session_store import SessionStore
 from core.validators import validate_username, validate_password
 
 
@@ -14,38 +20,190 @@ class LoginResult:
     - ok: True / False
     - user: usuario autenticado (o None)
     - code: código de estado para la UI
+    - token: token de sesión si el login fue correcto
     """
     ok: bool
     user: Optional[UserRecord]
     code: str
+    token: Optional[str] = None
+
+
+def _precheck(
+    username: str,
+    password: str,
+    limiter: Optional[LoginRateLimiter] = None,
+    source: Optional[str] = None,
+) -> Optional[LoginResult]:
+    """Rechazos que no necesitan consultar el repositorio."""
+    if not username or not password:
+        return LoginResult(False, None, "EMPTY")
+
+    if not validate_username(username):
+        return LoginResult(False, None, "INVALID_USERNAME")
+
+    if limiter is not None and not limiter.allow(username, source):
+        return LoginResult(False, None, "RATE_LIMITED")
+
+    return None
+
+
+def _failed(
+    limiter: Optional[LoginRateLimiter], username: str, source: Optional[str], code: str
+) -> LoginResult:
+    # Usuario inexistente también cuenta: si no, se podría enumerar sin límite
+    if limiter is not None:
+        limiter.record_failure(username, source)
+    return LoginResult(False, None, code)
 
 
 class AuthenticationService:
-    def __init__(self, repo: IAuthRepository):
+    """
+    Login contra el repositorio. Con ``hashing`` la verificación corre en
+    el pool de procesos. Tras un login correcto, los hash heredados
+    (SHA-256 sin sal) o con coste desactualizado se regeneran de forma
+    transparente. Con ``credential_cache`` los logins repetidos con las
+    mismas credenciales no vuelven a pagar el KDF.
+
+    Cada login correcto abre una sesión en ``sessions`` y devuelve su
+    token; ``current_user`` es la sesión del último login de este
+    proceso (la que usa la GUI).
+
+    Con ``rate_limiter`` los usuarios u orígenes (``source``) bloqueados
+    por fallos repetidos se rechazan con "RATE_LIMITED" antes de tocar
+    el repositorio o el KDF.
+    """
+
+    def __init__(
+        self,
+        repo: IAuthRepository,
+        hashing: Optional[PasswordHashingService] = None,
+        credential_cache: Optional[VerifiedCredentialCache] = None,
+        sessions: Optional[SessionStore] = None,
+        rate_limiter: Optional[LoginRateLimiter] = None,
+    ):
         self._repo = repo
-        self._current_user: Optional[UserRecord] = None
+        self._hashing = hashing
+        self._cache = credential_cache
+        self._sessions = sessions if sessions is not None else SessionStore()
+        self._limiter = rate_limiter
+        self._current_token: Optional[str] = None
+
+    @property
+    def sessions(self) -> SessionStore:
+        return self._sessions
 
     @property
     def current_user(self) -> Optional[UserRecord]:
-        return self._current_user
+        if self._current_token is None:
+            return None
+        return self._sessions.user_for(self._current_token)
 
-    def login(self, username: str, password: str) -> LoginResult:
-        if not username or not password:
-            return LoginResult(False, None, "EMPTY")
+    def user_for_token(self, token: str) -> Optional[UserRecord]:
+        return self._sessions.user_for(token)
 
-        if not validate_username(username):
-            return LoginResult(False, None, "INVALID_USERNAME")
+    def login(self, username: str, password: str, source: Optional[str] = None) -> LoginResult:
+        rejected = _precheck(username, password, self._limiter, source)
+        if rejected:
+            return rejected
 
         # (opcional) no validamos formato de contraseña aquí para no filtrar info
         user = self._repo.get(username)
         if not user:
-            return LoginResult(False, None, "NOT_FOUND")
+            return _failed(self._limiter, username, source, "NOT_FOUND")
+
+        if self._cache is None or not self._cache.contains(username, password, user.pw_hash):
+            verify = self._hashing.verify if self._hashing else verify_password
+            if not verify(password, user.pw_hash):
+                return _failed(self._limiter, username, source, "BAD_PASSWORD")
+            user = self._upgrade_hash(user, password)
+            if self._cache is not None:
+                self._cache.add(username, password, user.pw_hash)
+
+        token = self._sessions.create(user)
+        self._current_token = token
+        return LoginResult(True, user, "OK", token)
+
+    def _upgrade_hash(self, user: UserRecord, password: str) -> UserRecord:
+        hasher = self._hashing.hasher if self._hashing else None
+        if not needs_rehash(user.pw_hash, hasher):
+            return user
+        new_hash = self._hashing.hash(password) if self._hashing else hash_password(password)
+        upgraded = replace(user, pw_hash=new_hash)
+        try:
+            self._repo.update(upgraded)
+        except (KeyError, PermissionError):
+            # Usuario borrado mientras tanto o repositorio de solo lectura
+            return user
+        return upgraded
+
+    def logout(self, token: Optional[str] = None) -> None:
+        """Cierra la sesión indicada o, sin token, la del usuario actual."""
+        if token is None:
+            token, self._current_token = self._current_token, None
+        elif token == self._current_token:
+            self._current_token = None
+        if token is not None:
+            self._sessions.revoke(token)
+
+
+class AsyncAuthenticationService:
+    """
+    Variante asíncrona para servidores: no guarda un usuario actual,
+    cada login correcto devuelve el token de su sesión. La verificación del hash se
+    ejecuta fuera del event loop (en el pool de procesos si se inyecta).
+    """
+
+    def __init__(
+        self,
+        repo: AsyncAuthRepository,
+        hashing: Optional[PasswordHashingService] = None,
+        credential_cache: Optional[VerifiedCredentialCache] = None,
+        sessions: Optional[SessionStore] = None,
+        rate_limiter: Optional[LoginRateLimiter] = None,
+    ):
+        self._repo = repo
+        self._hashing = hashing
+        self._cache = credential_cache
+        self._sessions = sessions if sessions is not None else SessionStore()
+        self._limiter = rate_limiter
+
+    @property
+    def sessions(self) -> SessionStore:
+        return self._sessions
+
+    def user_for_token(self, token: str) -> Optional[UserRecord]:
+        return self._sessions.user_for(token)
+
+    def logout(self, token: str) -> None:
+        self._sessions.revoke(token)
+
+    async def login(self, username: str, password: str, source: Optional[str] = None) -> LoginResult:
+        rejected = _precheck(username, password, self._limiter, source)
+        if rejected:
+            return rejected
+
+        user = await self._repo.get(username)
+        if not user:
+            return _failed(self._limiter, username, source, "NOT_FOUND")
+
+        if self._cache is not None and self._cache.contains(username, password, user.pw_hash):
+            return LoginResult(True, user, "OK", self._sessions.create(user))
 
-        if not verify_password(password, user.pw_hash):
-            return LoginResult(False, None, "BAD_PASSWORD")
+        loop = asyncio.get_running_loop()
+        verify = self._hashing.verify if self._hashing else verify_password
+        if not await loop.run_in_executor(None, verify, password, user.pw_hash):
+            return _failed(self._limiter, username, source, "BAD_PASSWORD")
 
-        self._current_user = user
-        return LoginResult(True, user, "OK")
+        hasher = self._hashing.hasher if self._hashing else None
+        if needs_rehash(user.pw_hash, hasher):
+            hash_fn = self._hashing.hash if self._hashing else hash_password
+            upgraded = replace(user, pw_hash=await loop.run_in_executor(None, hash_fn, password))
+            try:
+                await self._repo.update(upgraded)
+                user = upgraded
+            except (KeyError, PermissionError):
+                pass
 
-    def logout(self) -> None:
-        self._current_user = None
+        if self._cache is not None:
+            self._cache.add(username, password, user.pw_hash)
+        return LoginResult(True, user, "OK", self._sessions.create(user))
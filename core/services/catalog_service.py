@@ -1,64 +1,775 @@
 # core/services/catalog_service.py
-from typing import Dict, List, Any, Optional
+import copy
+import gc
+import os
+import pickle
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, fields, is_dataclass, replace
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Any, Mapping, Optional, Tuple
 
+from core.catalog_columns import HAS_NUMPY, ColumnTable, GroupStats, stock_table, vehicle_table
+from core.catalog_feed import CatalogChange, ChangeFeed
+from core.catalog_import import ImportReport, RejectedRow, vehicle_from_row
+from core.catalog_index import VehicleIndex, fold
+from core.cow import CowDict
 from core.models import Vehiculo
+from core.ports.catalog_repo import ICatalogRepository
+from core.search_index import TextSearchIndex
+
+# Cabecera de los archivos de ``save_snapshot``: cambia si cambia la estructura guardada
+_SNAPSHOT_FORMAT = "catalog-snapshot/3"
+
+
+class InsufficientStockError(ValueError):
+    """No hay stock suficiente de un repuesto (ya no se recorta a cero)."""
+
+    def __init__(self, item_id: str, requested: int, available: int):
+        super().__init__(
+            f"Stock insuficiente para {item_id}: se piden {requested}, hay {available}."
+        )
+        self.item_id = item_id
+        self.requested = requested
+        self.available = available
+
+
+def _vehicle_text(v: Vehiculo) -> str:
+    return f"{v.marca} {v.modelo} {v.descripcion}"
+
+
+def _service_text(s: Any) -> str:
+    # El tipo ("Repuesto", "Seguro") también se puede buscar
+    name = getattr(s, "nombre", None) or getattr(s, "tipo", "")
+    return f"{type(s).__name__} {name}"
+
+
+def _with_changes(item: Any, changes: Dict[str, Any]) -> Any:
+    """Copia de ``item`` con ``changes`` aplicados; el original no se toca."""
+    if is_dataclass(item):
+        return replace(item, **changes)
+    clone = copy.copy(item)
+    for field, value in changes.items():
+        setattr(clone, field, value)
+    return clone
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    """
+    Versión inmutable del catálogo. Se puede leer desde cualquier hilo sin
+    bloqueos: las escrituras nunca la modifican, publican una versión nueva
+    que comparte con esta todo lo que no cambió.
+
+    ``vehicle_columns``/``stock_columns`` son la vista columnar opcional
+    (NumPy) de vehículos y repuestos; sin ella las consultas analíticas
+    dan el mismo resultado recorriendo los índices.
+    """
+    version: int
+    vehicles: CowDict
+    services: CowDict
+    vehicle_index: VehicleIndex
+    vehicle_text: TextSearchIndex
+    service_text: TextSearchIndex
+    vehicle_columns: Optional[ColumnTable] = None
+    stock_columns: Optional[ColumnTable] = None
+
+    # ---------- Vehículos ----------
+    def list_vehicles(self) -> List[Vehiculo]:
+        """Todos los vehículos, por id."""
+        return self.vehicle_index.query(self.vehicles)
+
+    def get_vehicle(self, vehicle_id: str) -> Optional[Vehiculo]:
+        return self.vehicles.get(vehicle_id)
+
+    def query_vehicles(
+        self,
+        marca: Optional[str] = None,
+        modelo_prefix: Optional[str] = None,
+        price_min: Optional[float] = None,
+        price_max: Optional[float] = None,
+        garantia_min: Optional[int] = None,
+        sort: str = "id",
+        offset: int = 0,
+        limit: Optional[int] = None,
+    ) -> List[Vehiculo]:
+        """
+        Vehículos filtrados por marca (sin distinguir mayúsculas ni tildes),
+        prefijo de modelo, rango de precio y garantía mínima, ordenados por
+        ``sort`` ("id", "precio", "-precio", "marca" o "modelo") y paginados.
+        Usa los índices secundarios en lugar de recorrer todo el catálogo.
+        """
+        return self.vehicle_index.query(
+            self.vehicles, marca, modelo_prefix, price_min, price_max,
+            garantia_min, sort, offset, limit,
+        )
+
+    def search_vehicles(self, text: str, limit: Optional[int] = 20) -> List[Vehiculo]:
+        """
+        Búsqueda libre por fragmentos de marca, modelo o descripción
+        ("kwid", "electrico", "sedan"), sin distinguir mayúsculas ni tildes
+        y tolerando erratas. Resultados de más a menos relevantes.
+        """
+        return [self.vehicles[vid] for vid, _ in self.vehicle_text.search(text, limit)]
+
+    def vehicle_marcas(self) -> List[str]:
+        """Marcas distintas presentes en el catálogo."""
+        return self.vehicle_index.marcas()
+
+    # ---------- Analítica ----------
+    def _vehicle_mask(self, marca, price_min, price_max, garantia_min):
+        return self.vehicle_columns.mask(
+            ranges={"precio": (price_min, price_max), "garantia_meses": (garantia_min, None)},
+            equals={"marca": marca},
+        )
+
+    def count_vehicles(
+        self,
+        marca: Optional[str] = None,
+        price_min: Optional[float] = None,
+        price_max: Optional[float] = None,
+        garantia_min: Optional[int] = None,
+    ) -> int:
+        """Cuántos vehículos cumplen los filtros (los de ``query_vehicles``)."""
+        if self.vehicle_columns is None:
+            if marca is None and price_min is None and price_max is None and garantia_min is None:
+                return len(self.vehicles)
+            return len(self.query_vehicles(marca, None, price_min, price_max, garantia_min))
+        return int(self._vehicle_mask(marca, price_min, price_max, garantia_min).sum())
+
+    def cheapest_vehicles(
+        self,
+        k: int = 10,
+        marca: Optional[str] = None,
+        price_min: Optional[float] = None,
+        price_max: Optional[float] = None,
+        garantia_min: Optional[int] = None,
+    ) -> List[Vehiculo]:
+        """Los ``k`` vehículos más baratos que cumplen los filtros (a igual precio, por id)."""
+        # Filtrando solo por precio, el índice de precios ya da el orden pedido
+        if self.vehicle_columns is None or (marca is None and garantia_min is None):
+            return self.query_vehicles(
+                marca, None, price_min, price_max, garantia_min, sort="precio", limit=max(k, 0)
+            )
+        mask = self._vehicle_mask(marca, price_min, price_max, garantia_min)
+        return [self.vehicles[vid] for vid in self.vehicle_columns.smallest("precio", k, mask)]
+
+    def vehicle_price_stats(self, by: str = "marca") -> List[GroupStats]:
+        """
+        Cuenta, precio medio, mínimo y máximo por ``by`` ("marca" o
+        "mantenimiento_tipo"), agrupando sin distinguir mayúsculas ni
+        tildes. Ordenado por grupo.
+        """
+        if by not in ("marca", "mantenimiento_tipo"):
+            raise ValueError(f"Agrupación no soportada: {by}")
+        if self.vehicle_columns is not None:
+            return self.vehicle_columns.group_stats("precio", by)
+        groups: Dict[str, List] = {}
+        for v in self.list_vehicles():
+            name = getattr(v, by)
+            group = groups.setdefault(fold(name), [name.strip(), []])
+            group[1].append(v.precio)
+        return [
+            GroupStats(name, len(prices), sum(prices) / len(prices), min(prices), max(prices))
+            for _, (name, prices) in sorted(groups.items())
+        ]
+
+    def low_stock_repuestos(self, threshold: int = 5) -> List[Any]:
+        """Repuestos con stock <= ``threshold``, de menos a más stock (a igual stock, por id)."""
+        if self.stock_columns is None:
+            low = [s for s in self.services.values() if hasattr(s, "stock") and s.stock <= threshold]
+            return sorted(low, key=lambda s: (s.stock, s.id))
+        mask = self.stock_columns.mask(ranges={"stock": (None, threshold)})
+        return [self.services[sid] for sid in self.stock_columns.smallest("stock", None, mask)]
+
+    # ---------- Servicios ----------
+    def list_services(self) -> List[Any]:
+        """Todos los servicios, por id."""
+        return sorted(self.services.values(), key=lambda s: s.id)
+
+    def get_service(self, service_id: str) -> Optional[Any]:
+        return self.services.get(service_id)
+
+    def search_services(self, text: str, limit: Optional[int] = 20) -> List[Any]:
+        """Búsqueda libre en repuestos y seguros (nombre, tipo), como ``search_vehicles``."""
+        return [self.services[sid] for sid, _ in self.service_text.search(text, limit)]
+
+
+@contextmanager
+def _gc_paused() -> Iterator[None]:
+    # Crear millones de objetos dispara el GC cíclico sin motivo: ninguno forma ciclos
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if was_enabled:
+            gc.enable()
+
+
+def _build_snapshot(
+    version: int, vehicles: Iterable[Vehiculo], services: Iterable[Any], columnar: bool = False
+) -> CatalogSnapshot:
+    """Instantánea completa con los índices construidos en bloque."""
+    vehicle_map = CowDict((v.id, v) for v in vehicles)
+    service_map = CowDict((s.id, s) for s in services)
+    snap = CatalogSnapshot(
+        version=version,
+        vehicles=vehicle_map,
+        services=service_map,
+        vehicle_index=VehicleIndex(vehicle_map.items()),
+        vehicle_text=TextSearchIndex((vid, _vehicle_text(v)) for vid, v in vehicle_map.items()),
+        service_text=TextSearchIndex((sid, _service_text(s)) for sid, s in service_map.items()),
+    )
+    return _with_columns(snap, columnar)
+
+
+def _with_columns(snap: CatalogSnapshot, columnar: bool) -> CatalogSnapshot:
+    """``snap`` con la vista columnar creada o quitada según ``columnar``."""
+    if columnar == (snap.vehicle_columns is not None):
+        return snap
+    if not columnar:
+        return replace(snap, vehicle_columns=None, stock_columns=None)
+    return replace(
+        snap,
+        vehicle_columns=vehicle_table(snap.vehicles.items()),
+        stock_columns=stock_table(snap.services.items()),
+    )
+
+
+# Cambio pendiente de publicar: (tipo, entidad, id, objeto nuevo)
+_Change = Tuple[str, str, str, Any]
+
+
+class _VehicleDraft:
+    """Copia en escritura de la parte de vehículos de una instantánea."""
+
+    def __init__(
+        self, snapshot: CatalogSnapshot, repo: Optional[ICatalogRepository], changes: List[_Change]
+    ):
+        self.vehicles = snapshot.vehicles.copy()
+        self.index = snapshot.vehicle_index.copy()
+        self.text = snapshot.vehicle_text.copy()
+        self.columns = None if snapshot.vehicle_columns is None else snapshot.vehicle_columns.copy()
+        self._repo = repo
+        self._changes = changes
+
+    def put(self, vehicle_id: str, vehicle: Vehiculo) -> None:
+        if self._repo is not None:
+            self._repo.upsert_vehicle(vehicle)
+        old = self.vehicles.get(vehicle_id)
+        if old is not None:
+            self.index.remove(vehicle_id, old)
+        self.vehicles[vehicle_id] = vehicle
+        self.index.add(vehicle_id, vehicle)
+        self.text.add(vehicle_id, _vehicle_text(vehicle))
+        self._changes.append(("add" if old is None else "edit", "vehicle", vehicle_id, vehicle))
+        if self.columns is not None:
+            self.columns.put(vehicle_id, vehicle)
+
+    def put_many(self, vehicles: Dict[str, Vehiculo]) -> None:
+        """Como ``put`` para muchos: los índices se actualizan una vez, al final."""
+        if self._repo is not None:
+            self._repo.upsert_vehicles(vehicles.values())
+        for vehicle_id, vehicle in vehicles.items():
+            old = self.vehicles.get(vehicle_id)
+            if old is not None:
+                self.index.remove(vehicle_id, old)
+            self.vehicles[vehicle_id] = vehicle
+            self._changes.append(("add" if old is None else "edit", "vehicle", vehicle_id, vehicle))
+        self.index.add_many(vehicles.items())
+        self.text.add_many((vid, _vehicle_text(v)) for vid, v in vehicles.items())
+        if self.columns is not None:
+            self.columns.put_many(vehicles.items())
+
+    def delete(self, vehicle_id: str) -> None:
+        if self._repo is not None:
+            self._repo.delete_vehicle(vehicle_id)
+        self.index.remove(vehicle_id, self.vehicles.pop(vehicle_id))
+        self.text.remove(vehicle_id)
+        self._changes.append(("delete", "vehicle", vehicle_id, None))
+        if self.columns is not None:
+            self.columns.delete(vehicle_id)
+
+
+class _ServiceDraft:
+    """Copia en escritura de la parte de servicios de una instantánea."""
+
+    def __init__(
+        self, snapshot: CatalogSnapshot, repo: Optional[ICatalogRepository], changes: List[_Change]
+    ):
+        self.services = snapshot.services.copy()
+        self.text = snapshot.service_text.copy()
+        self.stock = None if snapshot.stock_columns is None else snapshot.stock_columns.copy()
+        self._repo = repo
+        self._changes = changes
+
+    def put(self, service_id: str, service: Any, kind: Optional[str] = None) -> None:
+        """
+        ``kind`` del cambio publicado: por defecto "add" o "edit". Con
+        "stock" solo cambió el stock y el índice de texto no se toca.
+        """
+        if self._repo is not None:
+            self._repo.upsert_service(service)
+        if kind is None:
+            kind = "add" if service_id not in self.services else "edit"
+        self._changes.append((kind, "service", service_id, service))
+        self.services[service_id] = service
+        if kind != "stock":
+            self.text.add(service_id, _service_text(service))
+        if self.stock is not None:
+            if hasattr(service, "stock"):
+                self.stock.put(service_id, service)
+            else:
+                self.stock.delete(service_id)
+
+    def delete(self, service_id: str) -> None:
+        if self._repo is not None:
+            self._repo.delete_service(service_id)
+        del self.services[service_id]
+        self.text.remove(service_id)
+        self._changes.append(("delete", "service", service_id, None))
+        if self.stock is not None:
+            self.stock.delete(service_id)
+
+
+class _Draft:
+    """
+    Versión en construcción. Cada parte se copia la primera vez que se
+    toca; lo que no se toca se publica tal cual. Con repositorio, cada
+    cambio se escribe también en él (dentro de su transacción).
+    """
+
+    def __init__(self, base: CatalogSnapshot, repo: Optional[ICatalogRepository]):
+        self._base = base
+        self._repo = repo
+        self._vehicles: Optional[_VehicleDraft] = None
+        self._services: Optional[_ServiceDraft] = None
+        self.changes: List[_Change] = []
+
+    @property
+    def vehicles(self) -> _VehicleDraft:
+        if self._vehicles is None:
+            self._vehicles = _VehicleDraft(self._base, self._repo, self.changes)
+        return self._vehicles
+
+    @property
+    def services(self) -> _ServiceDraft:
+        if self._services is None:
+            self._services = _ServiceDraft(self._base, self._repo, self.changes)
+        return self._services
+
+    def get_vehicle(self, vehicle_id: str) -> Optional[Vehiculo]:
+        source = self._base.vehicles if self._vehicles is None else self._vehicles.vehicles
+        return source.get(vehicle_id)
+
+    def get_service(self, service_id: str) -> Optional[Any]:
+        source = self._base.services if self._services is None else self._services.services
+        return source.get(service_id)
+
+    def publish(self) -> CatalogSnapshot:
+        """
+        Instantánea con los cambios y la versión siguiente a la base (la que
+        deja el repositorio al confirmarlos); la misma base si no hay cambios.
+        """
+        if not self.changes:
+            return self._base
+        changes: Dict[str, Any] = {"version": self._base.version + 1}
+        if self._vehicles is not None:
+            changes.update(
+                vehicles=self._vehicles.vehicles,
+                vehicle_index=self._vehicles.index,
+                vehicle_text=self._vehicles.text,
+                vehicle_columns=self._vehicles.columns,
+            )
+        if self._services is not None:
+            changes.update(
+                services=self._services.services,
+                service_text=self._services.text,
+                stock_columns=self._services.stock,
+            )
+        return replace(self._base, **changes)
 
 
 class CatalogService:
     """
     Única fuente para mutar el catálogo en memoria.
     Maneja vehículos y servicios (repuestos/seguros).
+
+    El catálogo es una sucesión de instantáneas inmutables
+    (``CatalogSnapshot``). Las lecturas toman la instantánea actual sin
+    bloqueos y nunca ven una escritura a medias; cada escritura, serializada
+    con un lock solo de escritores, construye la versión siguiente
+    compartiendo lo que no cambia y la publica con una única asignación.
+    Los ``Vehiculo`` y servicios guardados no se modifican nunca en sitio:
+    editar o descontar stock sustituye el objeto por una copia.
+
+    Con ``repository`` el catálogo es persistente: cada escritura se
+    confirma en el repositorio antes de publicarse y la versión de la
+    instantánea es la del repositorio. Nada se carga al construir el
+    servicio; la instantánea se carga al primer uso (o con ``preload``) y,
+    hasta entonces, ``get_vehicle``/``get_service`` consultan directamente
+    el repositorio. Si ``snapshot_file`` guarda una instantánea de la misma
+    versión (``save_snapshot``), se carga de ahí sin reconstruir índices.
+    Si otro proceso escribió en el repositorio, la siguiente escritura lo
+    detecta por la versión y recarga la instantánea antes de aplicar sus
+    cambios; hasta entonces las lecturas siguen viendo la anterior.
+
+    Con ``columnar=True`` (requiere numpy) cada versión mantiene además una
+    vista columnar de precios, garantías, marcas y stock, actualizada en
+    cada escritura, para que ``count_vehicles``, ``cheapest_vehicles``,
+    ``vehicle_price_stats`` y ``low_stock_repuestos`` trabajen sobre arrays.
+    Sin ella esas consultas dan lo mismo recorriendo los índices.
+
+    Cada versión publicada deja sus cambios (altas, ediciones, bajas y
+    movimientos de stock) en un registro acotado a ``feed_capacity``
+    cambios: ``changes_since(version)`` y ``subscribe`` permiten a vistas y
+    cachés actualizarse por diferencias en lugar de recargar todo.
     """
 
-    def __init__(self):
-        self._vehicles: Dict[str, Vehiculo] = {}
-        self._services: Dict[str, Any] = {}
+    def __init__(
+        self,
+        repository: Optional[ICatalogRepository] = None,
+        snapshot_file: Optional[str] = None,
+        columnar: bool = False,
+        feed_capacity: int = 10_000,
+    ):
+        if columnar and not HAS_NUMPY:
+            raise ImportError("columnar=True necesita numpy")
+        self._repo = repository
+        self._snapshot_file = snapshot_file
+        self._columnar = columnar
+        # Solo lo toman los escritores (y la carga); reentrante para anidar dentro de ``batch``
+        self._write_lock = threading.RLock()
+        self._draft: Optional[_Draft] = None
+        self._snapshot: Optional[CatalogSnapshot] = (
+            None if repository is not None else _build_snapshot(0, (), (), self._columnar)
+        )
+        self._feed = ChangeFeed(feed_capacity)
+        if self._snapshot is not None:
+            self._feed.start(self._snapshot.version)
+
+    def snapshot(self) -> CatalogSnapshot:
+        """Instantánea actual; sigue siendo válida aunque el catálogo cambie después."""
+        snap = self._snapshot
+        if snap is None:
+            with self._write_lock:
+                if self._snapshot is None:
+                    self._snapshot = self._load()
+                    self._feed.start(self._snapshot.version)
+                snap = self._snapshot
+        return snap
+
+    @property
+    def version(self) -> int:
+        return self.snapshot().version
+
+    def is_empty(self) -> bool:
+        """Sin vehículos ni servicios (no obliga a cargar la instantánea)."""
+        snap = self._snapshot
+        if snap is None:
+            return not self._repo.count_vehicles() and not self._repo.count_services()
+        return not len(snap.vehicles) and not snap.services
+
+    def preload(self, background: bool = False) -> None:
+        """Carga la instantánea ya (o en un hilo aparte) en lugar de al primer uso."""
+        if background:
+            threading.Thread(target=self.snapshot, name="catalog-preload", daemon=True).start()
+        else:
+            self.snapshot()
+
+    # ---------- Persistencia ----------
+    def _load(self) -> CatalogSnapshot:
+        version = self._repo.version()
+        with _gc_paused():
+            snap = self._read_snapshot_file(version)
+            if snap is None:
+                return _build_snapshot(
+                    version, self._repo.iter_vehicles(), self._repo.iter_services(), self._columnar
+                )
+            # Guardada con otra configuración (o sin numpy): se ajusta la vista columnar
+            return _with_columns(snap, self._columnar)
+
+    def _read_snapshot_file(self, version: int) -> Optional[CatalogSnapshot]:
+        if self._snapshot_file is None or not os.path.exists(self._snapshot_file):
+            return None
+        try:
+            with open(self._snapshot_file, "rb") as f:
+                # La cabecera va aparte: una copia desfasada se descarta sin leerla entera
+                if pickle.load(f) != (_SNAPSHOT_FORMAT, version):
+                    return None
+                snap = pickle.load(f)
+        except Exception:
+            # Archivo dañado o de otra versión del código: se reconstruye del repositorio
+            return None
+        return snap if isinstance(snap, CatalogSnapshot) else None
+
+    def save_snapshot(self) -> bool:
+        """
+        Guarda la instantánea actual en ``snapshot_file`` para arrancar en
+        caliente la próxima vez. False si no hay archivo configurado o la
+        instantánea no llegó a cargarse.
+        """
+        snap = self._snapshot
+        if self._snapshot_file is None or snap is None:
+            return False
+        tmp = self._snapshot_file + ".tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump((_SNAPSHOT_FORMAT, snap.version), f, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(snap, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self._snapshot_file)
+        return True
+
+    @contextmanager
+    def batch(self) -> Iterator["CatalogService"]:
+        """
+        Agrupa varias escrituras en una sola versión (altas masivas,
+        semillas): los lectores ven todas a la vez al salir del bloque, o
+        ninguna si sale una excepción. Dentro del bloque las lecturas siguen
+        viendo la versión anterior.
+        """
+        with self._write():
+            yield self
+
+    @contextmanager
+    def _write(self) -> Iterator[_Draft]:
+        with self._write_lock:
+            if self._draft is not None:
+                # Dentro de ``batch``: se publica al cerrar el lote
+                yield self._draft
+                return
+            try:
+                # Se confirma en el repositorio antes de publicar
+                with self._repo.batch() if self._repo is not None else nullcontext():
+                    draft = self._draft = _Draft(self._current_base(), self._repo)
+                    yield draft
+                self._snapshot = snap = draft.publish()
+            finally:
+                self._draft = None
+            # Aún con el lock: los suscriptores reciben las versiones en orden
+            self._feed.publish(CatalogChange(snap.version, *change) for change in draft.changes)
+
+    def _current_base(self) -> CatalogSnapshot:
+        """
+        Instantánea sobre la que escribir, recargada si el repositorio va
+        por otra versión (escribió otro proceso). Se llama dentro de la
+        transacción del repositorio, que ya excluye a los demás escritores.
+        """
+        snap = self.snapshot()
+        if self._repo is None or self._repo.version() == snap.version:
+            return snap
+        self._snapshot = snap = self._load()
+        # Los cambios del otro proceso no están en el registro: quien pregunte recarga
+        self._feed.reset(snap.version)
+        return snap
+
+    # ---------- Cambios ----------
+    def changes_since(self, version: int) -> Optional[List[CatalogChange]]:
+        """
+        Cambios publicados después de ``version`` (la de la última
+        instantánea que vio quien pregunta), en orden. None si ya no están
+        en el registro: hay que recargar y seguir desde ``version`` actual.
+        """
+        return self._feed.since(version)
+
+    def subscribe(self, callback: Callable[[List[CatalogChange]], None]) -> Callable[[], None]:
+        """
+        Llama a ``callback`` con los cambios de cada versión publicada, en
+        el hilo escritor y con el lock de escritura tomado (debe ser rápido
+        y no esperar a otros hilos). Devuelve la función para darse de baja.
+        """
+        return self._feed.subscribe(callback)
 
     # ---------- Vehículos ----------
     def list_vehicles(self) -> List[Vehiculo]:
-        return list(self._vehicles.values())
+        return self.snapshot().list_vehicles()
 
     def get_vehicle(self, vehicle_id: str) -> Optional[Vehiculo]:
-        return self._vehicles.get(vehicle_id)
+        snap = self._snapshot
+        if snap is None:
+            return self._repo.get_vehicle(vehicle_id)
+        return snap.get_vehicle(vehicle_id)
+
+    def query_vehicles(
+        self,
+        marca: Optional[str] = None,
+        modelo_prefix: Optional[str] = None,
+        price_min: Optional[float] = None,
+        price_max: Optional[float] = None,
+        garantia_min: Optional[int] = None,
+        sort: str = "id",
+        offset: int = 0,
+        limit: Optional[int] = None,
+    ) -> List[Vehiculo]:
+        """Ver ``CatalogSnapshot.query_vehicles``."""
+        return self.snapshot().query_vehicles(
+            marca, modelo_prefix, price_min, price_max, garantia_min, sort, offset, limit
+        )
+
+    def search_vehicles(self, text: str, limit: Optional[int] = 20) -> List[Vehiculo]:
+        """Ver ``CatalogSnapshot.search_vehicles``."""
+        return self.snapshot().search_vehicles(text, limit)
+
+    def vehicle_marcas(self) -> List[str]:
+        return self.snapshot().vehicle_marcas()
+
+    def count_vehicles(
+        self,
+        marca: Optional[str] = None,
+        price_min: Optional[float] = None,
+        price_max: Optional[float] = None,
+        garantia_min: Optional[int] = None,
+    ) -> int:
+        """Ver ``CatalogSnapshot.count_vehicles``."""
+        return self.snapshot().count_vehicles(marca, price_min, price_max, garantia_min)
+
+    def cheapest_vehicles(
+        self,
+        k: int = 10,
+        marca: Optional[str] = None,
+        price_min: Optional[float] = None,
+        price_max: Optional[float] = None,
+        garantia_min: Optional[int] = None,
+    ) -> List[Vehiculo]:
+        """Ver ``CatalogSnapshot.cheapest_vehicles``."""
+        return self.snapshot().cheapest_vehicles(k, marca, price_min, price_max, garantia_min)
+
+    def vehicle_price_stats(self, by: str = "marca") -> List[GroupStats]:
+        """Ver ``CatalogSnapshot.vehicle_price_stats``."""
+        return self.snapshot().vehicle_price_stats(by)
 
     def add_vehicle(self, vehicle: Vehiculo) -> None:
-        self._vehicles[vehicle.id] = vehicle
+        with self._write() as draft:
+            draft.vehicles.put(vehicle.id, vehicle)
+
+    def upsert_vehicles(self, vehicles: Iterable[Vehiculo]) -> int:
+        """
+        Alta o reemplazo de muchos vehículos en una sola versión (si un id
+        se repite, gana el último). Devuelve cuántos se escribieron.
+        """
+        by_id = {v.id: v for v in vehicles}
+        if by_id:
+            with self._write() as draft:
+                draft.vehicles.put_many(by_id)
+        return len(by_id)
+
+    def import_vehicles(
+        self,
+        rows: Iterable[Optional[Mapping]],
+        chunk_size: int = 10_000,
+        max_errors: int = 100,
+        atomic: bool = False,
+    ) -> ImportReport:
+        """
+        Importación masiva en streaming (p. ej. desde ``read_vehicles``).
+
+        Por bloques de ``chunk_size`` filas: convierte cada fila con
+        ``VehicleFactory`` validando tipos y escribe el bloque con
+        ``upsert_vehicles``, que actualiza los índices una vez por bloque.
+        Solo hay un bloque de filas en memoria a la vez. Las filas
+        rechazadas no cortan la importación; el informe guarda las
+        ``max_errors`` primeras y el total.
+
+        Cada bloque se confirma y publica por separado: entre bloques el
+        lock de escritura queda libre y las compras o ediciones no esperan
+        a que acabe el archivo; si algo falla, los bloques anteriores ya
+        están guardados. Con ``atomic=True`` toda la importación es un
+        único ``batch()`` (una versión, todo o nada), a costa de bloquear
+        las demás escrituras mientras dura.
+        """
+        report = ImportReport()
+        started = time.perf_counter()
+        numbered = enumerate(rows, start=1)
+        with self.batch() if atomic else nullcontext():
+            while True:
+                # El GC se pausa por bloque, no durante todo el archivo
+                with _gc_paused():
+                    chunk = list(islice(numbered, chunk_size))
+                    if not chunk:
+                        break
+                    vehicles = []
+                    for row_number, row in chunk:
+                        try:
+                            vehicles.append(vehicle_from_row(row))
+                        except ValueError as exc:
+                            report.rejected += 1
+                            if len(report.errors) < max_errors:
+                                report.errors.append(RejectedRow(row_number, str(exc)))
+                    # Un id repetido en el bloque se escribe (y cuenta) una vez
+                    report.imported += self.upsert_vehicles(vehicles)
+                    report.read += len(chunk)
+        report.seconds = time.perf_counter() - started
+        return report
 
     def edit_vehicle(self, vehicle_id: str, changes: Dict[str, Any]) -> bool:
-        v = self._vehicles.get(vehicle_id)
-        if not v:
-            return False
-        for field, value in changes.items():
-            if hasattr(v, field) and value is not None:
-                setattr(v, field, value)
-        return True
+        """Sustituye el vehículo por una copia con ``changes`` (se ignoran None e ``id``)."""
+        with self._write() as draft:
+            v = draft.get_vehicle(vehicle_id)
+            if not v:
+                return False
+            names = {f.name for f in fields(v)} - {"id"}
+            updates = {k: val for k, val in changes.items() if k in names and val is not None}
+            draft.vehicles.put(vehicle_id, _with_changes(v, updates))
+            return True
 
     def delete_vehicle(self, vehicle_id: str) -> bool:
-        if vehicle_id in self._vehicles:
-            del self._vehicles[vehicle_id]
+        with self._write() as draft:
+            if draft.get_vehicle(vehicle_id) is None:
+                return False
+            draft.vehicles.delete(vehicle_id)
             return True
-        return False
 
     # ---------- Servicios ----------
     def list_services(self) -> List[Any]:
-        return list(self._services.values())
+        return self.snapshot().list_services()
 
     def add_service(self, service: Any) -> None:
         sid = getattr(service, "id", None)
         if sid is None:
             raise ValueError("Servicio sin id")
-        self._services[sid] = service
+        with self._write() as draft:
+            draft.services.put(sid, service)
+
+    def search_services(self, text: str, limit: Optional[int] = 20) -> List[Any]:
+        """Ver ``CatalogSnapshot.search_services``."""
+        return self.snapshot().search_services(text, limit)
 
     def get_service(self, service_id: str) -> Optional[Any]:
-        return self._services.get(service_id)
+        snap = self._snapshot
+        if snap is None:
+            return self._repo.get_service(service_id)
+        return snap.get_service(service_id)
 
     def delete_service(self, service_id: str) -> bool:
-        if service_id in self._services:
-            del self._services[service_id]
+        with self._write() as draft:
+            if draft.get_service(service_id) is None:
+                return False
+            draft.services.delete(service_id)
             return True
-        return False
+
+    def low_stock_repuestos(self, threshold: int = 5) -> List[Any]:
+        """Ver ``CatalogSnapshot.low_stock_repuestos``."""
+        return self.snapshot().low_stock_repuestos(threshold)
+
+    def take_stock(self, quantities: Mapping[str, int]) -> None:
+        """
+        Descuenta stock de varios repuestos en una sola escritura, todo o
+        nada: si alguno no existe (ValueError) o no tiene stock suficiente
+        (InsufficientStockError), no se descuenta ninguno.
+        """
+        with self._write() as draft:
+            updated = []
+            for service_id, quantity in quantities.items():
+                s = draft.get_service(service_id)
+                if s is None or not hasattr(s, "stock"):
+                    raise ValueError(f"Repuesto inexistente: {service_id}")
+                if quantity > s.stock:
+                    raise InsufficientStockError(service_id, quantity, s.stock)
+                updated.append((service_id, _with_changes(s, {"stock": s.stock - quantity})))
+            for service_id, s in updated:
+                draft.services.put(service_id, s, kind="stock")
 
     def decrement_repuesto_stock(self, service_id: str, quantity: int) -> None:
-        s = self._services.get(service_id)
-        if s is not None and hasattr(s, "stock"):
-            s.stock = max(0, s.stock - quantity)
+        """Ver ``take_stock``: sin stock suficiente lanza InsufficientStockError."""
+        self.take_stock({service_id: quantity})
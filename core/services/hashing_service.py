@@ -0,0 +1,66 @@
+# core/services/hashing_service.py
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Iterable, List, Optional
+
+from core.crypto import PasswordHasher, get_default_hasher, hash_password, verify_password
+
+
+class PasswordHashingService:
+    """
+    Ejecuta el hashing de contraseñas en un ProcessPoolExecutor para
+    repartirlo entre núcleos. ``submit_*`` devuelve un Future sin esperar;
+    ``hash``/``verify`` esperan el resultado, así que quien los use desde
+    la UI o un event loop debe llamarlos fuera de ese hilo (la GUI lanza
+    login y registro en su hilo de trabajo; los servicios asíncronos usan
+    ``run_in_executor``). Como mucho ``max_pending`` trabajos en vuelo: si
+    se llena, ``submit_*`` espera en vez de acumular trabajo sin límite.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        max_pending: Optional[int] = None,
+        hasher: Optional[PasswordHasher] = None,
+    ):
+        workers = max_workers or os.cpu_count() or 1
+        self._pool = ProcessPoolExecutor(max_workers=workers)
+        self._slots = threading.BoundedSemaphore(max_pending or workers * 4)
+        self._hasher = hasher or get_default_hasher()
+
+    @property
+    def hasher(self) -> PasswordHasher:
+        return self._hasher
+
+    def _submit(self, fn, *args) -> Future:
+        self._slots.acquire()
+        try:
+            future = self._pool.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    # API asíncrona (Future) ---------------------
+    def submit_hash(self, password: str) -> Future:
+        return self._submit(hash_password, password, self._hasher)
+
+    def submit_verify(self, password: str, stored_hash: str) -> Future:
+        return self._submit(verify_password, password, stored_hash)
+
+    # API síncrona --------------------------------
+    def hash(self, password: str) -> str:
+        return self.submit_hash(password).result()
+
+    def verify(self, password: str, stored_hash: str) -> bool:
+        return self.submit_verify(password, stored_hash).result()
+
+    def hash_many(self, passwords: Iterable[str]) -> List[str]:
+        """Hashea en paralelo conservando el orden de entrada."""
+        futures = [self.submit_hash(p) for p in passwords]
+        return [f.result() for f in futures]
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=True)
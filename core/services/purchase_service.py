@@ -1,32 +1,71 @@
 # core/services/purchase_service.py
 import datetime
 import uuid
-from typing import List
+from typing import Dict, List, Optional
 
 from core.models import LineItem, Factura
 from core.report_manager import ReportManager
 from core.services.catalog_service import CatalogService
+from core.services.stock_reservation_service import Reservation, StockReservationService
+
+
+def stock_lines(cart_items: List[LineItem]) -> Dict[str, int]:
+    """Cantidad por id de los artículos con stock (repuestos) del carrito."""
+    lines: Dict[str, int] = {}
+    for li in cart_items:
+        sid = getattr(li.item, "id", None)
+        if sid is not None and hasattr(li.item, "stock"):
+            lines[sid] = lines.get(sid, 0) + li.quantity
+    return lines
 
 
 class PurchaseService:
     """
     Servicio que encapsula la creación de facturas:
+    - Reserva el stock de los repuestos (todo el carrito o nada)
     - Crea Factura
     - Calcula totales
-    - Registra en ReportManager
-    - Ajusta stock de repuestos
+    - Confirma la reserva (descuenta el stock) y registra en ReportManager
     """
 
-    def __init__(self, report_manager: ReportManager, catalog_service: CatalogService):
+    def __init__(
+        self,
+        report_manager: ReportManager,
+        catalog_service: CatalogService,
+        reservations: Optional[StockReservationService] = None,
+    ):
         self._reports = report_manager
         self._catalog = catalog_service
+        self._reservations = reservations or StockReservationService(catalog_service)
+
+    @property
+    def reservations(self) -> StockReservationService:
+        return self._reservations
+
+    def reserve_cart(self, cart_items: List[LineItem]) -> Reservation:
+        """
+        Aparta el stock del carrito (p. ej. al abrir la confirmación) para
+        pasarlo luego a ``create_invoice``. InsufficientStockError si algún
+        repuesto no alcanza.
+        """
+        return self._reservations.reserve(stock_lines(cart_items))
 
     def create_invoice(
         self,
         cart_items: List[LineItem],
         cliente_username: str,
         matricula: str = "",
+        reservation: Optional[Reservation] = None,
     ) -> Factura:
+        """
+        Factura el carrito. Sin ``reservation`` reserva el stock en el
+        momento; si no alcanza lanza InsufficientStockError y no se factura
+        nada. La factura solo se registra una vez descontado el stock.
+        """
+        lines = stock_lines(cart_items)
+        if reservation is not None and reservation.lines != lines:
+            raise ValueError("La reserva no corresponde al carrito")
+
         fid = str(uuid.uuid4())
         factura = Factura(
             id=fid,
@@ -37,14 +76,10 @@ class PurchaseService:
         )
         factura.calculate_totals()
 
-        # Registrar en reportes
+        # Descontar stock (todo o nada) y solo entonces registrar en reportes
+        if reservation is None:
+            reservation = self._reservations.reserve(lines)
+        self._reservations.commit(reservation.id)
         self._reports.log_invoice(factura)
 
-        # Ajustar stock de repuestos
-        for li in factura.items:
-            item = li.item
-            sid = getattr(item, "id", None)
-            if sid is not None and hasattr(item, "stock"):
-                self._catalog.decrement_repuesto_stock(sid, li.quantity)
-
         return factura
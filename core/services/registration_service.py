@@ -1,16 +1,71 @@
 
-from typing import Dict, Tuple
+import asyncio
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import ContextManager, Dict, Iterable, Iterator, List, Mapping, Optional, Set, Tuple
 
 from core.crypto import hash_password
+from core.ports.async_auth_repo import AsyncAuthRepository
 from core.ports.auth_repo import IAuthRepository, UserRecord
+from core.services.hashing_service import PasswordHashingService
 from core.validators import validate_username, validate_password
 
 
+def _chunks(items: Iterable, size: int) -> Iterator[List]:
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+@dataclass
+class RegistrationResult:
+    """Resultado de una fila de ``register_many`` (``line`` empieza en 1)."""
+    line: int
+    username: str
+    ok: bool
+    message: str
+
+
+# Roles que se pueden dar de alta desde el registro (individual o masivo)
+REGISTRABLE_ROLES = ("comprador", "concesionario")
+
+
+def _check_request(username: str, password: str, role: str) -> Optional[str]:
+    """Validaciones que no dependen del repositorio; devuelve el mensaje de error."""
+    if role == "administrador":
+        return "No puedes crear administradores desde el registro normal."
+
+    if role not in REGISTRABLE_ROLES:
+        return f"Rol no permitido en el registro: {role}."
+
+    if not validate_username(username):
+        return "Usuario inválido (3–20 letras/números/guion bajo)."
+
+    if not validate_password(password):
+        return "Contraseña inválida (mínimo 6, 1 mayúscula y 1 símbolo)."
+
+    return None
+
+
 class RegistrationService:
     """Servicio para registro normal de compradores / concesionarios."""
 
-    def __init__(self, repo: IAuthRepository):
+    def __init__(self, repo: IAuthRepository, hashing: Optional[PasswordHashingService] = None):
         self._repo = repo
+        self._hashing = hashing
+
+    def _hash(self, password: str) -> str:
+        return self._hashing.hash(password) if self._hashing else hash_password(password)
+
+    def batch(self) -> ContextManager[None]:
+        """Registra varios usuarios con una sola escritura del repositorio."""
+        return self._repo.batch()
 
     def register_user(
         self,
@@ -19,23 +74,143 @@ class RegistrationService:
         role: str = "comprador",
         extra: Dict | None = None,
     ) -> Tuple[bool, str]:
-        if role == "administrador":
-            return False, "No puedes crear administradores desde el registro normal."
+        error = _check_request(username, password, role)
+        if error:
+            return False, error
+
+        if self._repo.get(username):
+            return False, "El usuario ya existe."
+
+        user = UserRecord(
+            username=username,
+            pw_hash=self._hash(password),
+            role=role,
+            extra=extra or {},
+        )
+        try:
+            self._repo.add(user)
+        except ValueError:
+            # Alta concurrente (otro proceso) que ``get`` aún no veía
+            return False, "El usuario ya existe."
+        return True, f"Usuario {username} creado con rol {role}."
 
-        if not validate_username(username):
-            return False, "Usuario inválido (3–20 letras/números/guion bajo)."
+    def register_many(
+        self,
+        rows: Iterable[Optional[Mapping]],
+        chunk_size: int = 1000,
+    ) -> Iterator[RegistrationResult]:
+        """
+        Registro masivo en streaming (p. ej. desde ``read_users_csv``).
 
-        if not validate_password(password):
-            return False, "Contraseña inválida (mínimo 6, 1 mayúscula y 1 símbolo)."
+        Por bloques de ``chunk_size`` filas: valida, descarta duplicados
+        (con un ``get`` por nombre contra el repositorio y contra el bloque
+        anterior, aún sin escribir), hashea en paralelo y escribe el bloque
+        con un único ``batch()``. Mientras se escribe un bloque ya se está
+        hasheando el siguiente. Los resultados salen por fila, en el orden de entrada,
+        en cuanto su bloque se ha confirmado; si se deja de iterar, los
+        bloques aún no escritos se descartan.
+        """
+        pool = None if self._hashing else ThreadPoolExecutor(max_workers=os.cpu_count() or 1)
+        try:
+            pending: Optional[List] = None
+            # Nombres del bloque pendiente: el repositorio aún no los tiene
+            claimed: Set[str] = set()
+            for chunk in _chunks(enumerate(rows, start=1), chunk_size):
+                prepared = self._prepare_chunk(chunk, claimed, pool)
+                if pending is not None:
+                    yield from self._write_chunk(pending)
+                pending = prepared
+                claimed = {fields[0] for _, fields, _ in prepared if fields is not None}
+            if pending is not None:
+                yield from self._write_chunk(pending)
+        finally:
+            if pool is not None:
+                pool.shutdown(wait=True)
 
-        if self._repo.get(username):
+    def _prepare_chunk(self, chunk, claimed, pool) -> List:
+        """Valida las filas y lanza su hash: (línea, fila normalizada, resultado o Future)."""
+        prepared = []
+        for line, row in chunk:
+            if not isinstance(row, Mapping):
+                prepared.append((line, None, RegistrationResult(line, "", False, "Fila con formato inválido.")))
+                continue
+            username = str(row.get("username") or "").strip()
+            password = str(row.get("password") or "")
+            role = str(row.get("role") or "comprador")
+            extra = row.get("extra") or {}
+            error = _check_request(username, password, role)
+            if error is None and not isinstance(extra, Mapping):
+                error = "Campo extra con formato inválido."
+            if error is None and (username in claimed or self._repo.get(username)):
+                error = "El usuario ya existe."
+            if error:
+                prepared.append((line, None, RegistrationResult(line, username, False, error)))
+                continue
+
+            claimed.add(username)
+            future: Future = (
+                self._hashing.submit_hash(password) if self._hashing
+                else pool.submit(hash_password, password)
+            )
+            prepared.append((line, (username, role, dict(extra)), future))
+        return prepared
+
+    def _write_chunk(self, prepared: List) -> Iterator[RegistrationResult]:
+        # Los hashes del bloque terminan antes de abrir el lote, que retiene el repositorio
+        hashes = [None if fields is None else outcome.result() for _, fields, outcome in prepared]
+        results = []
+        with self._repo.batch():
+            for (line, fields, outcome), pw_hash in zip(prepared, hashes):
+                if fields is None:
+                    results.append(outcome)
+                    continue
+                username, role, extra = fields
+                user = UserRecord(username=username, pw_hash=pw_hash, role=role, extra=extra)
+                try:
+                    self._repo.add(user)
+                except ValueError:
+                    # Alta concurrente desde otro proceso
+                    results.append(RegistrationResult(line, username, False, "El usuario ya existe."))
+                    continue
+                results.append(
+                    RegistrationResult(line, username, True, f"Usuario {username} creado con rol {role}.")
+                )
+        # Solo se informa cuando el bloque ya está confirmado
+        yield from results
+
+
+class AsyncRegistrationService:
+    """Variante asíncrona de RegistrationService para servidores con asyncio."""
+
+    def __init__(self, repo: AsyncAuthRepository, hashing: Optional[PasswordHashingService] = None):
+        self._repo = repo
+        self._hashing = hashing
+
+    async def register_user(
+        self,
+        username: str,
+        password: str,
+        role: str = "comprador",
+        extra: Dict | None = None,
+    ) -> Tuple[bool, str]:
+        error = _check_request(username, password, role)
+        if error:
+            return False, error
+
+        if await self._repo.get(username):
             return False, "El usuario ya existe."
 
+        loop = asyncio.get_running_loop()
+        hash_fn = self._hashing.hash if self._hashing else hash_password
         user = UserRecord(
             username=username,
-            pw_hash=hash_password(password),
+            pw_hash=await loop.run_in_executor(None, hash_fn, password),
             role=role,
             extra=extra or {},
         )
-        self._repo.add(user)
+        try:
+            await self._repo.add(user)
+        except ValueError:
+            # Otro registro concurrente ganó la carrera
+            return False, "El usuario ya existe."
         return True, f"Usuario {username} creado con rol {role}."
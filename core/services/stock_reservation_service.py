@@ -0,0 +1,166 @@
+# core/services/stock_reservation_service.py
+import heapq
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Mapping, Optional, Tuple
+
+from core.services.catalog_service import CatalogService, InsufficientStockError
+
+
+@dataclass
+class Reservation:
+    """Stock apartado para una compra: ``lines`` es id de repuesto -> cantidad."""
+    id: str
+    lines: Dict[str, int]
+    expires_at: float
+
+    def expired(self, now: Optional[float] = None) -> bool:
+        return (time.monotonic() if now is None else now) >= self.expires_at
+
+
+class StockReservationService:
+    """
+    Reserva de stock de repuestos para varias líneas a la vez, todo o nada.
+
+    Disponible = stock del catálogo - lo apartado por reservas vigentes.
+    ``reserve`` comprueba y aparta todas las líneas con un lock por
+    repuesto, tomados en orden de id para que dos compras que comparten
+    repuestos no se interbloqueen; compras de repuestos distintos no se
+    esperan entre sí. ``commit`` descuenta del catálogo lo reservado
+    (una sola escritura) y ``release`` lo devuelve. Una reserva que no se
+    confirma en ``ttl_seconds`` caduca y su stock vuelve a estar libre.
+    """
+
+    def __init__(self, catalog_service: CatalogService, ttl_seconds: float = 900.0):
+        self._catalog = catalog_service
+        self._ttl = ttl_seconds
+        self._locks: Dict[str, threading.Lock] = {}
+        # Por repuesto: id de reserva -> (cantidad, caducidad). Solo con su lock
+        self._holds: Dict[str, Dict[str, tuple]] = {}
+        self._reservations: Dict[str, Reservation] = {}
+        # Caducidades para liberar las reservas abandonadas; su lock solo cubre el montículo
+        self._expiry: List[Tuple[float, str]] = []
+        self._expiry_lock = threading.Lock()
+
+    # ----------------- helpers internos -----------------
+    @contextmanager
+    def _locked(self, item_ids: List[str]) -> Iterator[None]:
+        # setdefault es atómico: dos hilos nunca obtienen locks distintos para un id
+        locks = [self._locks.setdefault(sid, threading.Lock()) for sid in sorted(item_ids)]
+        taken = []
+        try:
+            for lock in locks:
+                lock.acquire()
+                taken.append(lock)
+            yield
+        finally:
+            for lock in reversed(taken):
+                lock.release()
+
+    def _held(self, item_id: str, now: float) -> int:
+        """Cantidad apartada del repuesto (descarta las reservas caducadas). Con su lock."""
+        holds = self._holds.get(item_id)
+        if not holds:
+            return 0
+        for rid in [rid for rid, (_, expires_at) in holds.items() if expires_at <= now]:
+            del holds[rid]
+        return sum(quantity for quantity, _ in holds.values())
+
+    def _drop_holds(self, reservation: Reservation) -> None:
+        for sid in reservation.lines:
+            holds = self._holds.get(sid)
+            if holds is not None:
+                holds.pop(reservation.id, None)
+                if not holds:
+                    del self._holds[sid]
+
+    def _sweep(self, now: float) -> None:
+        expired = []
+        with self._expiry_lock:
+            while self._expiry and self._expiry[0][0] <= now:
+                expired.append(heapq.heappop(self._expiry)[1])
+        # Fuera del lock del montículo: ``release`` toma los locks de los repuestos
+        for rid in expired:
+            self.release(rid)
+
+    def _take(self, reservation_id: str) -> Reservation:
+        # pop es atómico: solo uno de commit/release/sweep se queda con la reserva
+        reservation = self._reservations.pop(reservation_id, None)
+        if reservation is None:
+            raise ValueError(f"Reserva inexistente, caducada o ya cerrada: {reservation_id}")
+        return reservation
+
+    # ----------------- API pública -----------------
+    def available(self, item_id: str) -> int:
+        """Stock libre del repuesto: el del catálogo menos lo reservado."""
+        with self._locked([item_id]):
+            item = self._catalog.get_service(item_id)
+            if item is None or not hasattr(item, "stock"):
+                return 0
+            return item.stock - self._held(item_id, time.monotonic())
+
+    def reserve(self, quantities: Mapping[str, int], ttl_seconds: Optional[float] = None) -> Reservation:
+        """
+        Aparta ``quantities`` (id de repuesto -> cantidad) o nada: lanza
+        InsufficientStockError con la primera línea que no alcanza, o
+        ValueError si un id no es un repuesto o una cantidad no es positiva.
+        """
+        lines = dict(quantities)
+        for sid, quantity in lines.items():
+            if isinstance(quantity, bool) or not isinstance(quantity, int) or quantity <= 0:
+                raise ValueError(f"Cantidad inválida para {sid}: {quantity!r}")
+        now = time.monotonic()
+        self._sweep(now)
+        reservation = Reservation(
+            id=str(uuid.uuid4()),
+            lines=lines,
+            expires_at=now + (self._ttl if ttl_seconds is None else ttl_seconds),
+        )
+        with self._locked(list(lines)):
+            for sid in sorted(lines):
+                item = self._catalog.get_service(sid)
+                if item is None or not hasattr(item, "stock"):
+                    raise ValueError(f"Repuesto inexistente: {sid}")
+                free = item.stock - self._held(sid, now)
+                if lines[sid] > free:
+                    raise InsufficientStockError(sid, lines[sid], max(free, 0))
+            for sid, quantity in lines.items():
+                self._holds.setdefault(sid, {})[reservation.id] = (quantity, reservation.expires_at)
+            self._reservations[reservation.id] = reservation
+        with self._expiry_lock:
+            heapq.heappush(self._expiry, (reservation.expires_at, reservation.id))
+        return reservation
+
+    def commit(self, reservation_id: str) -> Reservation:
+        """
+        Descuenta del catálogo lo reservado y cierra la reserva. Si caducó
+        (o el stock se redujo por otra vía) lanza la excepción y la reserva
+        queda liberada.
+        """
+        reservation = self._take(reservation_id)
+        with self._locked(list(reservation.lines)):
+            try:
+                if reservation.expired():
+                    raise ValueError(f"La reserva {reservation_id} caducó")
+                self._catalog.take_stock(reservation.lines)
+            finally:
+                self._drop_holds(reservation)
+        return reservation
+
+    def release(self, reservation_id: str) -> None:
+        """Devuelve el stock reservado (no hace nada si la reserva ya se cerró)."""
+        reservation = self._reservations.pop(reservation_id, None)
+        if reservation is None:
+            return
+        with self._locked(list(reservation.lines)):
+            self._drop_holds(reservation)
+
+    def sweep(self) -> None:
+        """Libera las reservas caducadas (``reserve`` ya lo hace antes de cada reserva)."""
+        self._sweep(time.monotonic())
+
+    def __len__(self) -> int:
+        return len(self._reservations)
@@ -1,32 +1,141 @@
 
-from typing import List, Optional
+import asyncio
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from typing import Callable, ContextManager, Dict, Iterable, List, Optional, Union
 
+from core.credential_cache import VerifiedCredentialCache
 from core.crypto import hash_password
+from core.ports.async_auth_repo import AsyncAuthRepository
 from core.ports.auth_repo import IAuthRepository, UserRecord
+from core.services.hashing_service import PasswordHashingService
+from core.session_store import SessionStore
 from core.validators import validate_username, validate_password
 
+ROLES = ("comprador", "concesionario", "administrador", "superadmin")
+
+# Órdenes admitidos por ``list_users`` ("-" = descendente).
+SORTS = ("username", "-username")
+
+# Selección de usuarios para las operaciones en bloque: nombres o predicado.
+UserSelector = Union[Iterable[str], Callable[[UserRecord], bool]]
+
+
+@dataclass
+class BulkResult:
+    """Resultado por usuario de ``update_users_bulk`` / ``delete_users_bulk``."""
+    username: str
+    ok: bool
+    message: str
+
+
+def _propagate_change(
+    cache: Optional[VerifiedCredentialCache],
+    sessions: Optional[SessionStore],
+    user: Optional[UserRecord],
+    username: str,
+    password_changed: bool,
+) -> None:
+    """
+    Tras modificar (``user``) o borrar (``user=None``) un usuario: invalida
+    sus credenciales en caché, cierra sus sesiones si se borró o cambió la
+    contraseña y, si solo cambió el rol, actualiza las sesiones abiertas.
+    """
+    if cache is not None:
+        cache.invalidate(username)
+    if sessions is not None:
+        if user is None or password_changed:
+            sessions.revoke_user(username)
+        else:
+            sessions.refresh_user(user)
+
+
+def _check_sort(sort: str) -> bool:
+    """Valida el orden pedido y devuelve si es descendente."""
+    if sort not in SORTS:
+        raise ValueError(f"Orden no soportado: {sort}")
+    return sort.startswith("-")
+
+
+def _valid_update(new_role: Optional[str], new_password: Optional[str]) -> bool:
+    if new_role and new_role not in ROLES:
+        return False
+    if new_password and not validate_password(new_password):
+        return False
+    return True
+
 
 class UserAdminService:
     """Operaciones de administración de usuarios (superadmin/admin)."""
 
-    def __init__(self, repo: IAuthRepository):
+    def __init__(
+        self,
+        repo: IAuthRepository,
+        hashing: Optional[PasswordHashingService] = None,
+        credential_cache: Optional[VerifiedCredentialCache] = None,
+        sessions: Optional[SessionStore] = None,
+    ):
         self._repo = repo
+        self._hashing = hashing
+        self._cache = credential_cache
+        self._sessions = sessions
+
+    def _after_change(self, user: Optional[UserRecord], username: str, password_changed: bool) -> None:
+        _propagate_change(self._cache, self._sessions, user, username, password_changed)
+
+    def _hash(self, password: str) -> str:
+        return self._hashing.hash(password) if self._hashing else hash_password(password)
 
     # utilidades generales ---------------------
+    def batch(self) -> ContextManager[None]:
+        """
+        Agrupa varias operaciones en una sola escritura del repositorio:
+            with admin.batch():
+                for name in nombres:
+                    admin.update_user(name, new_role="concesionario")
+        """
+        return self._repo.batch()
+
     def ensure_superadmin(self, username: str = "superadmin", password: str = "Admin@123") -> None:
         """Crea el superadmin inicial si no existe."""
         if self._repo.get(username):
             return
         user = UserRecord(
             username=username,
-            pw_hash=hash_password(password),
+            pw_hash=self._hash(password),
             role="superadmin",
             extra={},
         )
         self._repo.add(user)
 
-    def list_users(self) -> List[UserRecord]:
-        return self._repo.list_all()
+    def list_users(
+        self,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        role: Optional[str] = None,
+        prefix: Optional[str] = None,
+        sort: str = "username",
+    ) -> List[UserRecord]:
+        """
+        Página de usuarios ordenada por nombre, opcionalmente filtrada por
+        rol y prefijo. Solo se materializan los usuarios de la página; sin
+        ``limit`` se devuelven todos los que cumplan el filtro.
+        """
+        descending = _check_sort(sort)
+        return self._repo.list_page(offset, limit, role, prefix or None, descending)
+
+    def count_users(self, role: Optional[str] = None, prefix: Optional[str] = None) -> int:
+        return self._repo.count(role, prefix or None)
+
+    def _select(self, users: UserSelector) -> Dict[str, Optional[UserRecord]]:
+        """
+        Usuarios afectados por una operación en bloque, en orden y sin
+        repetidos. Con una lista de nombres, los inexistentes quedan en None.
+        """
+        if callable(users):
+            return {u.username: u for u in self._repo.list_all() if users(u)}
+        return {name: self._repo.get(name) for name in dict.fromkeys(users)}
 
     # operaciones admin/superadmin -------------
     def create_user_by_admin(self, username: str, password: str, role: str = "administrador") -> bool:
@@ -39,7 +148,7 @@ class UserAdminService:
 
         user = UserRecord(
             username=username,
-            pw_hash=hash_password(password),
+            pw_hash=self._hash(password),
             role=role,
             extra={},
         )
@@ -56,17 +165,21 @@ class UserAdminService:
         if not user:
             return False
 
-        if new_role:
-            if new_role not in ("comprador", "concesionario", "administrador", "superadmin"):
-                return False
-            user.role = new_role
+        # Se valida todo antes de tocar el registro: nunca se muta el objeto
+        # que devuelve el repositorio (puede ser su caché en memoria).
+        if not _valid_update(new_role, new_password):
+            return False
 
+        changes = {}
+        if new_role:
+            changes["role"] = new_role
         if new_password:
-            if not validate_password(new_password):
-                return False
-            user.pw_hash = hash_password(new_password)
+            changes["pw_hash"] = self._hash(new_password)
 
-        self._repo.update(user)
+        updated = replace(user, **changes)
+        self._repo.update(updated)
+        if changes:
+            self._after_change(updated, username, bool(new_password))
         return True
 
     def delete_user(self, username: str) -> bool:
@@ -75,4 +188,187 @@ class UserAdminService:
         if not self._repo.get(username):
             return False
         self._repo.delete(username)
+        self._after_change(None, username, False)
+        return True
+
+    def update_users_bulk(
+        self,
+        users: UserSelector,
+        new_role: Optional[str] = None,
+        new_password: Optional[str] = None,
+    ) -> List[BulkResult]:
+        """
+        Cambia rol y/o contraseña de varios usuarios, elegidos por nombre o
+        con un predicado sobre ``UserRecord``:
+            admin.update_users_bulk(lambda u: u.role == "comprador", new_role="concesionario")
+
+        Todos los cambios se escriben con un único ``batch()``. Cada usuario
+        recibe su propio hash (sal distinta) y los hashes se calculan en
+        paralelo antes de abrir el lote. El superadmin no puede perder su rol.
+        Sin rol ni contraseña nuevos no se toca a nadie.
+        """
+        selected = self._select(users)
+        if not new_role and not new_password:
+            return [BulkResult(name, False, "No hay cambios que aplicar.") for name in selected]
+        if not _valid_update(new_role, new_password):
+            return [BulkResult(name, False, "Rol o contraseña inválidos.") for name in selected]
+
+        results: Dict[str, BulkResult] = {}
+        targets: List[UserRecord] = []
+        for name, user in selected.items():
+            if user is None:
+                results[name] = BulkResult(name, False, "El usuario no existe.")
+            elif name == "superadmin" and new_role and new_role != "superadmin":
+                results[name] = BulkResult(name, False, "No puedes despromover al superadmin.")
+            else:
+                targets.append(user)
+
+        # El KDF termina antes de abrir el lote: no retiene el bloqueo del repositorio
+        hashes = None
+        if new_password:
+            hashes = [f.result() for f in self._hash_many(new_password, len(targets))]
+        updated: List[UserRecord] = []
+        with self._repo.batch():
+            for i, user in enumerate(targets):
+                changes = {}
+                if new_role:
+                    changes["role"] = new_role
+                if hashes is not None:
+                    changes["pw_hash"] = hashes[i]
+                record = replace(user, **changes)
+                try:
+                    self._repo.update(record)
+                except KeyError:
+                    # Borrado por otro proceso desde que se leyó
+                    results[user.username] = BulkResult(user.username, False, "El usuario no existe.")
+                    continue
+                updated.append(record)
+                results[user.username] = BulkResult(user.username, True, "Usuario actualizado.")
+
+        # Cachés y sesiones solo se tocan cuando el lote ya está confirmado
+        for record in updated:
+            self._after_change(record, record.username, bool(new_password))
+        return [results[name] for name in selected]
+
+    def delete_users_bulk(self, users: UserSelector) -> List[BulkResult]:
+        """
+        Borra varios usuarios (por nombre o predicado) con un único
+        ``batch()``. El superadmin nunca se borra.
+        """
+        selected = self._select(users)
+        results: Dict[str, BulkResult] = {}
+        deleted: List[str] = []
+        with self._repo.batch():
+            for name, user in selected.items():
+                if name == "superadmin":
+                    results[name] = BulkResult(name, False, "No puedes eliminar al SuperAdmin.")
+                    continue
+                if user is None:
+                    results[name] = BulkResult(name, False, "El usuario no existe.")
+                    continue
+                self._repo.delete(name)
+                deleted.append(name)
+                results[name] = BulkResult(name, True, "Usuario eliminado.")
+
+        for name in deleted:
+            self._after_change(None, name, False)
+        return [results[name] for name in selected]
+
+    def _hash_many(self, password: str, count: int) -> List[Future]:
+        """Lanza ``count`` hashes de la misma contraseña en paralelo."""
+        if self._hashing:
+            return [self._hashing.submit_hash(password) for _ in range(count)]
+        with ThreadPoolExecutor(max_workers=os.cpu_count() or 1) as pool:
+            futures = [pool.submit(hash_password, password) for _ in range(count)]
+        return futures
+
+
+class AsyncUserAdminService:
+    """Variante asíncrona de UserAdminService para servidores con asyncio."""
+
+    def __init__(
+        self,
+        repo: AsyncAuthRepository,
+        hashing: Optional[PasswordHashingService] = None,
+        credential_cache: Optional[VerifiedCredentialCache] = None,
+        sessions: Optional[SessionStore] = None,
+    ):
+        self._repo = repo
+        self._hashing = hashing
+        self._cache = credential_cache
+        self._sessions = sessions
+
+    def _after_change(self, user: Optional[UserRecord], username: str, password_changed: bool) -> None:
+        _propagate_change(self._cache, self._sessions, user, username, password_changed)
+
+    async def _hash(self, password: str) -> str:
+        loop = asyncio.get_running_loop()
+        hash_fn = self._hashing.hash if self._hashing else hash_password
+        return await loop.run_in_executor(None, hash_fn, password)
+
+    async def list_users(
+        self,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        role: Optional[str] = None,
+        prefix: Optional[str] = None,
+        sort: str = "username",
+    ) -> List[UserRecord]:
+        descending = _check_sort(sort)
+        return await self._repo.list_page(offset, limit, role, prefix or None, descending)
+
+    async def count_users(self, role: Optional[str] = None, prefix: Optional[str] = None) -> int:
+        return await self._repo.count(role, prefix or None)
+
+    async def create_user_by_admin(self, username: str, password: str, role: str = "administrador") -> bool:
+        if role not in ("administrador", "superadmin"):
+            return False
+        if not validate_username(username) or not validate_password(password):
+            return False
+        if await self._repo.get(username):
+            return False
+
+        user = UserRecord(
+            username=username,
+            pw_hash=await self._hash(password),
+            role=role,
+            extra={},
+        )
+        try:
+            await self._repo.add(user)
+        except ValueError:
+            return False
+        return True
+
+    async def update_user(
+        self,
+        username: str,
+        new_role: Optional[str] = None,
+        new_password: Optional[str] = None,
+    ) -> bool:
+        if not _valid_update(new_role, new_password):
+            return False
+        user = await self._repo.get(username)
+        if not user:
+            return False
+
+        changes = {}
+        if new_role:
+            changes["role"] = new_role
+        if new_password:
+            changes["pw_hash"] = await self._hash(new_password)
+
+        updated = replace(user, **changes)
+        await self._repo.update(updated)
+        if changes:
+            self._after_change(updated, username, bool(new_password))
+        return True
+
+    async def delete_user(self, username: str) -> bool:
+        if username == "superadmin":
+            return False
+        if not await self._repo.get(username):
+            return False
+        await self._repo.delete(username)
+        self._after_change(None, username, False)
         return True
@@ -0,0 +1,129 @@
+# core/session_store.py
+import heapq
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple
+
+from core.ports.auth_repo import UserRecord
+
+
+@dataclass
+class Session:
+    token: str
+    user: UserRecord
+    created_at: float
+    expires_at: float
+
+
+class SessionStore:
+    """
+    Sesiones con token opaco para atender a muchos clientes autenticados
+    desde un mismo proceso.
+
+    - Búsqueda O(1) por token; cada uso desliza la expiración ``ttl_seconds``.
+    - Como mucho ``max_sessions``: al superarlo se expulsa la menos usada.
+    - Las caducadas se eliminan con un barrido sobre un montículo de
+      expiraciones (entradas obsoletas por el deslizamiento se reencolan).
+      Las entradas de sesiones expulsadas o revocadas se descartan al
+      rehacer el montículo cuando superan a las vivas.
+    """
+
+    def __init__(self, ttl_seconds: float = 1800.0, max_sessions: int = 10_000):
+        self._ttl = ttl_seconds
+        self._max_sessions = max_sessions
+        self._sessions: "OrderedDict[str, Session]" = OrderedDict()
+        self._by_user: Dict[str, Set[str]] = {}
+        self._expiry: List[Tuple[float, str]] = []
+        self._lock = threading.Lock()
+
+    # ----------------- helpers internos -----------------
+    def _remove(self, token: str) -> None:
+        session = self._sessions.pop(token, None)
+        if session is None:
+            return
+        tokens = self._by_user.get(session.user.username)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._by_user[session.user.username]
+
+    def _compact(self) -> None:
+        # Sin esto el montículo crecería con cada alta aunque ``max_sessions`` limite las sesiones
+        if len(self._expiry) > 2 * len(self._sessions) + 64:
+            self._expiry = [(s.expires_at, token) for token, s in self._sessions.items()]
+            heapq.heapify(self._expiry)
+
+    def _sweep(self, now: float) -> None:
+        heap = self._expiry
+        while heap and heap[0][0] <= now:
+            _, token = heapq.heappop(heap)
+            session = self._sessions.get(token)
+            if session is None:
+                continue
+            if session.expires_at <= now:
+                self._remove(token)
+            else:
+                # Se usó después de encolarse: vuelve con su expiración real
+                heapq.heappush(heap, (session.expires_at, token))
+
+    # ----------------- API pública -----------------
+    def create(self, user: UserRecord) -> str:
+        now = time.monotonic()
+        token = secrets.token_urlsafe(32)
+        session = Session(token=token, user=user, created_at=now, expires_at=now + self._ttl)
+        with self._lock:
+            self._sweep(now)
+            self._sessions[token] = session
+            self._by_user.setdefault(user.username, set()).add(token)
+            heapq.heappush(self._expiry, (session.expires_at, token))
+            while len(self._sessions) > self._max_sessions:
+                self._remove(next(iter(self._sessions)))
+            self._compact()
+        return token
+
+    def get(self, token: str) -> Optional[Session]:
+        """Devuelve la sesión vigente (y extiende su expiración) o None."""
+        now = time.monotonic()
+        with self._lock:
+            self._sweep(now)
+            session = self._sessions.get(token)
+            if session is None:
+                return None
+            if session.expires_at <= now:
+                self._remove(token)
+                return None
+            session.expires_at = now + self._ttl
+            self._sessions.move_to_end(token)
+            return session
+
+    def user_for(self, token: str) -> Optional[UserRecord]:
+        session = self.get(token)
+        return session.user if session else None
+
+    def revoke(self, token: str) -> None:
+        with self._lock:
+            self._remove(token)
+            self._compact()
+
+    def revoke_user(self, username: str) -> None:
+        """Cierra todas las sesiones de un usuario."""
+        with self._lock:
+            for token in list(self._by_user.get(username, ())):
+                self._remove(token)
+            self._compact()
+
+    def refresh_user(self, user: UserRecord) -> None:
+        """Actualiza el registro (p. ej. el rol) en las sesiones abiertas del usuario."""
+        with self._lock:
+            for token in self._by_user.get(user.username, ()):
+                self._sessions[token].user = user
+
+    def sweep(self) -> None:
+        with self._lock:
+            self._sweep(time.monotonic())
+
+    def __len__(self) -> int:
+        return len(self._sessions)
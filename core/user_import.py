@@ -0,0 +1,50 @@
+# core/user_import.py
+import csv
+import json
+from typing import Dict, Iterator, Optional
+
+# Columnas propias del usuario; el resto de columnas del CSV van a ``extra``.
+_USER_FIELDS = ("username", "password", "role")
+
+
+def read_users_csv(path: str, default_role: str = "concesionario") -> Iterator[Dict]:
+    """
+    Lee usuarios de un CSV con cabecera (``username,password[,role,...]``)
+    sin cargar el archivo entero. Las columnas extra no vacías (p. ej.
+    ``dealer_name``) se devuelven en ``extra``.
+    """
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        for raw in csv.DictReader(f):
+            row = {
+                "username": (raw.get("username") or "").strip(),
+                "password": (raw.get("password") or "").strip(),
+                "role": (raw.get("role") or "").strip() or default_role,
+            }
+            row["extra"] = {
+                k: v.strip()
+                for k, v in raw.items()
+                if k and k not in _USER_FIELDS and isinstance(v, str) and v.strip()
+            }
+            yield row
+
+
+def read_users_jsonl(path: str, default_role: str = "concesionario") -> Iterator[Optional[Dict]]:
+    """
+    Lee usuarios de un JSONL (un objeto por línea). Las líneas que no son
+    un objeto JSON válido se devuelven como None para que el importador
+    las reporte como error sin cortar la importación.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError:
+                yield None
+                continue
+            if not isinstance(row, dict):
+                yield None
+                continue
+            row.setdefault("role", default_role)
+            yield row
@@ -1,25 +1,56 @@
 # core/validators.py
 import re
+from typing import Iterable, List
+
+# Patrones compilados una sola vez: no dependen de la caché interna de
+# ``re``, que se vacía cuando el resto del programa usa muchas expresiones.
+_USERNAME_RE = re.compile(r"^[a-zA-Z0-9_]{3,20}$")
+_PASSWORD_RE = re.compile(r'^(?=.*[A-Z])(?=.*[!@#$%^&*(),.?":{}|<>]).{6,}$')
+# Clase ASCII explícita en lugar de ``upper()``: no se crea una cadena por
+# llamada. Con IGNORECASE se colarían plegados Unicode (U+212A, el signo Kelvin).
+_MATRICULA_RE = re.compile(r"^[A-Za-z0-9\-]{4,10}$")
+
+_PATTERNS = {
+    "username": _USERNAME_RE,
+    "password": _PASSWORD_RE,
+    "matricula": _MATRICULA_RE,
+}
 
 
 def validate_username(username: str) -> bool:
     """
     Acepta entre 3 y 20 caracteres: letras, números y guiones bajos.
     """
-    return bool(re.match(r"^[a-zA-Z0-9_]{3,20}$", username))
+    return _USERNAME_RE.match(username) is not None
 
 
 def validate_password(password: str) -> bool:
     """
     Mínimo 6 caracteres, al menos una mayúscula y un símbolo especial.
     """
-    return bool(
-        re.match(r'^(?=.*[A-Z])(?=.*[!@#$%^&*(),.?":{}|<>]).{6,}$', password)
-    )
+    return _PASSWORD_RE.match(password) is not None
 
 
 def validate_matricula(matricula: str) -> bool:
     """
-    Matrícula aceptada: 4-10 caracteres alfanuméricos y guion.
+    Matrícula aceptada: 4-10 caracteres alfanuméricos ASCII (mayúsculas o
+    minúsculas) y guion.
+    """
+    return _MATRICULA_RE.match(matricula) is not None
+
+
+def validate_many(values: Iterable, kind: str) -> List[bool]:
+    """
+    Valida en bloque (importaciones masivas) con la misma regla que
+    ``validate_<kind>``; ``kind`` es "username", "password" o "matricula".
+    Devuelve un booleano por valor; lo que no sea ``str`` es inválido.
     """
-    return bool(re.match(r"^[A-Z0-9\-]{4,10}$", matricula.upper()))
+    try:
+        match = _PATTERNS[kind].match
+    except KeyError:
+        raise ValueError(f"Validador desconocido: {kind}") from None
+    values = values if isinstance(values, list) else list(values)
+    try:
+        return [m is not None for m in map(match, values)]
+    except TypeError:
+        return [isinstance(v, str) and match(v) is not None for v in values]
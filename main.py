@@ -1,9 +1,16 @@
 # main.py
+import os
 import tkinter as tk
 
 from ui.gui import AppGUI
 from core.adapters.json_auth_repo import JsonAuthRepository
+from core.adapters.sqlite_auth_repo import SqliteAuthRepository
+from core.adapters.sqlite_catalog_repo import SNAPSHOT_FILE, SqliteCatalogRepository
+from core.credential_cache import VerifiedCredentialCache
+from core.rate_limit import LoginRateLimiter
+from core.session_store import SessionStore
 from core.services.authentication_service import AuthenticationService
+from core.services.hashing_service import PasswordHashingService
 from core.services.registration_service import RegistrationService
 from core.services.user_admin_service import UserAdminService
 from core.services.catalog_service import CatalogService
@@ -12,18 +19,58 @@ from core.data_seed import seed_catalog
 from core.report_manager import ReportManager
 
 
+def build_auth_repository(backend: str | None = None):
+    """
+    Elige el repositorio concreto de usuarios.
+    Se controla con la variable de entorno AUTH_BACKEND ("json" o "sqlite").
+    """
+    backend = (backend or os.environ.get("AUTH_BACKEND", "json")).lower()
+    if backend == "sqlite":
+        return SqliteAuthRepository(bloom_filter=True)
+    if backend == "json":
+        return JsonAuthRepository()
+    raise ValueError(f"Backend de usuarios desconocido: {backend}")
+
+
+def build_catalog_repository(backend: str | None = None):
+    """
+    Elige el almacén del catálogo.
+    Se controla con la variable de entorno CATALOG_BACKEND ("sqlite" o
+    "memory"; en memoria el catálogo se pierde al cerrar).
+    """
+    backend = (backend or os.environ.get("CATALOG_BACKEND", "sqlite")).lower()
+    if backend == "sqlite":
+        return SqliteCatalogRepository()
+    if backend == "memory":
+        return None
+    raise ValueError(f"Backend de catálogo desconocido: {backend}")
+
+
 def main():
     # Repositorio concreto
-    repo = JsonAuthRepository()
+    repo = build_auth_repository()
 
-    # Servicios de usuarios
-    auth_service = AuthenticationService(repo)
-    registration_service = RegistrationService(repo)
-    user_admin_service = UserAdminService(repo)
+    # Hashing de contraseñas en un pool de procesos
+    hashing = PasswordHashingService()
 
-    # Catalogo + reportes + compras
-    catalog_service = CatalogService()
-    seed_catalog(catalog_service)
+    # Servicios de usuarios (comparten caché de credenciales y sesiones)
+    credential_cache = VerifiedCredentialCache()
+    sessions = SessionStore()
+    auth_service = AuthenticationService(
+        repo, hashing, credential_cache, sessions, rate_limiter=LoginRateLimiter()
+    )
+    registration_service = RegistrationService(repo, hashing)
+    user_admin_service = UserAdminService(repo, hashing, credential_cache, sessions)
+
+    # Catalogo persistente: la semilla solo la primera vez; la instantánea
+    # se carga en segundo plano mientras arranca la UI
+    catalog_repo = build_catalog_repository()
+    catalog_service = CatalogService(
+        catalog_repo, snapshot_file=SNAPSHOT_FILE if catalog_repo is not None else None
+    )
+    if catalog_service.is_empty():
+        seed_catalog(catalog_service)
+    catalog_service.preload(background=True)
 
     report_manager = ReportManager()
     purchase_service = PurchaseService(report_manager, catalog_service)
@@ -40,6 +87,10 @@ def main():
         report_manager,
     )
     root.mainloop()
+    hashing.close()
+    catalog_service.save_snapshot()
+    if catalog_repo is not None:
+        catalog_repo.close()
 
 
 if __name__ == "__main__":
@@ -1,6 +1,7 @@
 
 import pytest
 
+from core import crypto
 from core.adapters.json_auth_repo import JsonAuthRepository
 from core.services.authentication_service import AuthenticationService
 from core.services.registration_service import RegistrationService
@@ -9,6 +10,14 @@ from core.services.catalog_service import CatalogService
 from core.services.purchase_service import PurchaseService
 from core.report_manager import ReportManager
 
+# Hashing barato en los tests: el coste real de scrypt solo los haría lentos
+@pytest.fixture(autouse=True)
+def fast_hasher():
+    previous = crypto.get_default_hasher()
+    crypto.set_default_hasher(crypto.ScryptHasher(n=2 ** 8))
+    yield
+    crypto.set_default_hasher(previous)
+
 # Repositorio en memoria (no guardará archivo real)
 @pytest.fixture
 def clean_repo(tmp_path):
@@ -0,0 +1,45 @@
+import asyncio
+
+from core.adapters.async_auth_repo import AsyncSqliteAuthRepository, ExecutorAuthRepository
+from core.adapters.sqlite_auth_repo import SqliteAuthRepository
+from core.services.authentication_service import AsyncAuthenticationService
+from core.services.registration_service import AsyncRegistrationService
+from core.services.user_admin_service import AsyncUserAdminService
+
+
+def test_async_services_over_json_repo(clean_repo):
+    repo = ExecutorAuthRepository(clean_repo)
+    registration = AsyncRegistrationService(repo)
+    auth = AsyncAuthenticationService(repo)
+    admin = AsyncUserAdminService(repo)
+
+    async def scenario():
+        results = await asyncio.gather(
+            *(registration.register_user(f"user{i}", "Clave@123") for i in range(20))
+        )
+        assert all(ok for ok, _ in results)
+        assert (await registration.register_user("user0", "Clave@123"))[0] is False
+
+        logins = await asyncio.gather(*(auth.login(f"user{i}", "Clave@123") for i in range(20)))
+        assert all(r.ok for r in logins)
+        assert (await auth.login("user1", "Mala@123")).code == "BAD_PASSWORD"
+
+        assert await admin.update_user("user1", new_role="concesionario")
+        assert await admin.delete_user("user2")
+        return await admin.list_users()
+
+    users = asyncio.run(scenario())
+    assert len(users) == 19
+    assert clean_repo.get("user1").role == "concesionario"
+
+
+def test_async_sqlite_repo(tmp_path):
+    repo = AsyncSqliteAuthRepository(SqliteAuthRepository(db_file=str(tmp_path / "users.db")))
+
+    async def scenario():
+        await AsyncRegistrationService(repo).register_user("ana99", "Clave@123")
+        return await AsyncAuthenticationService(repo).login("ana99", "Clave@123")
+
+    result = asyncio.run(scenario())
+    assert result.ok and result.token is not None
+    repo.close()
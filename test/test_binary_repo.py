@@ -0,0 +1,78 @@
+import hashlib
+import json
+import struct
+
+import pytest
+
+from core.adapters.binary_auth_repo import (
+    BinaryAuthRepository,
+    binary_to_json,
+    decode_users,
+    encode_users,
+    json_to_binary,
+)
+from core.adapters.json_auth_repo import JsonAuthRepository
+from core.crypto import Pbkdf2Hasher, hash_password
+from core.ports.auth_repo import UserRecord
+
+
+def test_codec_roundtrip_keeps_every_field():
+    users = [
+        UserRecord("ana99", hash_password("Clave@123"), "comprador", {}),
+        UserRecord("dealer", "no-es-hex", "concesionario", {"dealer_name": "Ñandú"}),
+        UserRecord("raro", hash_password("x"), "rol_nuevo", {}),
+    ]
+    assert decode_users(encode_users(users)) == users
+    assert decode_users(encode_users([])) == []
+
+
+def test_codec_stores_encoded_hashes_in_binary_column():
+    legacy = hashlib.sha256(b"Clave@123").hexdigest()
+    users = [UserRecord(f"user{i}", hash_password("Clave@123"), "comprador", {}) for i in range(50)]
+    users += [
+        UserRecord("viejo", legacy, "comprador", {}),
+        UserRecord("pbkdf2", Pbkdf2Hasher(iterations=1000).hash("x"), "comprador", {}),
+        UserRecord("mal_b64", "scrypt$n=2,r=1,p=1$@@$##", "comprador", {}),
+    ]
+    data = encode_users(users)
+
+    assert decode_users(data) == users
+    # El esquema se guarda una vez; solo el hash ilegible va como texto
+    assert data.count(b"scrypt$n=") == 2
+    assert len(data) < sum(len(u.pw_hash) for u in users)
+
+
+def test_codec_reads_version_1_snapshots():
+    legacy = hashlib.sha256(b"Clave@123").hexdigest()
+    names = "ana99\0raro".encode("utf-8")
+    roles = b'["comprador"]'
+    sparse = json.dumps({"hashes": {"1": "no-es-hex"}, "extra": {"1": {"a": 1}}}).encode("utf-8")
+    data = b"".join((
+        struct.pack("<4sBIIII", b"USRB", 1, 2, len(names), len(roles), len(sparse)),
+        names, bytes.fromhex(legacy), bytes(32), bytes([0, 0]), roles, sparse,
+    ))
+    assert decode_users(data) == [
+        UserRecord("ana99", legacy, "comprador", {}),
+        UserRecord("raro", "no-es-hex", "comprador", {"a": 1}),
+    ]
+
+
+def test_codec_rejects_foreign_data():
+    with pytest.raises(ValueError):
+        decode_users(b"[]")
+
+
+def test_json_binary_converters(tmp_path):
+    json_path = str(tmp_path / "users.json")
+    bin_path = str(tmp_path / "users.bin")
+    repo = JsonAuthRepository(data_file=json_path)
+    repo.add(UserRecord("ana99", hash_password("Clave@123"), "administrador", {}))
+
+    assert json_to_binary(json_path, bin_path) == 1
+    binary = BinaryAuthRepository(data_file=bin_path)
+    assert binary.get("ana99").role == "administrador"
+
+    binary.add(UserRecord("luis", hash_password("x"), "comprador", {}))
+    assert binary_to_json(bin_path, json_path) == 2
+    with open(json_path, encoding="utf-8") as f:
+        assert {u["username"] for u in json.load(f)} == {"ana99", "luis"}
@@ -0,0 +1,270 @@
+import random
+import threading
+
+import pytest
+
+from core.cow import ChunkedSortedList
+from core.search_index import TextSearchIndex
+from core.data_seed import seed_catalog
+from core.models import Repuesto
+from core.factories import ServiceFactory, VehicleFactory
+from core.services.catalog_service import CatalogService
+
+
+def _ids(vehicles):
+    return [v.id for v in vehicles]
+
+
+def test_query_vehicles_uses_filters_and_sort(catalog_service):
+    seed_catalog(catalog_service)
+    catalog_service.add_vehicle(
+        VehicleFactory.create_vehicle("V004", "toyota", "Yaris 2022", 18000.0, 12, "gratis", "Híbrido")
+    )
+
+    assert _ids(catalog_service.query_vehicles(marca="TOYOTA")) == ["V001", "V004"]
+    assert _ids(catalog_service.query_vehicles(modelo_prefix="mod")) == ["V003"]
+    assert _ids(catalog_service.query_vehicles(price_min=12000, price_max=45000, sort="precio")) == [
+        "V002", "V004", "V001",
+    ]
+    assert _ids(catalog_service.query_vehicles(sort="-precio", offset=1, limit=2)) == ["V001", "V004"]
+    assert _ids(catalog_service.query_vehicles(marca="toyota", garantia_min=24)) == ["V001"]
+    assert _ids(catalog_service.query_vehicles(marca="Seat")) == []
+    assert catalog_service.vehicle_marcas() == ["Renault", "Tesla", "Toyota"]
+
+    with pytest.raises(ValueError):
+        catalog_service.query_vehicles(sort="color")
+
+
+def test_query_vehicles_follows_edits_and_deletes(catalog_service):
+    seed_catalog(catalog_service)
+    catalog_service.edit_vehicle("V002", {"marca": "Dacia", "precio": 9000.0})
+    catalog_service.delete_vehicle("V003")
+    catalog_service.add_vehicle(
+        VehicleFactory.create_vehicle("V001", "Toyota", "Corolla 2025", 47000.0, 24, "gratis")
+    )
+
+    assert _ids(catalog_service.query_vehicles(marca="renault")) == []
+    assert _ids(catalog_service.query_vehicles(marca="dacia", price_max=9000)) == ["V002"]
+    assert _ids(catalog_service.query_vehicles(price_min=40000, sort="precio")) == ["V001"]
+    assert catalog_service.query_vehicles(modelo_prefix="corolla")[0].modelo == "Corolla 2025"
+    assert catalog_service.vehicle_marcas() == ["Dacia", "Toyota"]
+
+
+def test_chunked_sorted_list_matches_sorted_list():
+    rnd = random.Random(7)
+    ref = sorted(rnd.randint(0, 50) for _ in range(30))
+    items = ChunkedSortedList(ref, load=3)
+    for _ in range(500):
+        x = rnd.randint(0, 60)
+        if rnd.random() < 0.05:
+            many = [rnd.randint(0, 60) for _ in range(rnd.randint(0, 40))]
+            items.update(many)
+            ref = sorted(ref + many)
+        elif rnd.random() < 0.5:
+            items.add(x)
+            ref.append(x)
+            ref.sort()
+        elif x in ref:
+            items.discard(x)
+            ref.remove(x)
+        # Sin ordenar: también rangos invertidos (lo > hi), que deben salir vacíos
+        lo, hi = rnd.randint(-5, 65), rnd.randint(-5, 65)
+        expected = [y for y in ref if lo <= y < hi]
+        assert list(items.irange(lo, hi)) == expected
+        assert list(items.irange(lo, hi, reverse=True)) == expected[::-1]
+        assert items.count(lo, hi) == len(expected)
+    assert list(items.irange()) == ref
+    assert list(ChunkedSortedList(range(20), load=3).irange(12, 4)) == []
+
+
+def test_inverted_price_range_matches_nothing(catalog_service):
+    with catalog_service.batch():
+        # Varios trozos en el índice de precios: los límites caen en trozos distintos
+        for i in range(5000):
+            catalog_service.add_vehicle(
+                VehicleFactory.create_vehicle(f"V{i:04}", "Fiat", "Punto", float(i), 12, "gratis")
+            )
+
+    assert catalog_service.query_vehicles(price_min=3000, price_max=100) == []
+    assert catalog_service.query_vehicles(price_min=3000, price_max=100, sort="-precio") == []
+    assert catalog_service.count_vehicles(price_min=3000, price_max=100) == 0
+    assert catalog_service.cheapest_vehicles(5, price_min=3000, price_max=100) == []
+
+
+def test_search_ranks_exact_prefix_substring_and_typos():
+    index = TextSearchIndex()
+    index.add("a", "Renault Kwid Económico urbano")
+    index.add("b", "Renault Kwidmax")
+    index.add("c", "Tesla Model 3 Eléctrico")
+    index.add("d", "Toyota Corolla Sedán compacto")
+
+    assert index.search("kwid") == [("a", 3.0), ("b", 2.0)]
+    assert [d for d, _ in index.search("wid")] == ["a", "b"]
+    assert [d for d, _ in index.search("ELECTRICO")] == ["c"]
+    assert [d for d, _ in index.search("renault economico")] == ["a"]
+    assert [d for d, _ in index.search("corrola")] == ["d"]
+    assert index.search("renault tesla") == []
+    assert index.search("") == []
+
+    index.add("a", "Dacia Spring")
+    index.remove("c")
+    assert [d for d, _ in index.search("kwid")] == ["b"]
+    assert index.search("electrico") == []
+
+
+def test_catalog_search_follows_mutations(catalog_service):
+    seed_catalog(catalog_service)
+    assert _ids(catalog_service.search_vehicles("sedan")) == ["V001"]
+    assert [s.nombre for s in catalog_service.search_services("bujia")] == ["Bujía"]
+    assert len(catalog_service.search_services("repuesto")) == 2
+
+    catalog_service.edit_vehicle("V002", {"descripcion": "Sedán urbano"})
+    catalog_service.delete_vehicle("V001")
+    assert _ids(catalog_service.search_vehicles("sedan")) == ["V002"]
+
+
+def test_snapshot_is_unaffected_by_later_writes(catalog_service):
+    seed_catalog(catalog_service)
+    before = catalog_service.snapshot()
+    kwid = before.get_vehicle("V002")
+
+    catalog_service.edit_vehicle("V002", {"precio": 9000.0})
+    catalog_service.delete_vehicle("V003")
+    repuesto = next(s for s in before.list_services() if getattr(s, "stock", None))
+    catalog_service.decrement_repuesto_stock(repuesto.id, 1)
+
+    assert catalog_service.version == before.version + 3
+    assert kwid.precio == 12000.0
+    assert _ids(before.list_vehicles()) == ["V001", "V002", "V003"]
+    assert _ids(before.query_vehicles(price_max=12000)) == ["V002"]
+    assert _ids(before.search_vehicles("tesla")) == ["V003"]
+    assert before.get_service(repuesto.id).stock == repuesto.stock
+    assert catalog_service.get_service(repuesto.id).stock == repuesto.stock - 1
+    assert _ids(catalog_service.list_vehicles()) == ["V001", "V002"]
+
+
+def test_failed_write_leaves_catalog_untouched(catalog_service):
+    seed_catalog(catalog_service)
+    version = catalog_service.version
+
+    with pytest.raises(TypeError):
+        catalog_service.add_vehicle(
+            VehicleFactory.create_vehicle("V009", "Seat", "Ibiza", "barato", 12, "gratis")
+        )
+
+    assert catalog_service.version == version
+    assert catalog_service.get_vehicle("V009") is None
+    assert catalog_service.vehicle_marcas() == ["Renault", "Tesla", "Toyota"]
+
+
+def test_readers_never_see_half_applied_writes(catalog_service):
+    for i in range(200):
+        catalog_service.add_vehicle(
+            VehicleFactory.create_vehicle(f"V{i:03}", "Fiat", "Punto", 1000.0, 12, "gratis")
+        )
+    done = threading.Event()
+    torn = []
+
+    def reader():
+        while not done.is_set():
+            snap = catalog_service.snapshot()
+            prices = {v.precio for v in snap.list_vehicles()}
+            if len(prices) != 1 or len(snap.query_vehicles(price_min=0)) != 200:
+                torn.append(prices)
+
+    def writer():
+        for price in range(1001, 1011):
+            with catalog_service.batch():
+                for i in range(200):
+                    catalog_service.edit_vehicle(f"V{i:03}", {"precio": float(price)})
+
+    threads = [threading.Thread(target=reader) for _ in range(2)]
+    for t in threads:
+        t.start()
+    writer()
+    done.set()
+    for t in threads:
+        t.join()
+
+    assert torn == []
+    assert {v.precio for v in catalog_service.list_vehicles()} == {1010.0}
+
+
+def test_batch_publishes_one_version_or_nothing(catalog_service):
+    seed_catalog(catalog_service)
+    version = catalog_service.version
+
+    with catalog_service.batch():
+        catalog_service.edit_vehicle("V001", {"precio": 1.0})
+        catalog_service.delete_vehicle("V002")
+        assert catalog_service.get_vehicle("V002") is not None
+    assert catalog_service.version == version + 1
+    assert _ids(catalog_service.list_vehicles()) == ["V001", "V003"]
+
+    with pytest.raises(RuntimeError):
+        with catalog_service.batch():
+            catalog_service.delete_vehicle("V003")
+            raise RuntimeError("abortar")
+    assert catalog_service.version == version + 1
+    assert catalog_service.get_vehicle("V003") is not None
+
+
+def _kinds(changes):
+    return [(c.kind, c.entity, c.item_id) for c in changes]
+
+
+def test_change_feed_reports_writes_in_order(catalog_service):
+    seed_catalog(catalog_service)
+    filtro = ServiceFactory.create_service("repuesto", nombre="Filtro", precio=10.0, stock=5)
+    catalog_service.add_service(filtro)
+    start = catalog_service.version
+    seen = []
+    unsubscribe = catalog_service.subscribe(seen.append)
+
+    catalog_service.edit_vehicle("V001", {"precio": 1.0})
+    with catalog_service.batch():
+        catalog_service.delete_vehicle("V002")
+        catalog_service.add_vehicle(VehicleFactory.create_vehicle("V004", "Fiat", "Punto", 9000.0, 12, "gratis"))
+    catalog_service.take_stock({filtro.id: 2})
+    with pytest.raises(TypeError):
+        catalog_service.add_vehicle(VehicleFactory.create_vehicle("V009", "Seat", "Ibiza", "barato", 12, "gratis"))
+    unsubscribe()
+    catalog_service.delete_service(filtro.id)
+
+    changes = catalog_service.changes_since(start)
+    assert _kinds(changes) == [
+        ("edit", "vehicle", "V001"),
+        ("delete", "vehicle", "V002"),
+        ("add", "vehicle", "V004"),
+        ("stock", "service", filtro.id),
+        ("delete", "service", filtro.id),
+    ]
+    assert [c.version for c in changes] == [start + 1, start + 2, start + 2, start + 3, start + 4]
+    assert changes[0].item.precio == 1.0 and changes[3].item.stock == 3
+    # Un lote llega a los suscriptores en una sola llamada; la escritura fallida no publica
+    assert [_kinds(batch) for batch in seen] == [_kinds(changes[:1]), _kinds(changes[1:3]), _kinds(changes[3:4])]
+    assert catalog_service.changes_since(catalog_service.version) == []
+
+
+def test_change_feed_asks_for_reload_when_overrun():
+    catalog = CatalogService(feed_capacity=3)
+    start = catalog.version
+    assert catalog.changes_since(start - 1) is None
+    for i in range(5):
+        catalog.add_vehicle(VehicleFactory.create_vehicle(f"V{i}", "Fiat", "Punto", 1000.0, 12, "gratis"))
+
+    assert catalog.changes_since(start) is None
+    assert catalog.changes_since(start + 1) is None
+    assert [c.item_id for c in catalog.changes_since(start + 2)] == ["V2", "V3", "V4"]
+
+
+def test_stock_change_keeps_service_order_and_search(catalog_service):
+    for i in (3, 1, 2):
+        catalog_service.add_service(Repuesto(f"R{i}", f"Filtro {i}", 10.0, 5))
+    before = catalog_service.snapshot()
+
+    catalog_service.take_stock({"R2": 2})
+
+    assert _ids(catalog_service.list_services()) == ["R1", "R2", "R3"]
+    assert [s.stock for s in catalog_service.search_services("filtro 2", limit=1)] == [3]
+    assert before.get_service("R2").stock == 5
@@ -0,0 +1,119 @@
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from core.adapters.sqlite_catalog_repo import SqliteCatalogRepository
+from core.catalog_columns import HAS_NUMPY, ColumnTable
+from core.data_seed import seed_catalog
+from core.factories import ServiceFactory, VehicleFactory
+from core.services.catalog_service import CatalogService
+
+needs_numpy = pytest.mark.skipif(not HAS_NUMPY, reason="numpy no instalado")
+
+
+@pytest.fixture(params=[False, pytest.param(True, marks=needs_numpy)], ids=["objetos", "columnar"])
+def catalog(request):
+    return CatalogService(columnar=request.param)
+
+
+def _ids(items):
+    return [x.id for x in items]
+
+
+def test_analytics_follow_mutations(catalog):
+    seed_catalog(catalog)
+    catalog.add_vehicle(VehicleFactory.create_vehicle("V004", "TOYOTA", "Yaris", 18000.0, 12, "gratis"))
+    catalog.add_vehicle(VehicleFactory.create_vehicle("V005", "Fiat", "Punto", 18000.0, 12, "pago"))
+    before = catalog.snapshot()
+    catalog.edit_vehicle("V002", {"precio": 9000.0})
+    catalog.delete_vehicle("V003")
+
+    assert catalog.count_vehicles() == 4
+    assert catalog.count_vehicles(marca="toyota", price_max=20000) == 1
+    assert catalog.count_vehicles(marca="Seat") == 0
+    assert _ids(catalog.cheapest_vehicles(3)) == ["V002", "V004", "V005"]
+    assert _ids(catalog.cheapest_vehicles(2, garantia_min=24)) == ["V001"]
+    # La versión anterior conserva sus datos
+    assert _ids(before.cheapest_vehicles(1)) == ["V002"]
+    assert before.cheapest_vehicles(1)[0].precio == 12000.0
+
+    stats = {s.group: (s.count, s.mean, s.min, s.max) for s in catalog.vehicle_price_stats()}
+    assert stats == {
+        "Fiat": (1, 18000.0, 18000.0, 18000.0),
+        "Renault": (1, 9000.0, 9000.0, 9000.0),
+        "Toyota": (2, pytest.approx(31500.0), 18000.0, 45000.0),
+    }
+    assert [s.group for s in catalog.vehicle_price_stats(by="mantenimiento_tipo")] == [
+        "gratis", "pago", "según uso",
+    ]
+    with pytest.raises(ValueError):
+        catalog.vehicle_price_stats(by="modelo")
+
+
+def test_low_stock_follows_stock_changes(catalog):
+    seed_catalog(catalog)
+    filtro = ServiceFactory.create_service("repuesto", nombre="Filtro", precio=10.0, stock=3)
+    catalog.add_service(filtro)
+    bujia = next(s for s in catalog.list_services() if getattr(s, "nombre", "") == "Bujía")
+
+    assert _ids(catalog.low_stock_repuestos(5)) == [filtro.id]
+    catalog.decrement_repuesto_stock(bujia.id, bujia.stock - 1)
+    assert _ids(catalog.low_stock_repuestos(5)) == [bujia.id, filtro.id]
+    catalog.delete_service(filtro.id)
+    assert _ids(catalog.low_stock_repuestos(0)) == []
+    assert _ids(catalog.low_stock_repuestos(1)) == [bujia.id]
+
+
+@needs_numpy
+def test_column_table_matches_objects_after_random_writes():
+    rnd = random.Random(3)
+    marcas = ["Kia", "kía", "Seat", "Fiat"]
+    table = ColumnTable({"precio": "f8"}, ("marca",), block_rows=4)
+    ref = {}
+    for step in range(400):
+        key = f"V{rnd.randrange(40):02d}"
+        if rnd.random() < 0.4:
+            table.delete(key)
+            ref.pop(key, None)
+        elif rnd.random() < 0.1:
+            many = [
+                (f"V{rnd.randrange(40):02d}", SimpleNamespace(precio=float(rnd.randrange(100)), marca="Seat"))
+                for _ in range(rnd.randint(0, 12))
+            ]
+            table.put_many(many)
+            ref.update((k, (item.precio, item.marca)) for k, item in many)
+        else:
+            item = SimpleNamespace(precio=float(rnd.randrange(100)), marca=rnd.choice(marcas))
+            table.put(key, item)
+            ref[key] = (item.precio, item.marca)
+        if step % 50 == 0:
+            # Las copias no se ven afectadas por escrituras posteriores
+            frozen, frozen_ref = table.copy(), dict(ref)
+
+    assert sorted(table.keys()) == sorted(ref) and len(table) == len(ref)
+    assert table.smallest("precio", 5) == [k for _, k in sorted((r[0], k) for k, r in ref.items())][:5]
+    kia = table.mask(ranges={"precio": (10, 60)}, equals={"marca": "KIA"})
+    assert sorted(table.keys(kia)) == sorted(
+        k for k, (p, m) in ref.items() if 10 <= p <= 60 and m.lower() in ("kia", "kía")
+    )
+    stats = {s.group: s.count for s in table.group_stats("precio", "marca")}
+    assert sum(stats.values()) == len(ref) and set(stats) <= {"Kia", "kía", "Seat", "Fiat"}
+    assert sorted(frozen.keys()) == sorted(frozen_ref)
+
+
+@needs_numpy
+def test_columnar_view_survives_restart(tmp_path):
+    repo = SqliteCatalogRepository(db_file=str(tmp_path / "catalog.db"))
+    snapshot_file = str(tmp_path / "catalog.snapshot")
+    catalog = CatalogService(repo, snapshot_file=snapshot_file)
+    seed_catalog(catalog)
+    assert catalog.save_snapshot()
+
+    # Instantánea guardada sin vista columnar: se crea al cargarla
+    warm = CatalogService(repo, snapshot_file=snapshot_file, columnar=True)
+    assert warm.snapshot().vehicle_columns is not None
+    warm.edit_vehicle("V003", {"precio": 1.0})
+    cold = CatalogService(repo, columnar=True)
+    assert _ids(cold.cheapest_vehicles(1)) == ["V003"]
+    repo.close()
@@ -0,0 +1,96 @@
+import pytest
+
+from core.adapters.sqlite_catalog_repo import SqliteCatalogRepository
+from core.catalog_import import read_vehicles, vehicle_from_row
+from core.data_seed import seed_catalog
+from core.services.catalog_service import CatalogService
+
+
+def test_import_vehicles_reports_rejects(catalog_service, tmp_path):
+    seed_catalog(catalog_service)
+    version = catalog_service.version
+    csv_file = tmp_path / "inventario.csv"
+    csv_file.write_text(
+        "id,marca,modelo,precio,garantia_meses,mantenimiento_tipo,descripcion\n"
+        "V010,Kia,Rio 2024,15000,12,gratis,Compacto\n"
+        "V011,Kia,Picanto,abc,12,gratis,\n"
+        "V002,Renault,Kwid 2024,12500.5,24,según uso,Urbano renovado\n"
+        ",Seat,Ibiza,14000,12,gratis,\n"
+        "V012,Seat,Ibiza,14000,1.5,gratis,\n"
+        "V013,Seat,León,21000,36,gratis,Familiar\n",
+        encoding="utf-8",
+    )
+
+    report = catalog_service.import_vehicles(
+        read_vehicles(str(csv_file)), chunk_size=2, max_errors=2, atomic=True
+    )
+
+    assert (report.read, report.imported, report.rejected) == (6, 3, 3)
+    assert [e.row for e in report.errors] == [2, 4]
+    assert report.rows_per_second > 0
+    # Con atomic=True toda la importación es una sola versión
+    assert catalog_service.version == version + 1
+    assert catalog_service.get_vehicle("V002").precio == 12500.5
+    assert [v.id for v in catalog_service.query_vehicles(marca="kia")] == ["V010"]
+    assert [v.id for v in catalog_service.search_vehicles("urbano")] == ["V002"]
+    assert [v.id for v in catalog_service.search_vehicles("leon")] == ["V013"]
+    assert catalog_service.get_vehicle("V012") is None
+
+
+def test_import_vehicles_writes_per_chunk(catalog_service):
+    rows = [
+        {"id": f"V{i % 5}", "marca": "Fiat", "modelo": "Punto", "precio": 100 + i, "garantia_meses": 12}
+        for i in range(9)
+    ]
+    rows.insert(4, {"id": "V9", "marca": "Fiat"})
+    start = catalog_service.version
+    published = []
+    catalog_service.subscribe(lambda changes: published.append(len(changes)))
+
+    report = catalog_service.import_vehicles(rows, chunk_size=4)
+
+    # Un bloque por versión; los ids repetidos dentro de un bloque cuentan una vez
+    assert catalog_service.version == start + 3
+    assert published == [4, 3, 2]
+    assert (report.read, report.imported, report.rejected) == (10, 9, 1)
+    assert [e.row for e in report.errors] == [5]
+    assert catalog_service.get_vehicle("V3").precio == 108
+
+
+def test_import_vehicles_jsonl_persists(tmp_path):
+    repo = SqliteCatalogRepository(db_file=str(tmp_path / "catalog.db"))
+    jsonl_file = tmp_path / "inventario.jsonl"
+    jsonl_file.write_text(
+        '{"id": "V1", "marca": "Fiat", "modelo": "Punto", "precio": 9000, "garantia": 12}\n'
+        "no es json\n"
+        '{"id": "V2", "marca": "Fiat", "modelo": "Uno", "precio": 7000.0, "garantia_meses": 12.0,'
+        ' "mantenimiento": "gratis"}\n',
+        encoding="utf-8",
+    )
+    try:
+        report = CatalogService(repo).import_vehicles(read_vehicles(str(jsonl_file)))
+        assert (report.imported, report.rejected) == (2, 1)
+        assert report.errors[0].message == "Fila con formato inválido."
+
+        restarted = CatalogService(repo)
+        assert [v.id for v in restarted.query_vehicles(marca="fiat", sort="precio")] == ["V2", "V1"]
+        assert restarted.get_vehicle("V2").mantenimiento_tipo == "gratis"
+    finally:
+        repo.close()
+
+
+def test_vehicle_from_row_validates_types():
+    row = {"id": "V1", "marca": "Kia", "modelo": "Rio", "precio": "100", "garantia_meses": "12"}
+    assert vehicle_from_row(row).precio == 100.0
+    for bad in (
+        {**row, "precio": "-1"},
+        {**row, "precio": "nan"},
+        {**row, "precio": True},
+        {**row, "garantia_meses": "doce"},
+        {**row, "marca": "  "},
+        {**row, "modelo": 5},
+    ):
+        with pytest.raises(ValueError):
+            vehicle_from_row(bad)
+    with pytest.raises(ValueError):
+        read_vehicles("inventario.xlsx")
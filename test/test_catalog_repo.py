@@ -0,0 +1,165 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from core.adapters.sqlite_catalog_repo import SqliteCatalogRepository
+from core.catalog_columns import HAS_NUMPY
+from core.data_seed import seed_catalog
+from core.factories import ServiceFactory, VehicleFactory
+from core.services.catalog_service import CatalogService
+
+
+@pytest.fixture
+def catalog_repo(tmp_path):
+    repo = SqliteCatalogRepository(db_file=str(tmp_path / "catalog.db"))
+    yield repo
+    repo.close()
+
+
+def _vehicle(vid, marca="Fiat", precio=1000.0):
+    return VehicleFactory.create_vehicle(vid, marca, "Punto", precio, 12, "gratis")
+
+
+def test_sqlite_catalog_crud_and_version(catalog_repo):
+    assert catalog_repo.version() == 0
+    catalog_repo.upsert_vehicle(_vehicle("V2"))
+    catalog_repo.upsert_vehicle(_vehicle("V1", precio=900.0))
+    seguro = ServiceFactory.create_service("seguro", tipo="Básico")
+    bujia = ServiceFactory.create_service("repuesto", nombre="Bujía", stock=5)
+    with catalog_repo.batch():
+        catalog_repo.upsert_service(seguro)
+        catalog_repo.upsert_service(bujia)
+    assert catalog_repo.version() == 3
+
+    assert catalog_repo.get_vehicle("V1").precio == 900.0
+    assert [v.id for v in catalog_repo.iter_vehicles()] == ["V1", "V2"]
+    bujia.stock = 4
+    catalog_repo.upsert_service(bujia)
+    # Actualizar no cambia el orden de alta
+    assert list(catalog_repo.iter_services()) == [seguro, bujia]
+
+    catalog_repo.delete_vehicle("V2")
+    catalog_repo.delete_service(seguro.id)
+    assert catalog_repo.get_vehicle("V2") is None
+    assert (catalog_repo.count_vehicles(), catalog_repo.count_services()) == (1, 1)
+
+    with pytest.raises(RuntimeError):
+        with catalog_repo.batch():
+            catalog_repo.delete_vehicle("V1")
+            raise RuntimeError("falla")
+    assert catalog_repo.get_vehicle("V1") is not None
+
+
+def test_catalog_persists_between_starts(catalog_repo):
+    catalog = CatalogService(catalog_repo)
+    assert catalog.is_empty()
+    seed_catalog(catalog)
+    catalog.edit_vehicle("V002", {"precio": 9000.0})
+    catalog.delete_vehicle("V003")
+    repuesto = next(s for s in catalog.list_services() if getattr(s, "nombre", "") == "Bujía")
+    catalog.decrement_repuesto_stock(repuesto.id, 2)
+
+    restarted = CatalogService(catalog_repo)
+    assert not restarted.is_empty()
+    # Consulta puntual sin cargar el catálogo
+    assert restarted.get_vehicle("V002").precio == 9000.0
+    assert restarted._snapshot is None
+
+    assert [v.id for v in restarted.list_vehicles()] == ["V001", "V002"]
+    assert restarted.get_service(repuesto.id).stock == 48
+    assert [s.id for s in restarted.list_services()] == [s.id for s in catalog.list_services()]
+    assert restarted.version == catalog.version == catalog_repo.version()
+
+
+def test_failed_write_is_not_persisted(catalog_repo):
+    catalog = CatalogService(catalog_repo)
+    seed_catalog(catalog)
+
+    with pytest.raises(RuntimeError):
+        with catalog.batch():
+            catalog.delete_vehicle("V001")
+            raise RuntimeError("falla")
+
+    assert catalog.get_vehicle("V001") is not None
+    assert catalog_repo.get_vehicle("V001") is not None
+
+
+def test_warm_start_from_snapshot_file(catalog_repo, tmp_path, monkeypatch):
+    snapshot_file = str(tmp_path / "catalog.snapshot")
+    catalog = CatalogService(catalog_repo, snapshot_file=snapshot_file)
+    seed_catalog(catalog)
+    assert catalog.save_snapshot()
+
+    warm = CatalogService(catalog_repo, snapshot_file=snapshot_file)
+    with monkeypatch.context() as m:
+        m.setattr(catalog_repo, "iter_vehicles", lambda: pytest.fail("no debía leer filas"))
+        assert [v.id for v in warm.search_vehicles("corolla")] == ["V001"]
+    # Tras cargar de archivo las escrituras siguen siendo copia en escritura
+    before = warm.snapshot()
+    warm.add_vehicle(_vehicle("V004", marca="Toyota"))
+    assert [v.id for v in warm.query_vehicles(marca="toyota")] == ["V001", "V004"]
+    assert [v.id for v in before.query_vehicles(marca="toyota")] == ["V001"]
+
+    # Una instantánea desfasada se ignora y se reconstruye del repositorio
+    cold = CatalogService(catalog_repo, snapshot_file=snapshot_file)
+    assert cold.get_vehicle("V004") is not None
+    assert [v.id for v in cold.query_vehicles(marca="toyota")] == ["V001", "V004"]
+
+
+def test_snapshot_file_loads_under_another_hash_seed(tmp_path):
+    # hash() de str cambia entre procesos: guardar y cargar con semillas distintas
+    script = """
+import sys
+from core.adapters.sqlite_catalog_repo import SqliteCatalogRepository
+from core.data_seed import seed_catalog
+from core.services.catalog_service import CatalogService
+repo = SqliteCatalogRepository(db_file=sys.argv[2])
+catalog = CatalogService(repo, snapshot_file=sys.argv[3], columnar=sys.argv[4] == "1")
+if sys.argv[1] == "save":
+    seed_catalog(catalog)
+    assert catalog.save_snapshot()
+else:
+    print([v.id for v in catalog.list_vehicles()], catalog.get_vehicle("V002").id,
+          [v.id for v in catalog.search_vehicles("corolla")], catalog.count_vehicles(marca="toyota"))
+repo.close()
+"""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    columnar = "1" if HAS_NUMPY else "0"
+
+    def run(mode, seed):
+        return subprocess.run(
+            [sys.executable, "-c", script, mode, str(tmp_path / "catalog.db"),
+             str(tmp_path / "catalog.snapshot"), columnar],
+            cwd=root, env={**os.environ, "PYTHONHASHSEED": seed},
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+
+    run("save", "1")
+    assert run("load", "2") == "['V001', 'V002', 'V003'] V002 ['V001'] 1"
+
+
+def test_write_reloads_after_another_instance_wrote(tmp_path):
+    db_file = str(tmp_path / "catalog.db")
+    snapshot_file = str(tmp_path / "catalog.snap")
+    repo_a, repo_b = SqliteCatalogRepository(db_file), SqliteCatalogRepository(db_file)
+    a = CatalogService(repo_a, snapshot_file=snapshot_file)
+    b = CatalogService(repo_b)
+    a.add_vehicle(_vehicle("r1"))
+    assert b.get_vehicle("r1") is not None
+
+    b.add_vehicle(_vehicle("r2"))
+    since = a.version
+    a.add_vehicle(_vehicle("r3"))
+    assert [v.id for v in a.list_vehicles()] == ["r1", "r2", "r3"]
+    assert a.version == repo_a.version()
+    # Lo que escribió ``b`` no pasó por el registro de ``a``
+    assert a.changes_since(since) is None
+    assert a.save_snapshot()
+
+    repo_c = SqliteCatalogRepository(db_file)
+    restarted = CatalogService(repo_c, snapshot_file=snapshot_file)
+    assert [v.id for v in restarted.list_vehicles()] == ["r1", "r2", "r3"]
+    for repo in (repo_a, repo_b, repo_c):
+        repo.close()
@@ -0,0 +1,40 @@
+import time
+
+from core.credential_cache import VerifiedCredentialCache
+from core.services.authentication_service import AuthenticationService
+from core.services.user_admin_service import UserAdminService
+
+
+def test_cache_bounded_and_ttl():
+    cache = VerifiedCredentialCache(max_entries=2, ttl_seconds=0.05)
+    cache.add("a", "pw", "h")
+    cache.add("b", "pw", "h")
+    cache.add("c", "pw", "h")
+    assert len(cache) == 2
+    assert not cache.contains("a", "pw", "h")
+    assert cache.contains("c", "pw", "h")
+    assert not cache.contains("c", "otra", "h")
+
+    time.sleep(0.06)
+    assert not cache.contains("c", "pw", "h")
+
+
+def test_login_skips_kdf_and_admin_invalidates(clean_repo, registration_service, monkeypatch):
+    cache = VerifiedCredentialCache()
+    auth = AuthenticationService(clean_repo, credential_cache=cache)
+    admin = UserAdminService(clean_repo, credential_cache=cache)
+    registration_service.register_user("ana99", "Clave@123")
+
+    assert auth.login("ana99", "Clave@123").ok
+    calls = []
+    monkeypatch.setattr(
+        "core.services.authentication_service.verify_password",
+        lambda *a: calls.append(a) or True,
+    )
+    assert auth.login("ana99", "Clave@123").ok
+    assert calls == []
+
+    assert admin.update_user("ana99", new_role="concesionario")
+    assert len(cache) == 0
+    assert auth.login("ana99", "Clave@123").user.role == "concesionario"
+    assert len(calls) == 1
@@ -0,0 +1,51 @@
+import hashlib
+
+from core import crypto
+from core.crypto import Pbkdf2Hasher, hash_password, needs_rehash, verify_password
+from core.ports.auth_repo import UserRecord
+from core.services.hashing_service import PasswordHashingService
+
+
+def test_hash_is_salted_and_encoded():
+    h1 = hash_password("Clave@123")
+    h2 = hash_password("Clave@123")
+    assert h1 != h2
+    assert h1.startswith("scrypt$n=256,r=8,p=1$")
+    assert verify_password("Clave@123", h1)
+    assert not verify_password("Clave@124", h1)
+    assert not verify_password("Clave@123", "scrypt$roto")
+
+
+def test_pbkdf2_and_cost_changes():
+    pbkdf2 = Pbkdf2Hasher(iterations=1000)
+    encoded = hash_password("Clave@123", pbkdf2)
+    assert verify_password("Clave@123", encoded)
+    assert needs_rehash(encoded)
+    assert not needs_rehash(encoded, pbkdf2)
+    assert needs_rehash(hash_password("x", crypto.ScryptHasher(n=2 ** 4)))
+
+
+def test_legacy_sha256_is_rehashed_on_login(clean_repo, auth_service):
+    legacy = hashlib.sha256(b"Clave@123").hexdigest()
+    clean_repo.add(UserRecord("viejo", legacy, "comprador", {}))
+
+    result = auth_service.login("viejo", "Clave@123")
+    assert result.ok
+    stored = clean_repo.get("viejo").pw_hash
+    assert stored.startswith("scrypt$")
+    assert auth_service.login("viejo", "Clave@123").ok
+
+
+def test_process_pool_hashing_service(clean_repo):
+    from core.services.registration_service import RegistrationService
+
+    hashing = PasswordHashingService(max_workers=2, max_pending=2)
+    try:
+        hashes = hashing.hash_many(["Clave@1", "Clave@2", "Clave@3"])
+        assert hashing.verify("Clave@2", hashes[1])
+        assert not hashing.verify("Clave@2", hashes[0])
+
+        ok, _ = RegistrationService(clean_repo, hashing).register_user("ana99", "Clave@123")
+        assert ok and verify_password("Clave@123", clean_repo.get("ana99").pw_hash)
+    finally:
+        hashing.close()
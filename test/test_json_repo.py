@@ -0,0 +1,153 @@
+import os
+import threading
+
+from core.adapters.json_auth_repo import JsonAuthRepository
+from core.ports.auth_repo import UserRecord
+
+
+def test_journal_appends_and_replays(tmp_path):
+    path = str(tmp_path / "users.json")
+    repo = JsonAuthRepository(data_file=path, journal=True)
+    repo.add(UserRecord("ana99", "h1", "comprador", {}))
+    repo.add(UserRecord("luis", "h2", "concesionario", {"dealer_name": "X"}))
+    repo.update(UserRecord("ana99", "h3", "administrador", {}))
+    repo.delete("luis")
+
+    # El snapshot no se reescribe; los cambios viven en el journal
+    assert os.path.exists(path + ".journal")
+
+    reopened = JsonAuthRepository(data_file=path, journal=True)
+    assert reopened.get("ana99").pw_hash == "h3"
+    assert reopened.get("ana99").role == "administrador"
+    assert reopened.get("luis") is None
+
+
+def test_journal_compacts_at_threshold(tmp_path):
+    path = str(tmp_path / "users.json")
+    repo = JsonAuthRepository(data_file=path, journal=True, compact_threshold=3)
+    for name in ("uno", "dos", "tres"):
+        repo.add(UserRecord(name, "h", "comprador", {}))
+
+    assert not os.path.exists(path + ".journal")
+    reopened = JsonAuthRepository(data_file=path)
+    assert len(reopened.list_all()) == 3
+
+
+def test_batch_writes_once_and_rolls_back(tmp_path, monkeypatch):
+    repo = JsonAuthRepository(data_file=str(tmp_path / "users.json"))
+    saves = []
+    original_save = repo._save
+    monkeypatch.setattr(repo, "_save", lambda: saves.append(1) or original_save())
+
+    with repo.batch():
+        for i in range(10):
+            repo.add(UserRecord(f"user{i}", "h", "comprador", {}))
+    assert len(saves) == 1
+
+    try:
+        with repo.batch():
+            repo.delete("user0")
+            repo.add(UserRecord("nuevo", "h", "comprador", {}))
+            raise RuntimeError("falla a mitad del lote")
+    except RuntimeError:
+        pass
+    assert repo.get("user0") is not None
+    assert repo.get("nuevo") is None
+    assert len(saves) == 1
+
+
+def test_group_commit_every_n_mutations(tmp_path):
+    path = str(tmp_path / "users.json")
+    repo = JsonAuthRepository(data_file=path, journal=True, commit_every=3)
+    repo.add(UserRecord("uno", "h", "comprador", {}))
+    repo.add(UserRecord("dos", "h", "comprador", {}))
+    assert not os.path.exists(path + ".journal")
+
+    repo.add(UserRecord("tres", "h", "comprador", {}))
+    with open(path + ".journal", encoding="utf-8") as f:
+        assert len(f.readlines()) == 3
+
+
+def test_admin_batch_role_changes(user_admin_service, registration_service, clean_repo):
+    with registration_service.batch():
+        for name in ("ana99", "luis99"):
+            registration_service.register_user(name, "Clave@123")
+
+    with user_admin_service.batch():
+        for name in ("ana99", "luis99"):
+            assert user_admin_service.update_user(name, new_role="concesionario")
+
+    reopened = JsonAuthRepository(data_file=clean_repo._data_file)
+    assert {u.role for u in reopened.list_all()} == {"concesionario"}
+
+
+def test_torn_journal_line_is_discarded(tmp_path):
+    path = str(tmp_path / "users.json")
+    repo = JsonAuthRepository(data_file=path, journal=True)
+    repo.add(UserRecord("ana99", "h", "comprador", {}))
+    with open(path + ".journal", "a", encoding="utf-8") as f:
+        f.write('{"op":"put","user":{"userna')
+
+    reopened = JsonAuthRepository(data_file=path, journal=True)
+    reopened.add(UserRecord("luis", "h", "comprador", {}))
+    assert {u.username for u in JsonAuthRepository(data_file=path).list_all()} == {"ana99", "luis"}
+
+
+def test_two_instances_see_each_other(tmp_path):
+    path = str(tmp_path / "users.json")
+    a = JsonAuthRepository(data_file=path)
+    b = JsonAuthRepository(data_file=path, journal=True)
+
+    a.add(UserRecord("ana99", "h", "comprador", {}))
+    assert b.get("ana99") is not None
+
+    b.add(UserRecord("luis", "h", "comprador", {}))
+    assert a.get("luis") is not None
+
+    # ``a`` reescribe el snapshot sin perder lo que ``b`` dejó en su journal
+    a.add(UserRecord("pepe", "h", "comprador", {}))
+    assert {u.username for u in b.list_all()} == {"ana99", "luis", "pepe"}
+
+
+def test_concurrent_writers_do_not_lose_updates(tmp_path):
+    path = str(tmp_path / "users.json")
+    repos = [JsonAuthRepository(data_file=path), JsonAuthRepository(data_file=path, journal=True)]
+
+    def worker(repo, prefix):
+        for i in range(30):
+            repo.add(UserRecord(f"{prefix}{i}", "h", "comprador", {}))
+
+    threads = [threading.Thread(target=worker, args=(r, f"p{n}_")) for n, r in enumerate(repos)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(JsonAuthRepository(data_file=path).list_all()) == 60
+
+
+def test_read_does_not_race_with_other_instance_compaction(tmp_path):
+    path = str(tmp_path / "users.json")
+    a = JsonAuthRepository(data_file=path)
+    b = JsonAuthRepository(data_file=path)
+    b.add(UserRecord("ana99", "h", "comprador", {}))
+
+    # ``b`` compacta justo después de que ``a`` haya leído el snapshot
+    load = a._load_snapshot
+    writer = threading.Thread(target=b.add, args=(UserRecord("luis", "h", "comprador", {}),))
+
+    def load_then_compact():
+        sig = load()
+        if writer.ident is None:
+            writer.start()
+            writer.join(timeout=0.2)
+        return sig
+
+    a._load_snapshot = load_then_compact
+    assert a.get("ana99") is not None
+    writer.join()
+
+    assert a.get("luis") is not None
+    a.add(UserRecord("pepe", "h", "comprador", {}))
+    names = {u.username for u in JsonAuthRepository(data_file=path).list_all()}
+    assert names == {"ana99", "luis", "pepe"}
@@ -0,0 +1,53 @@
+import json
+
+from core.adapters.json_auth_repo import JsonAuthRepository
+from core.adapters.lazy_json_auth_repo import LazyJsonAuthRepository
+from core.ports.auth_repo import UserRecord
+
+
+def _write_users(path, n):
+    users = [
+        {"username": f"user{i}", "pw_hash": f"h{i}", "role": "comprador",
+         "extra": {"dealer_name": "Ñandú {x}", "tags": ["a", "b"]}}
+        for i in range(n)
+    ]
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(users, f, indent=4)
+
+
+def test_lazy_repo_materializes_on_demand(tmp_path):
+    path = str(tmp_path / "users.json")
+    _write_users(path, 50)
+
+    repo = LazyJsonAuthRepository(data_file=path, cache_size=5)
+    assert len(repo._index) == 50
+    assert len(repo._cache) == 0
+
+    user = repo.get("user7")
+    assert user.pw_hash == "h7"
+    assert user.extra["dealer_name"] == "Ñandú {x}"
+    assert repo.get("nadie") is None
+
+    for i in range(10):
+        repo.get(f"user{i}")
+    assert len(repo._cache) == 5
+
+
+def test_lazy_repo_writes_compatible_snapshot(tmp_path):
+    path = str(tmp_path / "users.json")
+    _write_users(path, 10)
+
+    repo = LazyJsonAuthRepository(data_file=path)
+    repo.add(UserRecord("nuevo", "hn", "concesionario", {}))
+    repo.update(UserRecord("user3", "h3b", "administrador", {}))
+    repo.delete("user5")
+
+    assert repo.get("user3").pw_hash == "h3b"
+    assert repo.get("user5") is None
+    assert len(repo.list_all()) == 10
+
+    eager = JsonAuthRepository(data_file=path)
+    assert eager.get("nuevo").role == "concesionario"
+    assert eager.get("user3").role == "administrador"
+    assert eager.get("user5") is None
+    assert eager.get("user9").extra["tags"] == ["a", "b"]
@@ -0,0 +1,38 @@
+import pytest
+
+from core.adapters.mmap_auth_repo import MmapAuthRepository, build_user_index
+from core.ports.auth_repo import UserRecord
+from core.services.authentication_service import AuthenticationService
+from core.crypto import hash_password
+
+
+def test_mmap_index_lookup(tmp_path):
+    path = str(tmp_path / "users.idx")
+    users = [
+        UserRecord(f"user{i}", hash_password(f"Clave@{i}"), "comprador", {})
+        for i in range(100)
+    ]
+    users.append(UserRecord("dealer", hash_password("Clave@123"), "concesionario", {"dealer_name": "Ñandú"}))
+    assert build_user_index(users, path) == 101
+
+    repo = MmapAuthRepository(path)
+    assert repo.get("user42") == users[42]
+    assert repo.get("dealer").extra == {"dealer_name": "Ñandú"}
+    assert repo.get("user420") is None
+    assert repo.get("a" * 50) is None
+    assert len(repo.list_all()) == 101
+
+    assert AuthenticationService(repo).login("dealer", "Clave@123").ok
+
+
+def test_mmap_repo_is_read_only_and_picks_up_rebuilds(tmp_path):
+    path = str(tmp_path / "users.idx")
+    build_user_index([UserRecord("ana99", "h", "comprador", {})], path)
+    repo = MmapAuthRepository(path)
+
+    with pytest.raises(PermissionError):
+        repo.add(UserRecord("luis", "h", "comprador", {}))
+
+    build_user_index([UserRecord("luis", "h", "administrador", {})], path)
+    assert repo.get("ana99") is None
+    assert repo.get("luis").role == "administrador"
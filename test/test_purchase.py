@@ -1,5 +1,11 @@
+import threading
+import time
+
+import pytest
+
 from core.models import LineItem
 from core.factories import VehicleFactory, ServiceFactory
+from core.services.catalog_service import InsufficientStockError
 
 def test_purchase_invoice_creation(purchase_service, report_manager, catalog_service):
 
@@ -19,3 +25,68 @@ def test_purchase_invoice_creation(purchase_service, report_manager, catalog_ser
     assert factura.cliente_username == "juanito"
     assert len(report_manager.invoices) == 1
 
+
+
+def _repuesto(catalog_service, nombre, stock):
+    r = ServiceFactory.create_service("repuesto", nombre=nombre, precio=10.0, stock=stock)
+    catalog_service.add_service(r)
+    return r
+
+
+def test_concurrent_checkouts_never_oversell(purchase_service, report_manager, catalog_service):
+    bujia = _repuesto(catalog_service, "Bujía", 3)
+    results = []
+
+    def checkout():
+        try:
+            purchase_service.create_invoice([LineItem(bujia, 1)], cliente_username="c")
+            results.append("ok")
+        except InsufficientStockError:
+            results.append("sin stock")
+
+    threads = [threading.Thread(target=checkout) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert results.count("ok") == 3 and len(report_manager.invoices) == 3
+    assert catalog_service.get_service(bujia.id).stock == 0
+
+
+def test_reservation_is_all_or_nothing(purchase_service, report_manager, catalog_service):
+    filtro = _repuesto(catalog_service, "Filtro", 5)
+    bujia = _repuesto(catalog_service, "Bujía", 1)
+    reservations = purchase_service.reservations
+
+    with pytest.raises(InsufficientStockError) as exc:
+        purchase_service.create_invoice([LineItem(filtro, 2), LineItem(bujia, 2)], "c")
+    assert exc.value.item_id == bujia.id
+    assert reservations.available(filtro.id) == 5 and not report_manager.invoices
+
+    held = purchase_service.reserve_cart([LineItem(filtro, 2), LineItem(filtro, 2)])
+    assert held.lines == {filtro.id: 4} and reservations.available(filtro.id) == 1
+    with pytest.raises(InsufficientStockError):
+        reservations.reserve({filtro.id: 2})
+    reservations.release(held.id)
+    assert reservations.available(filtro.id) == 5
+    # El catálogo tampoco recorta a cero
+    with pytest.raises(InsufficientStockError):
+        catalog_service.decrement_repuesto_stock(filtro.id, 6)
+
+
+def test_expired_reservation_frees_stock(purchase_service, catalog_service):
+    bujia = _repuesto(catalog_service, "Bujía", 2)
+    reservations = purchase_service.reservations
+
+    stale = reservations.reserve({bujia.id: 2}, ttl_seconds=0.01)
+    assert reservations.available(bujia.id) == 0
+    time.sleep(0.02)
+    assert reservations.available(bujia.id) == 2
+    with pytest.raises(ValueError):
+        reservations.commit(stale.id)
+
+    fresh = reservations.reserve({bujia.id: 2})
+    assert len(reservations) == 1
+    reservations.commit(fresh.id)
+    assert catalog_service.get_service(bujia.id).stock == 0
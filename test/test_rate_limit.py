@@ -0,0 +1,48 @@
+import time
+
+from core.rate_limit import LoginRateLimiter, SlidingWindowSketch
+from core.services.authentication_service import AuthenticationService
+
+
+def test_sketch_window_slides():
+    sketch = SlidingWindowSketch(window_seconds=1.0, width=64, depth=3, buckets=4)
+    now = 100.0
+    for _ in range(5):
+        sketch.add("ana99", now)
+    assert sketch.estimate("ana99", now) >= 5
+    assert sketch.estimate("ana99", now + 0.5) >= 5
+    # Fuera de la ventana los fallos antiguos ya no cuentan
+    assert sketch.estimate("ana99", now + 1.5) == 0
+
+
+def test_lockout_rejects_before_repository(clean_repo, registration_service, monkeypatch):
+    registration_service.register_user("ana99", "Clave@123")
+    limiter = LoginRateLimiter(max_failures_per_user=3, lockout_seconds=60)
+    auth = AuthenticationService(clean_repo, rate_limiter=limiter)
+
+    for _ in range(3):
+        assert auth.login("ana99", "Mala@1234").code == "BAD_PASSWORD"
+
+    def fail(*_):
+        raise AssertionError("no debería consultar el repositorio")
+
+    monkeypatch.setattr(clean_repo, "get", fail)
+    assert auth.login("ana99", "Clave@123").code == "RATE_LIMITED"
+
+
+def test_source_limit_covers_many_usernames(clean_repo):
+    limiter = LoginRateLimiter(max_failures_per_user=100, max_failures_per_source=4)
+    auth = AuthenticationService(clean_repo, rate_limiter=limiter)
+    for i in range(4):
+        assert auth.login(f"nadie{i}", "Clave@123", source="10.0.0.1").code == "NOT_FOUND"
+
+    assert auth.login("otro99", "Clave@123", source="10.0.0.1").code == "RATE_LIMITED"
+    assert auth.login("otro99", "Clave@123", source="10.0.0.2").code == "NOT_FOUND"
+
+
+def test_lockout_expires():
+    limiter = LoginRateLimiter(max_failures_per_user=1, window_seconds=1, lockout_seconds=0.05)
+    limiter.record_failure("ana99")
+    assert not limiter.allow("ana99")
+    time.sleep(0.06)
+    assert limiter.allow("ana99")
@@ -1,3 +1,4 @@
+from core.user_import import read_users_csv, read_users_jsonl
 
 def test_registration_valid(registration_service, clean_repo):
     ok, msg = registration_service.register_user("ana99", "Pass@123", "comprador")
@@ -11,3 +12,57 @@ def test_registration_invalid_username(registration_service):
 def test_registration_invalid_password(registration_service):
     ok, msg = registration_service.register_user("user123", "abc", "comprador")
     assert ok is False
+
+def test_register_many_streams_results(registration_service, clean_repo, tmp_path):
+    registration_service.register_user("ana99", "Pass@123", "comprador")
+    csv_file = tmp_path / "dealers.csv"
+    csv_file.write_text(
+        "username,password,dealer_name\n"
+        "dealer1,Pass@123,Autos Uno\n"
+        "ana99,Pass@123,\n"
+        "dealer1,Pass@123,Repetido\n"
+        "x,Pass@123,\n"
+        "dealer2,Pass@123,\n",
+        encoding="utf-8",
+    )
+    results = list(registration_service.register_many(read_users_csv(str(csv_file)), chunk_size=2))
+    assert [r.ok for r in results] == [True, False, False, False, True]
+    assert [r.line for r in results] == [1, 2, 3, 4, 5]
+    dealer = clean_repo.get("dealer1")
+    assert dealer.role == "concesionario" and dealer.extra == {"dealer_name": "Autos Uno"}
+
+    jsonl_file = tmp_path / "dealers.jsonl"
+    jsonl_file.write_text('{"username": "dealer3", "password": "Pass@123"}\nno es json\n', encoding="utf-8")
+    results = list(registration_service.register_many(read_users_jsonl(str(jsonl_file))))
+    assert [r.ok for r in results] == [True, False]
+    assert clean_repo.get("dealer3") is not None
+
+
+def test_register_many_rejects_roles_and_bad_extra_per_row(registration_service, clean_repo, tmp_path):
+    jsonl_file = tmp_path / "users.jsonl"
+    jsonl_file.write_text(
+        '{"username": "jefe1", "password": "Pass@123", "role": "superadmin"}\n'
+        '{"username": "jefe2", "password": "Pass@123", "role": "gerente"}\n'
+        '{"username": "raro1", "password": "Pass@123", "extra": "texto"}\n'
+        '{"username": "bueno1", "password": "Pass@123", "role": "concesionario", "extra": {"dealer_name": "A"}}\n',
+        encoding="utf-8",
+    )
+    results = list(registration_service.register_many(read_users_jsonl(str(jsonl_file))))
+    assert [r.ok for r in results] == [False, False, False, True]
+    assert "rol" in results[0].message.lower() and "extra" in results[2].message.lower()
+    assert clean_repo.get("jefe1") is None and clean_repo.get("raro1") is None
+    assert registration_service.register_user("jefe3", "Pass@123", "superadmin")[0] is False
+
+
+def test_register_many_checks_existing_users_per_name(registration_service, clean_repo, monkeypatch):
+    registration_service.register_user("ana99", "Pass@123", "comprador")
+
+    def list_all():
+        raise AssertionError("register_many no debe leer todos los usuarios")
+
+    monkeypatch.setattr(clean_repo, "list_all", list_all)
+    names = ["bob01", "ana99", "carl1", "bob01", "dan01", "carl1", "bob01"]
+    rows = [{"username": n, "password": "Pass@123"} for n in names]
+    results = list(registration_service.register_many(rows, chunk_size=2))
+    assert [r.ok for r in results] == [True, False, True, False, True, False, False]
+    assert all(r.message == "El usuario ya existe." for r in results if not r.ok)
@@ -0,0 +1,69 @@
+import time
+
+from core.ports.auth_repo import UserRecord
+from core.services.authentication_service import AuthenticationService
+from core.services.user_admin_service import UserAdminService
+from core.session_store import SessionStore
+
+
+def _user(name, role="comprador"):
+    return UserRecord(name, "h", role, {})
+
+
+def test_sliding_expiry_and_sweep():
+    store = SessionStore(ttl_seconds=0.05)
+    token = store.create(_user("ana99"))
+    for _ in range(3):
+        time.sleep(0.03)
+        assert store.user_for(token).username == "ana99"
+
+    time.sleep(0.06)
+    store.sweep()
+    assert len(store) == 0
+    assert store.get(token) is None
+
+
+def test_max_sessions_evicts_least_recently_used():
+    store = SessionStore(max_sessions=2)
+    t1 = store.create(_user("uno"))
+    t2 = store.create(_user("dos"))
+    store.get(t1)
+    t3 = store.create(_user("tres"))
+    assert store.get(t2) is None
+    assert store.get(t1) is not None and store.get(t3) is not None
+
+
+def test_expiry_heap_stays_bounded_by_live_sessions():
+    store = SessionStore(max_sessions=10)
+    for i in range(5000):
+        token = store.create(_user(f"user{i}"))
+        if i % 2:
+            store.revoke(token)
+    store.revoke_user("user4998")
+    # Las expulsadas y revocadas no se acumulan en el montículo hasta caducar
+    assert len(store) == 8
+    assert len(store._expiry) <= 2 * len(store) + 64
+    assert store.user_for(token) is None
+
+
+def test_many_clients_in_one_service(clean_repo, registration_service):
+    sessions = SessionStore()
+    auth = AuthenticationService(clean_repo, sessions=sessions)
+    admin = UserAdminService(clean_repo, sessions=sessions)
+    for name in ("ana99", "luis99"):
+        registration_service.register_user(name, "Clave@123")
+
+    ana = auth.login("ana99", "Clave@123").token
+    luis = auth.login("luis99", "Clave@123").token
+    assert auth.current_user.username == "luis99"
+    assert auth.user_for_token(ana).username == "ana99"
+
+    admin.update_user("ana99", new_role="concesionario")
+    assert auth.user_for_token(ana).role == "concesionario"
+
+    admin.update_user("ana99", new_password="Nueva@123")
+    assert auth.user_for_token(ana) is None
+
+    auth.logout()
+    assert auth.current_user is None
+    assert auth.user_for_token(luis) is None
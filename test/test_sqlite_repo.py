@@ -0,0 +1,111 @@
+import threading
+
+import pytest
+
+from core.adapters.sqlite_auth_repo import SqliteAuthRepository
+from core.ports.auth_repo import UserRecord
+from core.services.authentication_service import AuthenticationService
+from core.services.registration_service import RegistrationService
+
+
+@pytest.fixture
+def sqlite_repo(tmp_path):
+    repo = SqliteAuthRepository(db_file=str(tmp_path / "users.db"))
+    yield repo
+    repo.close()
+
+
+def test_sqlite_crud(sqlite_repo):
+    sqlite_repo.add(UserRecord("ana99", "h1", "concesionario", {"dealer_name": "Ana"}))
+    with pytest.raises(ValueError):
+        sqlite_repo.add(UserRecord("ana99", "h1", "comprador", {}))
+
+    sqlite_repo.update(UserRecord("ana99", "h2", "comprador", {}))
+    user = sqlite_repo.get("ana99")
+    assert user.pw_hash == "h2" and user.role == "comprador"
+
+    with pytest.raises(KeyError):
+        sqlite_repo.update(UserRecord("nadie", "h", "comprador", {}))
+
+    sqlite_repo.delete("ana99")
+    assert sqlite_repo.get("ana99") is None
+
+
+def test_sqlite_services_and_threads(sqlite_repo):
+    RegistrationService(sqlite_repo).register_user("juan123", "Clave@123")
+    assert AuthenticationService(sqlite_repo).login("juan123", "Clave@123").ok
+
+    found = []
+    t = threading.Thread(target=lambda: found.append(sqlite_repo.get("juan123")))
+    t.start()
+    t.join()
+    assert found[0].username == "juan123"
+
+
+def test_sqlite_batch_rolls_back(sqlite_repo):
+    with pytest.raises(RuntimeError):
+        with sqlite_repo.batch():
+            sqlite_repo.add(UserRecord("ana99", "h", "comprador", {}))
+            raise RuntimeError("falla")
+    assert sqlite_repo.get("ana99") is None
+
+    with sqlite_repo.batch():
+        sqlite_repo.add(UserRecord("ana99", "h", "comprador", {}))
+        sqlite_repo.add(UserRecord("luis", "h", "comprador", {}))
+    assert len(sqlite_repo.list_all()) == 2
+
+
+def test_sqlite_bloom_negative_cache(tmp_path):
+    db = str(tmp_path / "users.db")
+    repo = SqliteAuthRepository(db_file=db, bloom_filter=True, bloom_recheck_ms=0)
+    repo.add(UserRecord("ana99", "h", "comprador", {}))
+    assert repo.get("ana99") is not None
+    for i in range(50):
+        assert repo.get(f"nadie{i}") is None
+    stats = repo.bloom_stats()
+    assert stats.items == 1 and stats.avoided_lookups + stats.false_positives == 50
+    assert stats.estimated_fp_rate < 0.01
+
+    # Baja deshecha por rollback: el nombre sigue en el filtro
+    with pytest.raises(RuntimeError):
+        with repo.batch():
+            repo.delete("ana99")
+            raise RuntimeError("falla")
+    assert repo.get("ana99") is not None
+
+    repo.delete("ana99")
+    assert repo.get("ana99") is None and "ana99" not in repo.negative_cache
+
+    # Escritura desde otra conexión: el contador de users_meta no cuadra y el
+    # filtro se reconstruye (con bloom_recheck_ms=0 se comprueba en cada get)
+    other = SqliteAuthRepository(db_file=db)
+    other.add(UserRecord("luis99", "h", "comprador", {}))
+    assert repo.get("luis99").username == "luis99"
+    other.close()
+    repo.close()
+
+
+def test_sqlite_bloom_sees_own_writes_from_other_threads(tmp_path):
+    repo = SqliteAuthRepository(db_file=str(tmp_path / "users.db"), bloom_filter=True)
+    assert repo.get("ana99") is None
+    t = threading.Thread(target=lambda: repo.add(UserRecord("ana99", "h", "comprador", {})))
+    t.start()
+    t.join()
+    # Sin esperar a la recomprobación: las altas propias entran en el filtro al momento
+    assert repo.get("ana99") is not None
+    repo.close()
+
+
+def test_registration_handles_stale_bloom_negative(tmp_path):
+    db = str(tmp_path / "users.db")
+    repo = SqliteAuthRepository(db_file=db, bloom_filter=True, bloom_recheck_ms=60_000)
+    other = SqliteAuthRepository(db_file=db)
+    assert repo.get("ana99") is None
+    # Alta desde otro proceso dentro de la ventana de recomprobación: el filtro aún dice "no existe"
+    other.add(UserRecord("ana99", "h", "comprador", {}))
+    assert repo.get("ana99") is None
+
+    ok, msg = RegistrationService(repo).register_user("ana99", "Clave@123")
+    assert (ok, msg) == (False, "El usuario ya existe.")
+    other.close()
+    repo.close()
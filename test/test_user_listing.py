@@ -0,0 +1,135 @@
+from contextlib import contextmanager
+
+import pytest
+
+from core.adapters.json_auth_repo import JsonAuthRepository
+from core.adapters.lazy_json_auth_repo import LazyJsonAuthRepository
+from core.adapters.mmap_auth_repo import MmapAuthRepository, build_user_index
+from core.adapters.sqlite_auth_repo import SqliteAuthRepository
+from core.ports.auth_repo import UserRecord
+from core.services.user_admin_service import UserAdminService
+
+USERS = [
+    UserRecord(f"{prefix}{i:02d}", "h", role, {})
+    for prefix, role in (("ana", "comprador"), ("auto", "concesionario"), ("bea", "comprador"))
+    for i in range(12)
+]
+
+
+def _filled(repo):
+    with repo.batch():
+        for user in USERS:
+            repo.add(user)
+    return repo
+
+
+@pytest.fixture(params=["json", "lazy", "sqlite", "mmap"])
+def repo(request, tmp_path):
+    if request.param == "json":
+        yield _filled(JsonAuthRepository(data_file=str(tmp_path / "users.json")))
+    elif request.param == "lazy":
+        yield _filled(LazyJsonAuthRepository(data_file=str(tmp_path / "users.json")))
+    elif request.param == "sqlite":
+        repo = _filled(SqliteAuthRepository(db_file=str(tmp_path / "users.db")))
+        yield repo
+        repo.close()
+    else:
+        build_user_index(USERS, str(tmp_path / "users.idx"))
+        yield MmapAuthRepository(str(tmp_path / "users.idx"))
+
+
+def test_list_users_pages_and_filters(repo):
+    service = UserAdminService(repo)
+    names = sorted(u.username for u in repo.list_all())
+
+    first = service.list_users(0, 10)
+    assert [u.username for u in first] == names[:10]
+    assert first[0] == repo.get(names[0])
+    assert [u.username for u in service.list_users(30, 10)] == names[30:40]
+    assert [u.username for u in service.list_users(5, 3, sort="-username")] == names[::-1][5:8]
+    assert service.count_users() == len(names)
+
+    assert [u.username for u in service.list_users(prefix="au", limit=3)] == ["auto00", "auto01", "auto02"]
+    assert service.count_users(prefix="a") == 24
+    assert service.count_users(role="comprador", prefix="be") == 12
+    assert [u.username for u in service.list_users(10, 5, role="concesionario")] == ["auto10", "auto11"]
+    assert service.list_users(role="concesionario", prefix="ana") == []
+    assert service.count_users(role="nadie") == 0
+
+    with pytest.raises(ValueError):
+        service.list_users(sort="role")
+
+
+def test_list_page_follows_writes(tmp_path):
+    repo = _filled(JsonAuthRepository(data_file=str(tmp_path / "users.json")))
+    assert repo.count(role="concesionario") == 12
+
+    repo.update(UserRecord("ana00", "h", "concesionario", {}))
+    repo.delete("auto11")
+    repo.add(UserRecord("aaa", "h", "concesionario", {}))
+
+    assert [u.username for u in repo.list_page(limit=3, role="concesionario")] == ["aaa", "ana00", "auto00"]
+    assert repo.count(role="concesionario") == 13
+    assert repo.count(role="comprador", prefix="ana") == 11
+
+
+def test_admin_bulk_operations_write_once(user_admin_service, registration_service, clean_repo, monkeypatch):
+    user_admin_service.ensure_superadmin()
+    with registration_service.batch():
+        for i in range(4):
+            registration_service.register_user(f"user{i}", "Pass@123", "comprador")
+
+    saves = []
+    original_save = clean_repo._save
+    monkeypatch.setattr(clean_repo, "_save", lambda: saves.append(1) or original_save())
+
+    results = user_admin_service.update_users_bulk(
+        lambda u: u.role in ("comprador", "superadmin"), new_role="concesionario", new_password="Nueva@123"
+    )
+    assert {r.username: r.ok for r in results} == {
+        "superadmin": False, "user0": True, "user1": True, "user2": True, "user3": True,
+    }
+    assert len(saves) == 1
+    assert clean_repo.get("user0").role == "concesionario"
+    assert clean_repo.get("user0").pw_hash != clean_repo.get("user1").pw_hash
+
+    assert [r.ok for r in user_admin_service.update_users_bulk(["user0"], new_role="rey")] == [False]
+    # Sin rol ni contraseña no se reescribe nadie
+    assert [r.ok for r in user_admin_service.update_users_bulk(["user0", "user1"])] == [False, False]
+    assert len(saves) == 1
+
+    results = user_admin_service.delete_users_bulk(["user0", "nadie", "superadmin", "user1", "user0"])
+    assert [(r.username, r.ok) for r in results] == [
+        ("user0", True), ("nadie", False), ("superadmin", False), ("user1", True),
+    ]
+    assert len(saves) == 2
+    assert clean_repo.get("user1") is None and clean_repo.get("superadmin") is not None
+
+
+def test_admin_bulk_hashes_before_opening_batch(user_admin_service, registration_service, clean_repo, monkeypatch):
+    registration_service.register_user("user0", "Pass@123", "comprador")
+    events = []
+    original_batch, original_hash_many = clean_repo.batch, user_admin_service._hash_many
+
+    @contextmanager
+    def batch():
+        events.append("batch")
+        with original_batch():
+            yield
+
+    class Recorded:
+        def __init__(self, future):
+            self._future = future
+
+        def result(self):
+            events.append("hash")
+            return self._future.result()
+
+    monkeypatch.setattr(clean_repo, "batch", batch)
+    monkeypatch.setattr(
+        user_admin_service, "_hash_many",
+        lambda password, count: [Recorded(f) for f in original_hash_many(password, count)],
+    )
+
+    assert [r.ok for r in user_admin_service.update_users_bulk(["user0"], new_password="Nueva@123")] == [True]
+    assert events == ["hash", "batch"]
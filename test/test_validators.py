@@ -1,5 +1,7 @@
 
-from core.validators import validate_username, validate_password, validate_matricula
+import pytest
+
+from core.validators import validate_username, validate_password, validate_matricula, validate_many
 
 def test_validate_username_ok():
     assert validate_username("juan_23") is True
@@ -15,3 +17,17 @@ def test_validate_password_bad():
 
 def test_validate_matricula_ok():
     assert validate_matricula("ABC-1234") is True
+
+def test_validate_matricula_lowercase():
+    assert validate_matricula("abc-12") is True
+    assert validate_matricula("ab") is False
+    # Solo ASCII: ni plegados Unicode (signo Kelvin) ni letras que upper() convertía
+    assert validate_matricula("\u212aAB-12") is False
+    assert validate_matricula("ßAB-12") is False
+
+def test_validate_many_matches_single_validators():
+    values = ["juan_23", "$$$", "ab", "Clave@123", None]
+    assert validate_many(values, "username") == [True, False, False, False, False]
+    assert validate_many(iter(values), "password") == [False, False, False, True, False]
+    with pytest.raises(ValueError):
+        validate_many(values, "dni")
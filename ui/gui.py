@@ -1,19 +1,32 @@
 # ui/gui.py
 import tkinter as tk
+from bisect import bisect_right
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import replace
 from tkinter import messagebox, simpledialog
 
 from core.services.authentication_service import AuthenticationService, LoginResult
 from core.services.registration_service import RegistrationService
-from core.services.user_admin_service import UserAdminService
-from core.services.catalog_service import CatalogService
+from core.services.user_admin_service import ROLES, UserAdminService
+from core.services.catalog_service import CatalogService, InsufficientStockError
 from core.services.purchase_service import PurchaseService
 from core.data_seed import seed_catalog
 from core.report_manager import ReportManager
 from core.models import LineItem, Factura
 from core.factories import VehicleFactory, ServiceFactory
 from core.validators import validate_matricula
+from core.catalog_index import VEHICLE_SORTS
 from core.log_config import logger
 
+# Usuarios por página en las pantallas de administración.
+USERS_PAGE_SIZE = 100
+# Resultados máximos de la búsqueda libre en los catálogos.
+SEARCH_LIMIT = 200
+# Cada cuánto las listas del catálogo abiertas piden los cambios nuevos (ms).
+CATALOG_POLL_MS = 1000
+# Cada cuánto se mira si terminó un trabajo en segundo plano (ms).
+BACKGROUND_POLL_MS = 50
+
 
 class AppGUI:
     def __init__(
@@ -43,15 +56,37 @@ class AppGUI:
         self.user_admin_service.ensure_superadmin("superadmin", "Admin@123")
 
         # Semilla de catálogo (solo si está vacío)
-        if not self.catalog_service.list_vehicles() and not self.catalog_service.list_services():
+        if self.catalog_service.is_empty():
             seed_catalog(self.catalog_service)
 
         self.current_cart: list[LineItem] = []
-        self._last_vehicle_list = []
-        self._last_service_list = []
+        # Login, registro y cambios de contraseña hashean (scrypt): fuera del hilo de Tk
+        self._worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="gui-auth")
 
         self.build_welcome()
 
+    # -------------------- Trabajo en segundo plano --------------------
+    def _in_background(self, work, done, button=None):
+        """
+        Ejecuta ``work()`` en el hilo de trabajo y, sin bloquear la UI,
+        llama a ``done(future)`` en el hilo de Tk cuando termina (sondeando
+        con ``root.after``). ``button`` se desactiva mientras tanto para no
+        lanzar la misma operación dos veces.
+        """
+        if button is not None:
+            button.config(state="disabled")
+        future: Future = self._worker.submit(work)
+
+        def poll():
+            if not future.done():
+                self.root.after(BACKGROUND_POLL_MS, poll)
+                return
+            if button is not None and button.winfo_exists():
+                button.config(state="normal")
+            done(future)
+
+        self.root.after(BACKGROUND_POLL_MS, poll)
+
     # -------------------- Pantalla de inicio --------------------
     def build_welcome(self):
         logger.info("Mostrando pantalla de bienvenida")
@@ -135,18 +170,27 @@ class AppGUI:
                 else {}
             )
 
-            ok, msg = self.registration_service.register_user(
-                username, password, role, extra
+            def finished(future):
+                ok, msg = future.result()
+                if not ok:
+                    logger.warning("Registro fallido para %s: %s", username, msg)
+                    messagebox.showerror("Registro", msg)
+                    return
+                logger.info("Usuario registrado: %s", username)
+                messagebox.showinfo("Registro", msg)
+                if win.winfo_exists():
+                    win.destroy()
+
+            self._in_background(
+                lambda: self.registration_service.register_user(
+                    username, password, role, extra
+                ),
+                finished,
+                btn_register,
             )
-            if not ok:
-                logger.warning("Registro fallido para %s: %s", username, msg)
-                messagebox.showerror("Registro", msg)
-                return
-            logger.info("Usuario registrado: %s", username)
-            messagebox.showinfo("Registro", msg)
-            win.destroy()
 
-        tk.Button(win, text="Registrar", width=18, command=do_register).pack(pady=10)
+        btn_register = tk.Button(win, text="Registrar", width=18, command=do_register)
+        btn_register.pack(pady=10)
 
     # -------------------- Login --------------------
     def open_login(self):
@@ -166,9 +210,13 @@ class AppGUI:
         def do_login():
             u = e_user.get().strip()
             p = e_pw.get().strip()
+            self._in_background(
+                lambda: self.auth_service.login(u, p),
+                lambda future: finished(u, future.result()),
+                btn_login,
+            )
 
-            result: LoginResult = self.auth_service.login(u, p)
-
+        def finished(u, result: LoginResult):
             if not result.ok:
                 code = result.code
                 if code == "EMPTY":
@@ -179,6 +227,8 @@ class AppGUI:
                     msg = "Usuario no encontrado."
                 elif code == "BAD_PASSWORD":
                     msg = "Contraseña incorrecta."
+                elif code == "RATE_LIMITED":
+                    msg = "Demasiados intentos fallidos. Inténtalo más tarde."
                 else:
                     msg = "No se pudo iniciar sesión."
                 logger.warning("Login fallido para %s (%s)", u, code)
@@ -188,11 +238,13 @@ class AppGUI:
             rec = result.user
             logger.info("Usuario %s ha iniciado sesión (rol=%s)", rec.username, rec.role)
             messagebox.showinfo("Bienvenido", f"Hola {rec.username} (rol: {rec.role})")
-            win.destroy()
+            if win.winfo_exists():
+                win.destroy()
             self.current_cart = []
             self.open_role_dashboard(rec)
 
-        tk.Button(win, text="Entrar", width=18, command=do_login).pack(pady=12)
+        btn_login = tk.Button(win, text="Entrar", width=18, command=do_login)
+        btn_login.pack(pady=12)
 
     # -------------------- Dashboard por rol --------------------
     def open_role_dashboard(self, user_rec):
@@ -309,41 +361,166 @@ class AppGUI:
             self.root, text="Volver al inicio", command=self.build_welcome
         ).pack(pady=10)
 
+    # -------------------- Catálogo: cambios --------------------
+    def _follow_catalog(self, win, entity: str, reload, apply=None):
+        """
+        Mantiene una lista de ``win`` al día con el registro de cambios del
+        catálogo. ``reload(snap)`` la rehace desde una instantánea;
+        ``apply(changes)`` aplica solo los cambios de ``entity`` y devuelve
+        False si no puede (sin ``apply`` se recarga ante cualquier cambio).
+        Se sondea cada CATALOG_POLL_MS mientras la ventana exista. Devuelve
+        ``refresh(full=False)`` para forzar la actualización tras una acción.
+        """
+        state = {"version": -1}
+
+        def refresh(full: bool = False):
+            changes = None if full else self.catalog_service.changes_since(state["version"])
+            if changes is None:
+                snap = self.catalog_service.snapshot()
+                reload(snap)
+                state["version"] = snap.version
+                return
+            if not changes:
+                return
+            mine = [c for c in changes if c.entity == entity]
+            if mine and (apply is None or apply(mine) is False):
+                refresh(full=True)
+                return
+            state["version"] = changes[-1].version
+            if mine:
+                logger.debug("Aplicados %d cambios del catálogo (%s)", len(mine), entity)
+
+        def poll():
+            if not win.winfo_exists():
+                return
+            refresh()
+            self.root.after(CATALOG_POLL_MS, poll)
+
+        refresh(full=True)
+        self.root.after(CATALOG_POLL_MS, poll)
+        return refresh
+
+    @staticmethod
+    def _apply_list_changes(lb, items: list, changes, line, sort_key=None):
+        """
+        Aplica altas, ediciones y bajas a ``items`` (modificada en sitio) y a
+        su Listbox ``lb``, cuyas filas son ``line(item)``. Las altas van al
+        final, o en su sitio si la lista está ordenada por ``sort_key``.
+        """
+        rows = {x.id: i for i, x in enumerate(items)}
+        for c in changes:
+            i = rows.get(c.item_id)
+            if c.kind == "delete":
+                if i is None:
+                    continue
+                del items[i]
+                lb.delete(i)
+            elif i is not None:
+                items[i] = c.item
+                lb.delete(i)
+                lb.insert(i, line(c.item))
+                continue
+            else:
+                i = len(items) if sort_key is None else bisect_right(
+                    [sort_key(x) for x in items], sort_key(c.item)
+                )
+                items.insert(i, c.item)
+                lb.insert(i, line(c.item))
+            # Altas y bajas desplazan las filas siguientes
+            rows = {x.id: j for j, x in enumerate(items)}
+
     # -------------------- Catálogo vehículos --------------------
     def screen_browse_vehicles(self):
         logger.info("Abriendo catálogo de vehículos")
         win = tk.Toplevel(self.root)
         win.title("Catálogo de vehículos")
-        win.geometry("760x480")
+        win.geometry("860x520")
 
         top = tk.Frame(win)
         top.pack(fill="x", pady=6)
 
-        tk.Label(top, text="Filtrar por marca (vacío = todos):").pack(
+        tk.Label(top, text="Marca:").pack(side="left", padx=(8, 0))
+        marca_var = tk.StringVar(value="todas")
+        tk.OptionMenu(
+            top, marca_var, "todas", *self.catalog_service.vehicle_marcas()
+        ).pack(side="left", padx=4)
+        tk.Label(top, text="Modelo empieza por:").pack(side="left", padx=(8, 0))
+        e_modelo = tk.Entry(top, width=12)
+        e_modelo.pack(side="left", padx=4)
+        tk.Label(top, text="Precio de:").pack(side="left", padx=(8, 0))
+        e_min = tk.Entry(top, width=8)
+        e_min.pack(side="left", padx=4)
+        tk.Label(top, text="a:").pack(side="left")
+        e_max = tk.Entry(top, width=8)
+        e_max.pack(side="left", padx=4)
+        sort_var = tk.StringVar(value="id")
+        tk.OptionMenu(top, sort_var, *VEHICLE_SORTS).pack(side="left", padx=4)
+
+        search_bar = tk.Frame(win)
+        search_bar.pack(fill="x")
+        tk.Label(search_bar, text="Buscar (marca, modelo o descripción):").pack(
             side="left", padx=8
         )
-        e = tk.Entry(top)
-        e.pack(side="left", padx=8)
+        e_search = tk.Entry(search_bar, width=30)
+        e_search.pack(side="left", padx=4)
+        e_search.bind("<Return>", lambda _: load())
 
         listbox = tk.Listbox(win, width=110, height=20)
         listbox.pack(pady=6, padx=8)
 
+        # Filtros aplicados con "Filtrar": la actualización automática no
+        # usa lo que se esté escribiendo en los campos
+        applied = {}
+        shown = []
+
+        def price(entry):
+            text = entry.get().strip().replace(",", ".")
+            return float(text) if text else None
+
         def load():
-            filter_text = e.get().strip().lower()
+            marca = marca_var.get()
+            try:
+                price_min, price_max = price(e_min), price(e_max)
+            except ValueError:
+                messagebox.showerror("Error", "Precio no válido.")
+                return
+            applied.update(
+                text=e_search.get().strip(),
+                marca=None if marca == "todas" else marca,
+                modelo_prefix=e_modelo.get().strip() or None,
+                price_min=price_min,
+                price_max=price_max,
+                sort=sort_var.get(),
+            )
+            refresh(full=True)
+            logger.debug(
+                "Filtro aplicado en vehículos: marca='%s' búsqueda='%s'",
+                marca,
+                applied["text"],
+            )
+
+        def show(snap):
             listbox.delete(0, tk.END)
-            vehicles = self.catalog_service.list_vehicles()
-            filtered = [
-                v
-                for v in vehicles
-                if not filter_text or filter_text in v.marca.lower()
-            ]
-            self._last_vehicle_list = filtered
+            if not applied:
+                # Aún sin filtrar: todos, por id
+                filtered = snap.list_vehicles()
+            elif applied["text"]:
+                # La búsqueda libre ordena por relevancia e ignora los filtros
+                filtered = snap.search_vehicles(applied["text"], limit=SEARCH_LIMIT)
+            else:
+                filtered = snap.query_vehicles(
+                    marca=applied["marca"],
+                    modelo_prefix=applied["modelo_prefix"],
+                    price_min=applied["price_min"],
+                    price_max=applied["price_max"],
+                    sort=applied["sort"],
+                )
+            shown[:] = filtered
             for v in filtered:
                 listbox.insert(
                     tk.END,
                     f"{v.id} | {v.marca} {v.modelo} - ${v.precio} - {v.descripcion}",
                 )
-            logger.debug("Filtro aplicado en vehículos: '%s'", filter_text)
 
         def add_to_cart():
             sel = listbox.curselection()
@@ -352,7 +529,7 @@ class AppGUI:
                 messagebox.showwarning("Aviso", "Selecciona un vehículo")
                 return
             idx = sel[0]
-            chosen = self._last_vehicle_list[idx].clone()
+            chosen = shown[idx].clone()
             self.current_cart.append(LineItem(chosen, 1))
             logger.info(
                 "Vehículo añadido al carrito: %s %s", chosen.marca, chosen.modelo
@@ -368,53 +545,76 @@ class AppGUI:
             btns, text="Añadir al carrito", command=add_to_cart
         ).pack(side="left", padx=6)
 
-        load()
+        # Filtros y orden dependen de los datos: si cambia algún vehículo se repite la consulta
+        refresh = self._follow_catalog(win, "vehicle", show)
 
     # -------------------- Catálogo servicios --------------------
     def screen_browse_services(self):
         logger.info("Abriendo lista de repuestos/seguros")
         win = tk.Toplevel(self.root)
         win.title("Repuestos y Seguros")
-        win.geometry("760x480")
+        win.geometry("760x520")
+
+        top = tk.Frame(win)
+        top.pack(fill="x", pady=6)
+        tk.Label(top, text="Buscar (vacío = todos):").pack(side="left", padx=8)
+        e_search = tk.Entry(top, width=30)
+        e_search.pack(side="left", padx=4)
+        e_search.bind("<Return>", lambda _: load())
 
         lb = tk.Listbox(win, width=110, height=20)
         lb.pack(padx=8, pady=6)
 
-        def load():
+        # Búsqueda aplicada al pulsar "Actualizar lista" o Enter
+        applied = {"text": ""}
+        shown = []
+
+        def line(s):
+            if hasattr(s, "nombre"):
+                return f"Repuesto | {s.id} | {s.nombre} | ${s.precio} | Stock: {s.stock}"
+            if hasattr(s, "tipo"):
+                return f"Seguro  | {s.id} | {s.tipo} | ${s.precio} | Vigencia: {s.vigencia_meses} meses"
+            return f"Servicio | {s.id} | {getattr(s, 'nombre', str(s))}"
+
+        def show(snap):
             lb.delete(0, tk.END)
-            services = self.catalog_service.list_services()
-            self._last_service_list = services
+            if applied["text"]:
+                services = snap.search_services(applied["text"], limit=SEARCH_LIMIT)
+            else:
+                services = snap.list_services()
+            shown[:] = services
             for s in services:
-                if hasattr(s, "nombre"):
-                    lb.insert(
-                        tk.END,
-                        f"Repuesto | {s.id} | {s.nombre} | ${s.precio} | Stock: {s.stock}",
-                    )
-                elif hasattr(s, "tipo"):
-                    lb.insert(
-                        tk.END,
-                        f"Seguro  | {s.id} | {s.tipo} | ${s.precio} | Vigencia: {s.vigencia_meses} meses",
-                    )
-                else:
-                    lb.insert(
-                        tk.END,
-                        f"Servicio | {s.id} | {getattr(s, 'nombre', str(s))}",
-                    )
+                lb.insert(tk.END, line(s))
             logger.debug("Lista de servicios refrescada")
 
+        def apply(changes):
+            # Los resultados de una búsqueda dependen del texto: se repite
+            if applied["text"]:
+                return False
+            self._apply_list_changes(lb, shown, changes, line, sort_key=lambda s: s.id)
+
+        def load():
+            applied["text"] = e_search.get().strip()
+            refresh(full=True)
+
         def add_selected():
             sel = lb.curselection()
             if not sel:
                 logger.warning("Intento de añadir servicio sin selección")
                 messagebox.showwarning("Aviso", "Selecciona un servicio.")
                 return
-            item = self._last_service_list[sel[0]]
+            item = shown[sel[0]]
             if hasattr(item, "stock"):
+                # Lo ya reservado por otras compras en curso no está disponible
+                disponible = self.purchase_service.reservations.available(item.id)
+                if disponible <= 0:
+                    messagebox.showwarning("Stock", f"Sin stock disponible de {item.nombre}.")
+                    return
                 qty = simpledialog.askinteger(
                     "Cantidad",
-                    f"Stock disponible: {item.stock}\nCantidad a comprar:",
+                    f"Stock disponible: {disponible}\nCantidad a comprar:",
                     minvalue=1,
-                    maxvalue=item.stock,
+                    maxvalue=disponible,
                 )
                 if not qty:
                     return
@@ -442,7 +642,7 @@ class AppGUI:
             btns, text="Añadir seleccionado al carrito", command=add_selected
         ).pack(side="left", padx=6)
 
-        load()
+        refresh = self._follow_catalog(win, "service", show, apply)
 
     # -------------------- Carrito / Checkout --------------------
     def screen_view_cart(self):
@@ -506,15 +706,31 @@ class AppGUI:
                 f"Total: ${total:.2f}\n\n¿Confirmar compra?"
             )
 
+            # El stock queda apartado mientras el usuario decide
+            try:
+                reserva = self.purchase_service.reserve_cart(self.current_cart)
+            except InsufficientStockError as e:
+                logger.warning("Compra sin stock suficiente: %s", e)
+                messagebox.showerror("Stock insuficiente", str(e))
+                return
+
             if not messagebox.askyesno("Confirmar compra", resumen):
+                self.purchase_service.reservations.release(reserva.id)
                 logger.info("Compra cancelada por el usuario")
                 return
 
-            factura = self.purchase_service.create_invoice(
-                cart_items=self.current_cart,
-                cliente_username=rec.username,
-                matricula="",
-            )
+            try:
+                factura = self.purchase_service.create_invoice(
+                    cart_items=self.current_cart,
+                    cliente_username=rec.username,
+                    matricula="",
+                    reservation=reserva,
+                )
+            except ValueError as e:
+                # Reserva caducada o stock reducido mientras se confirmaba
+                logger.warning("Compra no completada: %s", e)
+                messagebox.showerror("Compra", f"No se pudo completar la compra: {e}")
+                return
 
             logger.info(
                 "Factura generada para %s por $%.2f (ID=%s)",
@@ -724,16 +940,80 @@ class AppGUI:
             return
 
         logger.info("Mostrando lista de usuarios (solo lectura)")
-        users = self.user_admin_service.list_users()
 
         win = tk.Toplevel(self.root)
         win.title("Usuarios")
-        win.geometry("520x420")
+        win.geometry("520x460")
+
+        refresh, _ = self._user_pager(win, width=70, height=18)
+        refresh()
 
-        lb = tk.Listbox(win, width=70, height=20)
+    def _user_pager(self, win, width: int, height: int):
+        """
+        Listbox paginado de usuarios con filtro por rol y prefijo: solo se
+        pide al servicio la página visible. Devuelve ``(refresh, selected)``,
+        donde ``selected()`` es el usuario seleccionado en la página o None.
+        """
+        state = {"offset": 0, "page": []}
+
+        filters = tk.Frame(win)
+        filters.pack(fill="x", padx=8, pady=(8, 0))
+        tk.Label(filters, text="Rol:").pack(side="left")
+        role_var = tk.StringVar(value="todos")
+        tk.OptionMenu(filters, role_var, "todos", *ROLES, command=lambda _: search()).pack(
+            side="left", padx=4
+        )
+        tk.Label(filters, text="Usuario empieza por:").pack(side="left", padx=(8, 0))
+        e_prefix = tk.Entry(filters, width=16)
+        e_prefix.pack(side="left", padx=4)
+        e_prefix.bind("<Return>", lambda _: search())
+        tk.Button(filters, text="Buscar", command=lambda: search()).pack(side="left")
+
+        lb = tk.Listbox(win, width=width, height=height)
         lb.pack(padx=8, pady=6)
-        for u in users:
-            lb.insert(tk.END, f"{u.username} — {u.role}")
+
+        nav = tk.Frame(win)
+        nav.pack()
+        lbl_page = tk.Label(nav, text="")
+
+        def current_filter():
+            role = role_var.get()
+            return (None if role == "todos" else role), e_prefix.get().strip()
+
+        def refresh():
+            role, prefix = current_filter()
+            total = self.user_admin_service.count_users(role, prefix)
+            if state["offset"] >= total:
+                state["offset"] = max(0, (total - 1) // USERS_PAGE_SIZE * USERS_PAGE_SIZE)
+            state["page"] = self.user_admin_service.list_users(
+                state["offset"], USERS_PAGE_SIZE, role, prefix
+            )
+            lb.delete(0, tk.END)
+            for u in state["page"]:
+                lb.insert(tk.END, f"{u.username} — {u.role}")
+            pages = max(1, -(-total // USERS_PAGE_SIZE))
+            lbl_page.config(
+                text=f"Página {state['offset'] // USERS_PAGE_SIZE + 1} de {pages} ({total} usuarios)"
+            )
+            logger.debug("Página de usuarios cargada (offset=%s)", state["offset"])
+
+        def search():
+            state["offset"] = 0
+            refresh()
+
+        def move(step: int):
+            state["offset"] = max(0, state["offset"] + step * USERS_PAGE_SIZE)
+            refresh()
+
+        tk.Button(nav, text="◀ Anterior", command=lambda: move(-1)).pack(side="left", padx=6)
+        lbl_page.pack(side="left", padx=6)
+        tk.Button(nav, text="Siguiente ▶", command=lambda: move(1)).pack(side="left", padx=6)
+
+        def selected():
+            sel = lb.curselection()
+            return state["page"][sel[0]] if sel else None
+
+        return refresh, selected
 
     # -------------------- Gestión de usuarios (superadmin) --------------------
     def screen_manage_users_superadmin(self):
@@ -749,16 +1029,9 @@ class AppGUI:
         logger.info("Abriendo Gestión de Usuarios (SuperAdmin)")
         win = tk.Toplevel(self.root)
         win.title("Gestión de Usuarios (SuperAdmin)")
-        win.geometry("700x520")
-
-        lb = tk.Listbox(win, width=80, height=18)
-        lb.pack(padx=8, pady=8)
+        win.geometry("700x560")
 
-        def refresh():
-            lb.delete(0, tk.END)
-            for u in self.user_admin_service.list_users():
-                lb.insert(tk.END, f"{u.username} — {u.role}")
-            logger.debug("Lista de usuarios refrescada (superadmin)")
+        refresh, selected = self._user_pager(win, width=80, height=16)
 
         def create_admin():
             u = simpledialog.askstring("Nuevo Admin", "Nombre de usuario:")
@@ -771,25 +1044,32 @@ class AppGUI:
             )
             if not p:
                 return
-            ok = self.user_admin_service.create_user_by_admin(u, p, "administrador")
-            if ok:
-                logger.info("Administrador creado: %s", u)
-                messagebox.showinfo("OK", "Administrador creado correctamente.")
-                refresh()
-            else:
-                logger.error("Fallo creando administrador para %s", u)
-                messagebox.showerror(
-                    "Error",
-                    "No se pudo crear administrador (usuario existente o validación fallida).",
-                )
+
+            def finished(future):
+                if future.result():
+                    logger.info("Administrador creado: %s", u)
+                    messagebox.showinfo("OK", "Administrador creado correctamente.")
+                    if win.winfo_exists():
+                        refresh()
+                else:
+                    logger.error("Fallo creando administrador para %s", u)
+                    messagebox.showerror(
+                        "Error",
+                        "No se pudo crear administrador (usuario existente o validación fallida).",
+                    )
+
+            # Hashear la contraseña nueva no debe congelar la ventana
+            self._in_background(
+                lambda: self.user_admin_service.create_user_by_admin(u, p, "administrador"),
+                finished,
+            )
 
         def edit_user():
-            sel = lb.curselection()
-            if not sel:
+            user = selected()
+            if user is None:
                 logger.warning("Editar usuario sin selección")
                 messagebox.showwarning("Aviso", "Selecciona un usuario.")
                 return
-            user = self.user_admin_service.list_users()[sel[0]]
             new_role = simpledialog.askstring(
                 "Editar rol",
                 f"Rol actual: {user.role}\nNuevo rol (comprador/concesionario/administrador/superadmin):",
@@ -805,26 +1085,32 @@ class AppGUI:
                     "Error", "No puedes despromover al superadmin desde aquí."
                 )
                 return
-            ok = self.user_admin_service.update_user(
-                user.username, new_role, new_pass
+            def finished(future):
+                if future.result():
+                    logger.info("Usuario actualizado: %s", user.username)
+                    messagebox.showinfo(
+                        "Actualizado", f"Usuario {user.username} actualizado."
+                    )
+                    if win.winfo_exists():
+                        refresh()
+                else:
+                    logger.error("Error al actualizar usuario %s", user.username)
+                    messagebox.showerror("Error", "No se pudo actualizar usuario.")
+
+            # Con contraseña nueva hay que hashearla: fuera del hilo de Tk
+            self._in_background(
+                lambda: self.user_admin_service.update_user(
+                    user.username, new_role, new_pass
+                ),
+                finished,
             )
-            if ok:
-                logger.info("Usuario actualizado: %s", user.username)
-                messagebox.showinfo(
-                    "Actualizado", f"Usuario {user.username} actualizado."
-                )
-                refresh()
-            else:
-                logger.error("Error al actualizar usuario %s", user.username)
-                messagebox.showerror("Error", "No se pudo actualizar usuario.")
 
         def delete_user():
-            sel = lb.curselection()
-            if not sel:
+            user = selected()
+            if user is None:
                 logger.warning("Eliminar usuario sin selección")
                 messagebox.showwarning("Aviso", "Selecciona un usuario.")
                 return
-            user = self.user_admin_service.list_users()[sel[0]]
             if user.username == "superadmin":
                 logger.warning("Intento de eliminar superadmin")
                 messagebox.showerror(
@@ -886,17 +1172,21 @@ class AppGUI:
         lb = tk.Listbox(win, width=120, height=18)
         lb.pack(padx=8, pady=8)
 
-        def refresh():
+        shown = []
+
+        def line(v):
+            return f"{v.id} | {v.marca} {v.modelo} | ${v.precio} | Garantía: {v.garantia_meses} meses | Mantenimiento: {v.mantenimiento_tipo}"
+
+        def show(snap):
             lb.delete(0, tk.END)
-            vehicles = self.catalog_service.list_vehicles()
-            self._last_vehicle_list = vehicles
-            for v in vehicles:
-                lb.insert(
-                    tk.END,
-                    f"{v.id} | {v.marca} {v.modelo} | ${v.precio} | Garantía: {v.garantia_meses} meses | Mantenimiento: {v.mantenimiento_tipo}",
-                )
+            shown[:] = snap.list_vehicles()
+            for v in shown:
+                lb.insert(tk.END, line(v))
             logger.debug("Lista de vehículos refrescada")
 
+        def apply(changes):
+            self._apply_list_changes(lb, shown, changes, line, sort_key=lambda v: v.id)
+
         def create_vehicle():
             try:
                 vid = simpledialog.askstring("ID", "ID vehículo (ej: V004):")
@@ -950,7 +1240,7 @@ class AppGUI:
                 logger.warning("Editar vehículo sin selección")
                 messagebox.showwarning("Aviso", "Selecciona un vehículo.")
                 return
-            v = self._last_vehicle_list[sel[0]]
+            v = shown[sel[0]]
             try:
                 marca = simpledialog.askstring(
                     "Marca", "Marca:", initialvalue=v.marca
@@ -1004,7 +1294,7 @@ class AppGUI:
                 logger.warning("Eliminar vehículo sin selección")
                 messagebox.showwarning("Aviso", "Selecciona un vehículo.")
                 return
-            v = self._last_vehicle_list[sel[0]]
+            v = shown[sel[0]]
             if messagebox.askyesno(
                 "Confirmar", f"Eliminar vehículo {v.marca} {v.modelo}?"
             ):
@@ -1028,7 +1318,7 @@ class AppGUI:
             row=0, column=3, padx=6
         )
 
-        refresh()
+        refresh = self._follow_catalog(win, "vehicle", show, apply)
 
     # -------------------- Gestión servicios (superadmin) --------------------
     def screen_manage_services(self):
@@ -1049,28 +1339,25 @@ class AppGUI:
         lb = tk.Listbox(win, width=120, height=18)
         lb.pack(padx=8, pady=8)
 
-        def refresh():
+        shown = []
+
+        def line(s):
+            if hasattr(s, "nombre"):
+                return f"Repuesto | {s.id} | {s.nombre} | ${s.precio} | Stock: {s.stock}"
+            if hasattr(s, "tipo"):
+                return f"Seguro  | {s.id} | {s.tipo} | ${s.precio} | Vigencia (meses): {s.vigencia_meses}"
+            return f"Servicio | {s.id} | {getattr(s, 'nombre', str(s))}"
+
+        def show(snap):
             lb.delete(0, tk.END)
-            services = self.catalog_service.list_services()
-            self._last_service_list = services
-            for s in services:
-                if hasattr(s, "nombre"):
-                    lb.insert(
-                        tk.END,
-                        f"Repuesto | {s.id} | {s.nombre} | ${s.precio} | Stock: {s.stock}",
-                    )
-                elif hasattr(s, "tipo"):
-                    lb.insert(
-                        tk.END,
-                        f"Seguro  | {s.id} | {s.tipo} | ${s.precio} | Vigencia (meses): {s.vigencia_meses}",
-                    )
-                else:
-                    lb.insert(
-                        tk.END,
-                        f"Servicio | {s.id} | {getattr(s, 'nombre', str(s))}",
-                    )
+            shown[:] = snap.list_services()
+            for s in shown:
+                lb.insert(tk.END, line(s))
             logger.debug("Lista de servicios refrescada")
 
+        def apply(changes):
+            self._apply_list_changes(lb, shown, changes, line, sort_key=lambda s: s.id)
+
         def create_repuesto():
             try:
                 nombre = simpledialog.askstring(
@@ -1135,7 +1422,7 @@ class AppGUI:
                 logger.warning("Editar servicio sin selección")
                 messagebox.showwarning("Aviso", "Selecciona un servicio.")
                 return
-            s = self._last_service_list[sel[0]]
+            s = shown[sel[0]]
             try:
                 if hasattr(s, "nombre"):
                     nombre = simpledialog.askstring(
@@ -1147,12 +1434,11 @@ class AppGUI:
                     stock = simpledialog.askinteger(
                         "Stock", "Stock:", initialvalue=s.stock
                     )
-                    if nombre:
-                        s.nombre = nombre
-                    if precio is not None:
-                        s.precio = float(precio)
-                    if stock is not None:
-                        s.stock = int(stock)
+                    changes = {
+                        "nombre": nombre or None,
+                        "precio": float(precio) if precio is not None else None,
+                        "stock": int(stock) if stock is not None else None,
+                    }
                 elif hasattr(s, "tipo"):
                     tipo = simpledialog.askstring(
                         "Tipo", "Tipo:", initialvalue=s.tipo
@@ -1165,12 +1451,13 @@ class AppGUI:
                         "Vigencia (meses):",
                         initialvalue=s.vigencia_meses,
                     )
-                    if tipo:
-                        s.tipo = tipo
-                    if precio is not None:
-                        s.precio = float(precio)
-                    if vigencia is not None:
-                        s.vigencia_meses = int(vigencia)
+                    changes = {
+                        "tipo": tipo or None,
+                        "precio": float(precio) if precio is not None else None,
+                        "vigencia_meses": int(vigencia)
+                        if vigencia is not None
+                        else None,
+                    }
                 else:
                     logger.info(
                         "Tipo de servicio desconocido; no editable en este modo"
@@ -1178,6 +1465,12 @@ class AppGUI:
                     messagebox.showinfo(
                         "Info", "Tipo desconocido, no editable en este modo."
                     )
+                    return
+                # Las instantáneas del catálogo comparten los objetos: se
+                # guarda una copia en vez de modificar el publicado
+                self.catalog_service.add_service(
+                    replace(s, **{k: v for k, v in changes.items() if v is not None})
+                )
                 logger.info("Servicio actualizado")
                 messagebox.showinfo("OK", "Servicio actualizado.")
                 refresh()
@@ -1193,7 +1486,7 @@ class AppGUI:
                 logger.warning("Eliminar servicio sin selección")
                 messagebox.showwarning("Aviso", "Selecciona un servicio.")
                 return
-            s = self._last_service_list[sel[0]]
+            s = shown[sel[0]]
             if messagebox.askyesno(
                 "Confirmar", "Eliminar servicio seleccionado?"
             ):
@@ -1223,7 +1516,7 @@ class AppGUI:
             row=0, column=4, padx=6
         )
 
-        refresh()
+        refresh = self._follow_catalog(win, "service", show, apply)
 
     # -------------------- Logout --------------------
     def do_logout(self):